@@ -1,6 +1,6 @@
 """Semantic Search Agent Package."""
 
-from agent import search_agent
+from agent import get_search_agent
 from dependencies import AgentDependencies
 from settings import Settings, load_settings
 from providers import get_llm_model, get_embedding_model
@@ -9,9 +9,17 @@ __version__ = "1.0.0"
 
 __all__ = [
     "search_agent",
+    "get_search_agent",
     "AgentDependencies",
     "Settings",
     "load_settings",
     "get_llm_model",
     "get_embedding_model",
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name: str):
+    """Create `search_agent` when it is first accessed."""
+    if name == "search_agent":
+        return get_search_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,21 +1,42 @@
 """Main agent implementation for Semantic Search."""
 
+from functools import lru_cache
 from pydantic_ai import Agent, RunContext
 from typing import Any
 
 from providers import get_llm_model
 from dependencies import AgentDependencies
 from prompts import MAIN_SYSTEM_PROMPT
-from tools import semantic_search, hybrid_search
+from tools import semantic_search, hybrid_search, keyword_search
 
 
-# Initialize the semantic search agent
-search_agent = Agent(
-    get_llm_model(),
-    deps_type=AgentDependencies,
-    system_prompt=MAIN_SYSTEM_PROMPT
-)
+@lru_cache(maxsize=1)
+def get_search_agent() -> Agent:
+    """
+    Get the semantic search agent, creating it on first use.
+    
+    Creating the agent builds the LLM model and its client, so importing
+    this module stays cheap until a search actually runs.
+    
+    Returns:
+        The shared search agent
+    """
+    agent = Agent(
+        get_llm_model(),
+        deps_type=AgentDependencies,
+        system_prompt=MAIN_SYSTEM_PROMPT
+    )
+    
+    # Register search tools
+    agent.tool(semantic_search)
+    agent.tool(hybrid_search)
+    agent.tool(keyword_search)
+    
+    return agent
 
-# Register search tools
-search_agent.tool(semantic_search)
-search_agent.tool(hybrid_search)
+
+def __getattr__(name: str) -> Any:
+    """Create `search_agent` when it is first accessed."""
+    if name == "search_agent":
+        return get_search_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
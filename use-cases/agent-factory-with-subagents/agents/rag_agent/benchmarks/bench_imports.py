@@ -0,0 +1,111 @@
+"""
+Check the import time of the CLI and ingestion entry points.
+
+Each module is imported in a fresh interpreter, so the numbers are cold
+imports as a user sees them (e.g. for ``--help``). Entry points must stay
+within their time budget and must not pull in the heavy client libraries,
+which are only loaded once a model or client is actually needed.
+
+Run from the agent directory:
+
+    python -m benchmarks.bench_imports --repeat 5
+"""
+
+import sys
+import json
+import argparse
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+AGENT_DIR = Path(__file__).resolve().parent.parent
+
+# Libraries that are expensive to import and only needed at request time
+HEAVY_MODULES = ("openai", "pydantic_ai", "numpy", "tiktoken")
+
+# Module -> (import budget in seconds, heavy modules it must not load)
+ENTRY_POINTS: Dict[str, Tuple[float, Tuple[str, ...]]] = {
+    "ingestion.ingest": (0.4, HEAVY_MODULES),
+    "ingestion.preprocess": (0.25, HEAVY_MODULES),
+    "ingestion.chunker": (0.25, HEAVY_MODULES),
+    "cli": (0.5, HEAVY_MODULES),
+    # The agent needs pydantic_ai, but not the OpenAI model until first use
+    "agent": (1.0, ("openai", "numpy", "tiktoken")),
+}
+
+_PROBE = """
+import sys, time, json
+start = time.perf_counter()
+__import__(sys.argv[1])
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+
+@dataclass
+class ImportTiming:
+    """Cold import time of one module."""
+    module: str
+    seconds: float
+    budget: float
+    heavy_loaded: List[str]
+
+    @property
+    def ok(self) -> bool:
+        return self.seconds <= self.budget and not self.heavy_loaded
+
+
+def measure_import(module: str, repeat: int = 3) -> ImportTiming:
+    """
+    Import a module in fresh interpreters and keep the best time.
+
+    Args:
+        module: Dotted module name, importable from the agent directory
+        repeat: Interpreters to start (best time is reported)
+
+    Returns:
+        Timing, with the forbidden heavy modules the import loaded
+    """
+    budget, forbidden = ENTRY_POINTS.get(module, (float("inf"), HEAVY_MODULES))
+    best = float("inf")
+    loaded: List[str] = []
+
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", _PROBE, module],
+            cwd=AGENT_DIR,
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        best = min(best, result["seconds"])
+        loaded = [name for name in forbidden if name in result["modules"]]
+
+    return ImportTiming(module=module, seconds=best, budget=budget, heavy_loaded=loaded)
+
+
+def main():
+    """Measure every entry point and exit non-zero if one is over budget."""
+    parser = argparse.ArgumentParser(description="Check entry point import times")
+    parser.add_argument("--repeat", type=int, default=3, help="Interpreters per module (best is reported)")
+    parser.add_argument("modules", nargs="*", help="Modules to measure (default: all entry points)")
+    args = parser.parse_args()
+
+    print(f"{'module':<24} {'import ms':>10} {'budget ms':>10}  heavy modules loaded")
+
+    failed = False
+    for module in args.modules or ENTRY_POINTS:
+        timing = measure_import(module, args.repeat)
+        failed = failed or not timing.ok
+        print(
+            f"{module:<24} {timing.seconds * 1000:10.0f} {timing.budget * 1000:10.0f}  "
+            f"{', '.join(timing.heavy_loaded) or '-'}{'' if timing.ok else '  FAIL'}"
+        )
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
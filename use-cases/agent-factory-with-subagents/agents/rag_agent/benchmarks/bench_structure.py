@@ -0,0 +1,79 @@
+"""
+Benchmark the markdown structure scanner on large synthetic documents.
+
+Run from the agent directory:
+
+    python -m benchmarks.bench_structure --sizes 1 5 10 20 --legacy
+"""
+
+import re
+import time
+import argparse
+from typing import Callable, List
+
+from benchmarks.corpus import generate_markdown
+from ingestion.structure import scan_markdown
+
+
+def legacy_split(content: str) -> List[str]:
+    """The previous multi-pass re.split implementation, for comparison."""
+    patterns = [
+        r'\n#{1,6}\s+.+?\n',
+        r'\n\n+',
+        r'\n[-*+]\s+',
+        r'\n\d+\.\s+',
+        r'\n```.*?```\n',
+        r'\n\|\s*.+?\|\s*\n',
+    ]
+
+    sections = [content]
+    for pattern in patterns:
+        new_sections = []
+        for section in sections:
+            parts = re.split(f'({pattern})', section, flags=re.MULTILINE | re.DOTALL)
+            new_sections.extend([part for part in parts if part.strip()])
+        sections = new_sections
+
+    return sections
+
+
+def time_best(func: Callable[[], object], repeat: int) -> float:
+    """Best wall time of ``repeat`` runs, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    """Run the benchmark and print a scaling table."""
+    parser = argparse.ArgumentParser(description="Benchmark markdown structure scanning")
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 2, 5, 10, 20], help="Document sizes in MB")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per size (best is reported)")
+    parser.add_argument("--legacy", action="store_true", help="Also time the previous re.split implementation")
+    args = parser.parse_args()
+
+    print(f"{'size MB':>8} {'sections':>10} {'scan s':>8} {'MB/s':>8} {'s/MB':>8}" + (f" {'legacy s':>9}" if args.legacy else ""))
+
+    per_mb = []
+    for size_mb in args.sizes:
+        content = generate_markdown(int(size_mb * 1024 * 1024))
+        size = len(content) / (1024 * 1024)
+
+        sections = sum(1 for _ in scan_markdown(content))
+        elapsed = time_best(lambda: sum(1 for _ in scan_markdown(content)), args.repeat)
+        per_mb.append(elapsed / size)
+
+        line = f"{size:8.1f} {sections:10d} {elapsed:8.3f} {size / elapsed:8.1f} {elapsed / size:8.4f}"
+        if args.legacy:
+            line += f" {time_best(lambda: legacy_split(content), 1):9.3f}"
+        print(line)
+
+    # Linear scaling keeps seconds-per-MB flat as documents grow
+    print(f"\nseconds/MB, largest vs smallest document: {per_mb[-1] / per_mb[0]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Synthetic markdown documents and corpora for benchmarks.
+"""
+
+import os
+import math
+import random
+from typing import List
+
+WORDS = (
+    "embedding vector index query chunk document search semantic hybrid "
+    "postgres latency throughput batch token model cache pipeline stage"
+).split()
+
+
+def generate_markdown(size_bytes: int, seed: int = 0) -> str:
+    """
+    Generate a markdown document of roughly ``size_bytes`` characters.
+
+    The mix of headings, paragraphs, lists, fenced code and tables is
+    typical of technical documentation.
+
+    Args:
+        size_bytes: Target size in characters
+        seed: Random seed, so runs are comparable
+
+    Returns:
+        Markdown text
+    """
+    rng = random.Random(seed)
+    parts: List[str] = []
+    total = 0
+
+    def sentence() -> str:
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 18))).capitalize() + "."
+
+    while total < size_bytes:
+        block = rng.random()
+        if block < 0.1:
+            text = "#" * rng.randint(1, 3) + " " + sentence()
+        elif block < 0.6:
+            text = "\n".join(" ".join(sentence() for _ in range(3)) for _ in range(rng.randint(1, 4)))
+        elif block < 0.75:
+            text = "\n".join(f"- {sentence()}" for _ in range(rng.randint(2, 6)))
+        elif block < 0.9:
+            body = "\n".join(f"    value = {rng.randint(0, 999)}  # {sentence()}" for _ in range(rng.randint(3, 12)))
+            text = f"```python\ndef example():\n{body}\n\n# comment, not a heading\n```"
+        else:
+            rows = "\n".join(
+                f"| {rng.choice(WORDS)} | {rng.randint(0, 99)} | {rng.choice(WORDS)} |"
+                for _ in range(rng.randint(2, 10))
+            )
+            text = f"| name | value | note |\n|---|---|---|\n{rows}"
+
+        parts.append(text)
+        total += len(text) + 2
+
+    return "\n\n".join(parts)
+
+
+def write_corpus(
+    folder: str,
+    docs: int,
+    doc_kb: float,
+    size_spread: float = 0.5,
+    subdirs: int = 0,
+    frontmatter: float = 0.3,
+    seed: int = 0
+) -> List[str]:
+    """
+    Write a corpus of synthetic markdown documents.
+
+    Document sizes are log-normally distributed around ``doc_kb``, so a
+    corpus has the long tail of large documents real ones have.
+
+    Args:
+        folder: Output folder (created if missing)
+        docs: Number of documents
+        doc_kb: Mean document size in KB
+        size_spread: Sigma of the log-normal size distribution (0: all equal)
+        subdirs: Spread documents over this many subfolders (0: flat)
+        frontmatter: Fraction of documents with YAML frontmatter
+        seed: Random seed, so corpora are reproducible
+
+    Returns:
+        Paths of the written documents
+    """
+    rng = random.Random(seed)
+    mu = math.log(doc_kb * 1024) - size_spread ** 2 / 2
+    paths: List[str] = []
+
+    for index in range(docs):
+        size = max(256, int(rng.lognormvariate(mu, size_spread)))
+        parts = []
+        if rng.random() < frontmatter:
+            parts.append(f"---\ntitle: Document {index}\ntags: [{rng.choice(WORDS)}, {rng.choice(WORDS)}]\n---\n")
+        parts.append(f"# Document {index}\n\n")
+        parts.append(generate_markdown(size, seed=seed * 1_000_003 + index))
+
+        subfolder = os.path.join(folder, f"part-{index % subdirs:03d}") if subdirs else folder
+        os.makedirs(subfolder, exist_ok=True)
+        path = os.path.join(subfolder, f"doc-{index:06d}.md")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("".join(parts))
+        paths.append(path)
+
+    return paths
@@ -0,0 +1,252 @@
+"""
+Local OpenAI-compatible embeddings endpoint for benchmarks.
+
+Serves ``POST /v1/embeddings`` with deterministic embeddings (the same text
+always gets the same unit vector), simulated latency and per-minute request
+and token limits answered with 429 and ``retry-after-ms`` like the real API.
+``GET /stats`` returns request counters as JSON.
+
+Run from the agent directory:
+
+    python -m benchmarks.fake_embedding_server --port 8900 --latency 0.05 --rpm 3000
+
+then point the OpenAI client at it with ``OPENAI_BASE_URL=http://127.0.0.1:8900/v1``.
+"""
+
+import sys
+import json
+import time
+import base64
+import asyncio
+import hashlib
+import argparse
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Matches the pipeline's estimate when tiktoken is unavailable
+CHARS_PER_TOKEN = 4
+
+
+@dataclass
+class ServerStats:
+    """Counters of everything the server answered."""
+    requests: int = 0
+    inputs: int = 0
+    tokens: int = 0
+    rate_limited: int = 0
+    errors: int = 0
+    peak_in_flight: int = 0
+
+
+class MinuteWindow:
+    """Budget per minute, refilled continuously like the API's limits."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.available = self.capacity
+        self.updated_at = time.monotonic()
+
+    def take(self, amount: float) -> Optional[float]:
+        """
+        Consume ``amount`` if available.
+
+        Returns:
+            None if consumed, else seconds until it would be available
+        """
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            self.available -= amount
+            return None
+        return (amount - self.available) / self.rate
+
+
+def fake_embedding(text: str, dimensions: int) -> np.ndarray:
+    """Deterministic unit vector derived from the text's hash."""
+    digest = hashlib.shake_256(text.encode("utf-8")).digest(dimensions * 2)
+    vector = np.frombuffer(digest, dtype=np.int16).astype(np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+class FakeEmbeddingServer:
+    """Minimal HTTP/1.1 server speaking the OpenAI embeddings API."""
+
+    def __init__(
+        self,
+        dimensions: int = 1536,
+        latency: float = 0.05,
+        latency_per_input: float = 0.0,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None
+    ):
+        """
+        Initialize server.
+
+        Args:
+            dimensions: Embedding size when the request does not set one
+            latency: Fixed seconds per request
+            latency_per_input: Additional seconds per input text
+            requests_per_minute: Request limit (None for unlimited)
+            tokens_per_minute: Token limit (None for unlimited)
+        """
+        self.dimensions = dimensions
+        self.latency = latency
+        self.latency_per_input = latency_per_input
+        self.request_window = MinuteWindow(requests_per_minute) if requests_per_minute else None
+        self.token_window = MinuteWindow(tokens_per_minute) if tokens_per_minute else None
+        self.stats = ServerStats()
+        self._in_flight = 0
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 0) -> asyncio.AbstractServer:
+        """Start listening; port 0 picks a free port."""
+        return await asyncio.start_server(self._handle_connection, host, port)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers: Dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                status, extra_headers, payload = await self._route(method, path, body)
+
+                response_headers = {
+                    "content-type": "application/json",
+                    "content-length": str(len(payload)),
+                    **extra_headers
+                }
+                head = f"HTTP/1.1 {status}\r\n" + "".join(f"{k}: {v}\r\n" for k, v in response_headers.items())
+                writer.write(head.encode("latin-1") + b"\r\n" + payload)
+                await writer.drain()
+
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, path: str, body: bytes) -> Tuple[str, Dict[str, str], bytes]:
+        path = path.split("?", 1)[0].rstrip("/")
+
+        if method == "GET" and path == "/stats":
+            return "200 OK", {}, json.dumps(asdict(self.stats)).encode()
+        if method == "POST" and path in ("/v1/embeddings", "/embeddings"):
+            return await self._embeddings(body)
+
+        return "404 Not Found", {}, _error("Not found", "invalid_request_error")
+
+    async def _embeddings(self, body: bytes) -> Tuple[str, Dict[str, str], bytes]:
+        try:
+            request = json.loads(body)
+            inputs = request["input"]
+        except (ValueError, KeyError):
+            self.stats.errors += 1
+            return "400 Bad Request", {}, _error("Invalid request body", "invalid_request_error")
+
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        tokens = sum(max(1, len(text) // CHARS_PER_TOKEN) for text in inputs)
+
+        # Check limits before doing any work, as the real API does
+        for window, kind, amount in ((self.request_window, "requests", 1), (self.token_window, "tokens", tokens)):
+            wait = window.take(amount) if window else None
+            if wait is not None:
+                self.stats.rate_limited += 1
+                return (
+                    "429 Too Many Requests",
+                    {"retry-after-ms": str(int(wait * 1000) + 1)},
+                    _error(f"Rate limit reached for {kind}", kind, "rate_limit_exceeded")
+                )
+
+        self._in_flight += 1
+        self.stats.peak_in_flight = max(self.stats.peak_in_flight, self._in_flight)
+        try:
+            await asyncio.sleep(self.latency + self.latency_per_input * len(inputs))
+        finally:
+            self._in_flight -= 1
+
+        dimensions = request.get("dimensions") or self.dimensions
+        as_base64 = request.get("encoding_format") == "base64"
+        data = []
+        for index, text in enumerate(inputs):
+            vector = fake_embedding(text, dimensions)
+            embedding = base64.b64encode(vector.astype("<f4").tobytes()).decode() if as_base64 else vector.tolist()
+            data.append({"object": "embedding", "index": index, "embedding": embedding})
+
+        self.stats.requests += 1
+        self.stats.inputs += len(inputs)
+        self.stats.tokens += tokens
+
+        return "200 OK", {}, json.dumps({
+            "object": "list",
+            "data": data,
+            "model": request.get("model", "fake-embedding"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens}
+        }).encode()
+
+
+def _error(message: str, error_type: str, code: Optional[str] = None) -> bytes:
+    return json.dumps({"error": {"message": message, "type": error_type, "param": None, "code": code}}).encode()
+
+
+def fetch_stats(base_url: str) -> ServerStats:
+    """Read the counters of a running server (base_url ends in /v1)."""
+    from urllib.request import urlopen
+
+    with urlopen(base_url.rsplit("/v1", 1)[0] + "/stats", timeout=10) as response:
+        return ServerStats(**json.load(response))
+
+
+def main(argv: Optional[List[str]] = None):
+    """Run the server until interrupted, printing its URL on the first line."""
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible embeddings server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0, help="Port to listen on (0: any free port)")
+    parser.add_argument("--dimensions", type=int, default=1536, help="Embedding size")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per request")
+    parser.add_argument("--latency-per-input", type=float, default=0.0, help="Additional seconds per input text")
+    parser.add_argument("--rpm", type=int, default=None, help="Requests per minute before answering 429")
+    parser.add_argument("--tpm", type=int, default=None, help="Tokens per minute before answering 429")
+    args = parser.parse_args(argv)
+
+    server = FakeEmbeddingServer(
+        dimensions=args.dimensions,
+        latency=args.latency,
+        latency_per_input=args.latency_per_input,
+        requests_per_minute=args.rpm,
+        tokens_per_minute=args.tpm
+    )
+
+    async def run():
+        listener = await server.serve(args.host, args.port)
+        host, port = listener.sockets[0].getsockname()[:2]
+        print(f"http://{host}:{port}/v1", flush=True)
+        async with listener:
+            await listener.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,8 +11,6 @@ from rich.panel import Panel
 from rich.prompt import Prompt
 from rich.markdown import Markdown
 
-from pydantic_ai import Agent
-from agent import search_agent
 from dependencies import AgentDependencies
 from settings import load_settings
 
@@ -21,6 +19,9 @@ console = Console()
 
 async def stream_agent_interaction(user_input: str, conversation_history: List[str], deps: AgentDependencies) -> tuple[str, str]:
     """Stream agent interaction with real-time tool call display."""
+    # Deferred so the CLI starts without loading the agent framework
+    from pydantic_ai import Agent
+    from agent import get_search_agent
     
     try:
         # Build context with conversation history
@@ -31,10 +32,10 @@ async def stream_agent_interaction(user_input: str, conversation_history: List[s
 
 User: {user_input}
 
-Search the knowledge base to answer the user's question. Choose the appropriate search strategy (semantic_search or hybrid_search) based on the query type. Provide a comprehensive summary of your findings."""
+Search the knowledge base to answer the user's question. Choose the appropriate search strategy (semantic_search, hybrid_search or keyword_search) based on the query type. Provide a comprehensive summary of your findings."""
 
         # Stream the agent execution
-        async with search_agent.iter(prompt, deps=deps) as run:
+        async with get_search_agent().iter(prompt, deps=deps) as run:
             
             response_text = ""
             
@@ -221,12 +222,19 @@ async def main():
                 
                 elif user_input.lower() == 'info':
                     settings = load_settings()
+                    if not settings.query_cache_enabled:
+                        cache_stats = "disabled"
+                    elif deps.embedding_cache is None:
+                        cache_stats = "no queries yet"
+                    else:
+                        cache_stats = str(deps.embedding_cache.stats)
                     console.print(Panel(
                         f"[cyan]LLM Provider:[/cyan] {settings.llm_provider}\n"
                         f"[cyan]LLM Model:[/cyan] {settings.llm_model}\n"
                         f"[cyan]Embedding Model:[/cyan] {settings.embedding_model}\n"
                         f"[cyan]Default Match Count:[/cyan] {settings.default_match_count}\n"
-                        f"[cyan]Default Text Weight:[/cyan] {settings.default_text_weight}",
+                        f"[cyan]Default Text Weight:[/cyan] {settings.default_text_weight}\n"
+                        f"[cyan]Query Embedding Cache:[/cyan] {cache_stats}",
                         title="System Configuration",
                         border_style="magenta"
                     ))
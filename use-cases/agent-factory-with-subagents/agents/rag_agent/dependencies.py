@@ -1,10 +1,14 @@
 """Dependencies for Semantic Search Agent."""
 
 from dataclasses import dataclass, field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, TYPE_CHECKING
 import asyncpg
-import openai
 from settings import load_settings
+from utils.vector_codec import register_vector_codec
+from utils.query_cache import QueryEmbeddingCache, shared_query_cache
+
+if TYPE_CHECKING:
+    import openai
 
 
 @dataclass
@@ -13,7 +17,7 @@ class AgentDependencies:
     
     # Core dependencies
     db_pool: Optional[asyncpg.Pool] = None
-    openai_client: Optional[openai.AsyncOpenAI] = None
+    openai_client: Optional["openai.AsyncOpenAI"] = None
     settings: Optional[Any] = None
     
     # Session context
@@ -21,6 +25,9 @@ class AgentDependencies:
     user_preferences: Dict[str, Any] = field(default_factory=dict)
     query_history: list = field(default_factory=list)
     
+    # Query embedding cache; the process-wide one unless given
+    embedding_cache: Optional[QueryEmbeddingCache] = None
+    
     async def initialize(self):
         """Initialize external connections."""
         if not self.settings:
@@ -31,11 +38,14 @@ class AgentDependencies:
             self.db_pool = await asyncpg.create_pool(
                 self.settings.database_url,
                 min_size=self.settings.db_pool_min_size,
-                max_size=self.settings.db_pool_max_size
+                max_size=self.settings.db_pool_max_size,
+                init=register_vector_codec
             )
         
         # Initialize OpenAI client (or compatible provider)
         if not self.openai_client:
+            import openai
+            
             self.openai_client = openai.AsyncOpenAI(
                 api_key=self.settings.llm_api_key,
                 base_url=self.settings.llm_base_url
@@ -48,15 +58,30 @@ class AgentDependencies:
             self.db_pool = None
     
     async def get_embedding(self, text: str) -> list[float]:
-        """Generate embedding for text using OpenAI."""
+        """Generate embedding for text using OpenAI, reusing cached query embeddings."""
         if not self.openai_client:
             await self.initialize()
         
+        if not self.settings.query_cache_enabled:
+            return await self._create_embedding(text)
+        
+        if self.embedding_cache is None:
+            self.embedding_cache = shared_query_cache(self.settings)
+        
+        return await self.embedding_cache.get_or_create(
+            self.settings.embedding_model,
+            self.settings.embedding_dimension,
+            text,
+            self._create_embedding
+        )
+    
+    async def _create_embedding(self, text: str) -> list[float]:
+        """Embed text through the embeddings API."""
         response = await self.openai_client.embeddings.create(
             model=self.settings.embedding_model,
             input=text
         )
-        # Return as list of floats - asyncpg will handle conversion
+        # Return as list of floats - the pool's vector codec encodes it
         return response.data[0].embedding
     
     def set_user_preference(self, key: str, value: Any):
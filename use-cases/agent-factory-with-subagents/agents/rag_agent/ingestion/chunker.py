@@ -5,30 +5,34 @@ Semantic chunking implementation for intelligent document splitting.
 import os
 import re
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, TYPE_CHECKING
 from dataclasses import dataclass
 import asyncio
 
 from dotenv import load_dotenv
 
+from .structure import MarkdownSection, scan_markdown
+
 # Load environment variables
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# End of a sentence: terminal punctuation, closing quotes/brackets, whitespace
+_SENTENCE_END = re.compile(r'[.!?]+["\')\]]*\s+')
+
 # Import flexible providers
 try:
-    from ..utils.providers import get_embedding_client, get_ingestion_model
+    from ..utils.providers import get_ingestion_model
 except ImportError:
     # For direct execution or testing
     import sys
     import os
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    from utils.providers import get_embedding_client, get_ingestion_model
+    from utils.providers import get_ingestion_model
 
-# Initialize clients with flexible providers
-embedding_client = get_embedding_client()
-ingestion_model = get_ingestion_model()
+if TYPE_CHECKING:
+    import numpy as np
 
 
 @dataclass
@@ -40,6 +44,13 @@ class ChunkingConfig:
     min_chunk_size: int = 100
     use_semantic_splitting: bool = True
     preserve_structure: bool = True
+    llm_concurrency: int = 4
+    # "llm" asks a chat model for boundaries, "embedding" cuts where the
+    # embeddings of adjacent sentence windows diverge
+    semantic_method: str = "llm"
+    similarity_window: int = 2
+    breakpoint_percentile: float = 90.0
+    pool_sentence_embeddings: bool = False
     
     def __post_init__(self):
         """Validate configuration."""
@@ -47,6 +58,12 @@ class ChunkingConfig:
             raise ValueError("Chunk overlap must be less than chunk size")
         if self.min_chunk_size <= 0:
             raise ValueError("Minimum chunk size must be positive")
+        if self.llm_concurrency <= 0:
+            raise ValueError("LLM concurrency must be positive")
+        if self.semantic_method not in ("llm", "embedding"):
+            raise ValueError(f"Unknown semantic method: {self.semantic_method}")
+        if self.similarity_window <= 0:
+            raise ValueError("Similarity window must be positive")
 
 
 @dataclass
@@ -77,15 +94,19 @@ class SemanticChunker:
             config: Chunking configuration
         """
         self.config = config
-        self.client = embedding_client
-        self.model = ingestion_model
+        
+        # Shared by all documents chunked with this instance; the model and
+        # agent are only created once a section needs the LLM
+        self._agent = None
+        self._llm_semaphore = asyncio.Semaphore(config.llm_concurrency)
     
     async def chunk_document(
         self,
         content: str,
         title: str,
         source: str,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        sections: Optional[List[MarkdownSection]] = None
     ) -> List[DocumentChunk]:
         """
         Chunk a document into semantically coherent pieces.
@@ -95,6 +116,7 @@ class SemanticChunker:
             title: Document title
             source: Document source
             metadata: Additional metadata
+            sections: Structure of content if already scanned (e.g. in a worker process)
         
         Returns:
             List of document chunks
@@ -111,10 +133,10 @@ class SemanticChunker:
         # First, try semantic chunking if enabled
         if self.config.use_semantic_splitting and len(content) > self.config.chunk_size:
             try:
-                semantic_chunks = await self._semantic_chunk(content)
-                if semantic_chunks:
+                semantic_spans = await self._semantic_chunk(content, sections)
+                if semantic_spans:
                     return self._create_chunk_objects(
-                        semantic_chunks,
+                        semantic_spans,
                         content,
                         base_metadata
                     )
@@ -124,91 +146,103 @@ class SemanticChunker:
         # Fallback to rule-based chunking
         return self._simple_chunk(content, base_metadata)
     
-    async def _semantic_chunk(self, content: str) -> List[str]:
+    async def _semantic_chunk(
+        self,
+        content: str,
+        sections: Optional[List[MarkdownSection]] = None
+    ) -> List[Tuple[int, int]]:
         """
         Perform semantic chunking using LLM.
         
         Args:
             content: Content to chunk
+            sections: Pre-scanned structure of content
         
         Returns:
-            List of chunk boundaries
+            List of (start, end) chunk spans in content
         """
         # First, split on natural boundaries
-        sections = self._split_on_structure(content)
+        if sections is None:
+            sections = self._split_on_structure(content)
         
-        # Group sections into semantic chunks
-        chunks = []
-        current_chunk = ""
+        # Group consecutive sections into semantic chunks; oversized
+        # sections leave a placeholder filled in once the LLM has split them
+        pieces: List[Optional[List[Tuple[int, int]]]] = []
+        long_sections: List[Tuple[int, MarkdownSection]] = []
+        chunk_start = chunk_end = None
         
         for section in sections:
-            # Check if adding this section would exceed chunk size
-            potential_chunk = current_chunk + "\n\n" + section if current_chunk else section
+            # Extend the current chunk if the section still fits
+            if chunk_start is not None and section.end - chunk_start <= self.config.chunk_size:
+                chunk_end = section.end
+                continue
             
-            if len(potential_chunk) <= self.config.chunk_size:
-                current_chunk = potential_chunk
+            # Current chunk is ready, decide if we should split the section
+            if chunk_start is not None:
+                pieces.append([(chunk_start, chunk_end)])
+                chunk_start = chunk_end = None
+            
+            # Handle oversized sections
+            if len(section) > self.config.max_chunk_size:
+                long_sections.append((len(pieces), section))
+                pieces.append(None)
             else:
-                # Current chunk is ready, decide if we should split the section
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
-                    current_chunk = ""
-                
-                # Handle oversized sections
-                if len(section) > self.config.max_chunk_size:
-                    # Split the section semantically
-                    sub_chunks = await self._split_long_section(section)
-                    chunks.extend(sub_chunks)
-                else:
-                    current_chunk = section
+                chunk_start, chunk_end = section.start, section.end
         
         # Add the last chunk
-        if current_chunk:
-            chunks.append(current_chunk.strip())
+        if chunk_start is not None:
+            pieces.append([(chunk_start, chunk_end)])
+        
+        # Split oversized sections semantically, concurrently
+        if long_sections:
+            logger.debug(f"Splitting {len(long_sections)} oversized sections with the LLM")
+            split_results = await asyncio.gather(*(
+                self._split_long_section(content, section.start, section.end)
+                for _, section in long_sections
+            ))
+            for (position, _), sub_spans in zip(long_sections, split_results):
+                pieces[position] = sub_spans
         
-        return [chunk for chunk in chunks if len(chunk.strip()) >= self.config.min_chunk_size]
+        spans = [span for piece in pieces for span in piece]
+        
+        return [
+            (start, end) for start, end in spans
+            if len(content[start:end].strip()) >= self.config.min_chunk_size
+        ]
     
-    def _split_on_structure(self, content: str) -> List[str]:
+    def _split_on_structure(self, content: str) -> List[MarkdownSection]:
         """
         Split content on structural boundaries.
         
+        Headings, paragraphs and list items become separate sections;
+        fenced code blocks and tables are never split.
+        
         Args:
             content: Content to split
         
         Returns:
-            List of sections
-        """
-        # Split on markdown headers, paragraphs, and other structural elements
-        patterns = [
-            r'\n#{1,6}\s+.+?\n',  # Markdown headers
-            r'\n\n+',            # Multiple newlines (paragraph breaks)
-            r'\n[-*+]\s+',       # List items
-            r'\n\d+\.\s+',       # Numbered lists
-            r'\n```.*?```\n',    # Code blocks
-            r'\n\|\s*.+?\|\s*\n', # Tables
-        ]
-        
-        # Split by patterns but keep the separators
-        sections = [content]
-        
-        for pattern in patterns:
-            new_sections = []
-            for section in sections:
-                parts = re.split(f'({pattern})', section, flags=re.MULTILINE | re.DOTALL)
-                new_sections.extend([part for part in parts if part.strip()])
-            sections = new_sections
-        
-        return sections
+            List of sections with their offsets
+        """
+        return list(scan_markdown(content))
     
-    async def _split_long_section(self, section: str) -> List[str]:
+    async def _split_long_section(self, content: str, start: int, end: int) -> List[Tuple[int, int]]:
         """
         Split a long section using LLM for semantic boundaries.
         
+        The LLM's chunks are only used to choose cut points; the returned
+        spans always cover the original text of the section. At most
+        ``config.llm_concurrency`` sections are split at once.
+        
         Args:
-            section: Section to split
+            content: Document content
+            start: Section start offset
+            end: Section end offset
         
         Returns:
-            List of sub-chunks
+            List of (start, end) sub-chunk spans in content
         """
+        section = content[start:end]
+        
         try:
             prompt = f"""
             Split the following text into semantically coherent chunks. Each chunk should:
@@ -223,58 +257,103 @@ class SemanticChunker:
             {section}
             """
             
-            # Use Pydantic AI for LLM calls
-            from pydantic_ai import Agent
-            temp_agent = Agent(self.model)
-            
-            response = await temp_agent.run(prompt)
+            async with self._llm_semaphore:
+                response = await self._get_agent().run(prompt)
             result = response.data
             chunks = [chunk.strip() for chunk in result.split("---CHUNK---")]
             
-            # Validate chunks
-            valid_chunks = []
-            for chunk in chunks:
-                if (self.config.min_chunk_size <= len(chunk) <= self.config.max_chunk_size):
-                    valid_chunks.append(chunk)
+            cuts = self._align_cut_points(section, chunks)
+            if len(cuts) <= 2:
+                return self._simple_split(content, start, end)
+            
+            # Validate chunks, re-splitting any the LLM left too long
+            spans = []
+            for cut_start, cut_end in zip(cuts, cuts[1:]):
+                if cut_end - cut_start > self.config.max_chunk_size:
+                    spans.extend(self._simple_split(content, start + cut_start, start + cut_end))
+                else:
+                    spans.append((start + cut_start, start + cut_end))
             
-            return valid_chunks if valid_chunks else self._simple_split(section)
+            return spans
             
         except Exception as e:
             logger.error(f"LLM chunking failed: {e}")
-            return self._simple_split(section)
+            return self._simple_split(content, start, end)
     
-    def _simple_split(self, text: str) -> List[str]:
+    def _get_agent(self):
+        """Get the Pydantic AI agent used for splitting, creating it once."""
+        if self._agent is None:
+            from pydantic_ai import Agent
+            self._agent = Agent(get_ingestion_model())
+        return self._agent
+    
+    @staticmethod
+    def _align_cut_points(section: str, chunks: List[str], probe_words: int = 8) -> List[int]:
+        """
+        Locate where each LLM chunk starts in the original section.
+        
+        Chunks are matched by their first few words, ignoring whitespace
+        differences; chunks the LLM rewrote beyond recognition are merged
+        into the previous one.
+        
+        Args:
+            section: Original section text
+            chunks: Chunks returned by the LLM
+            probe_words: Number of leading words used to locate a chunk
+        
+        Returns:
+            Increasing cut offsets, starting at 0 and ending at len(section)
+        """
+        cuts = [0]
+        
+        for chunk in chunks[1:]:
+            words = chunk.split()[:probe_words]
+            if not words:
+                continue
+            
+            match = re.compile(r"\s+".join(map(re.escape, words))).search(section, cuts[-1] + 1)
+            if match:
+                cuts.append(match.start())
+        
+        cuts.append(len(section))
+        return cuts
+    
+    def _simple_split(self, content: str, start: int = 0, end: Optional[int] = None) -> List[Tuple[int, int]]:
         """
         Simple text splitting as fallback.
         
         Args:
-            text: Text to split
+            content: Document content
+            start: Offset to start splitting at
+            end: Offset to stop splitting at (default: end of content)
         
         Returns:
-            List of chunks
+            List of (start, end) chunk spans in content
         """
-        chunks = []
-        start = 0
+        if end is None:
+            end = len(content)
         
-        while start < len(text):
-            end = start + self.config.chunk_size
+        spans = []
+        
+        while start < end:
+            chunk_end = start + self.config.chunk_size
             
-            if end >= len(text):
+            if chunk_end >= end:
                 # Last chunk
-                chunks.append(text[start:])
+                spans.append((start, end))
                 break
             
             # Try to end at a sentence boundary
-            chunk_end = end
-            for i in range(end, max(start + self.config.min_chunk_size, end - 200), -1):
-                if text[i] in '.!?\n':
+            for i in range(chunk_end, max(start + self.config.min_chunk_size, chunk_end - 200), -1):
+                if content[i] in '.!?\n':
                     chunk_end = i + 1
                     break
             
-            chunks.append(text[start:chunk_end])
-            start = chunk_end - self.config.chunk_overlap
+            spans.append((start, chunk_end))
+            # Always move forward, even when the overlap exceeds the chunk
+            start = max(chunk_end - self.config.chunk_overlap, start + 1)
         
-        return chunks
+        return spans
     
     def _simple_chunk(
         self,
@@ -291,58 +370,296 @@ class SemanticChunker:
         Returns:
             List of document chunks
         """
-        chunks = self._simple_split(content)
-        return self._create_chunk_objects(chunks, content, base_metadata)
+        spans = self._simple_split(content)
+        return self._create_chunk_objects(spans, content, base_metadata)
     
     def _create_chunk_objects(
         self,
-        chunks: List[str],
+        spans: List[Tuple[int, int]],
         original_content: str,
         base_metadata: Dict[str, Any]
     ) -> List[DocumentChunk]:
         """
-        Create DocumentChunk objects from text chunks.
+        Create DocumentChunk objects from chunk spans.
         
         Args:
-            chunks: List of chunk texts
+            spans: List of (start, end) chunk spans
             original_content: Original document content
             base_metadata: Base metadata
         
         Returns:
-            List of DocumentChunk objects
+            List of DocumentChunk objects whose start_char/end_char
+            delimit exactly their content in the original document
         """
+        spans = [trim_span(original_content, start, end) for start, end in spans]
+        spans = [(start, end) for start, end in spans if end > start]
+        
         chunk_objects = []
-        current_pos = 0
-        
-        for i, chunk_text in enumerate(chunks):
-            # Find the position of this chunk in the original content
-            start_pos = original_content.find(chunk_text, current_pos)
-            if start_pos == -1:
-                # Fallback: estimate position
-                start_pos = current_pos
-            
-            end_pos = start_pos + len(chunk_text)
-            
+        
+        for i, (start_pos, end_pos) in enumerate(spans):
             # Create chunk metadata
             chunk_metadata = {
                 **base_metadata,
                 "chunk_method": "semantic" if self.config.use_semantic_splitting else "simple",
-                "total_chunks": len(chunks)
+                "total_chunks": len(spans)
             }
             
             chunk_objects.append(DocumentChunk(
-                content=chunk_text.strip(),
+                content=original_content[start_pos:end_pos],
                 index=i,
                 start_char=start_pos,
                 end_char=end_pos,
                 metadata=chunk_metadata
             ))
-            
-            current_pos = end_pos
         
         return chunk_objects
 
 
+class EmbeddingSimilarityChunker(SemanticChunker):
+    """
+    Semantic chunker that places boundaries where sentence embeddings diverge.
+    
+    Sentences (and whole code blocks, tables and headings) are embedded in
+    large batches, and a boundary candidate is every gap where the cosine
+    distance between the windows of sentences before and after it is in the
+    top ``100 - breakpoint_percentile`` percent. Chunks never exceed
+    ``chunk_size`` unless a single sentence does. No chat model is used, so
+    chunking is deterministic and the text is never rewritten.
+    """
+    
+    def __init__(self, config: ChunkingConfig, embedder=None):
+        """
+        Initialize chunker.
+        
+        Args:
+            config: Chunking configuration
+            embedder: EmbeddingGenerator used for sentence embeddings
+                (default: a new one); sharing the ingestion embedder lets
+                sentences use its batching, rate limits and cache
+        """
+        super().__init__(config)
+        self.embedder = embedder
+    
+    async def chunk_document(
+        self,
+        content: str,
+        title: str,
+        source: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        sections: Optional[List[MarkdownSection]] = None
+    ) -> List[DocumentChunk]:
+        """
+        Chunk a document at embedding-similarity boundaries.
+        
+        Chunks made of a single sentence get that sentence's embedding as
+        ``chunk.embedding`` (and, with ``pool_sentence_embeddings``, other
+        chunks get the normalized mean of theirs), so they are not embedded
+        again.
+        
+        Args:
+            content: Document content
+            title: Document title
+            source: Document source
+            metadata: Additional metadata
+            sections: Structure of content if already scanned (e.g. in a worker process)
+        
+        Returns:
+            List of document chunks
+        """
+        if not content.strip():
+            return []
+        
+        base_metadata = {
+            "title": title,
+            "source": source,
+            **(metadata or {})
+        }
+        
+        if len(content) <= self.config.chunk_size:
+            return self._simple_chunk(content, base_metadata)
+        
+        try:
+            spans, seeds = await self._similarity_chunk(content, sections)
+        except Exception as e:
+            logger.warning(f"Embedding-similarity chunking failed, falling back to simple chunking: {e}")
+            return self._simple_chunk(content, base_metadata)
+        
+        chunks = self._create_chunk_objects(spans, content, base_metadata)
+        
+        for chunk in chunks:
+            chunk.metadata["chunk_method"] = "embedding_similarity"
+            seed = seeds.get((chunk.start_char, chunk.end_char))
+            if seed is not None:
+                chunk.embedding, chunk.metadata["embedding_source"] = seed
+        
+        return chunks
+    
+    async def _similarity_chunk(
+        self,
+        content: str,
+        sections: Optional[List[MarkdownSection]] = None
+    ) -> Tuple[List[Tuple[int, int]], Dict[Tuple[int, int], Tuple[List[float], str]]]:
+        """
+        Group sentences into chunks at embedding-distance spikes.
+        
+        Args:
+            content: Content to chunk
+            sections: Pre-scanned structure of content
+        
+        Returns:
+            Tuple of (chunk spans, seed embeddings keyed by chunk span with
+            the way each was obtained)
+        """
+        units = self._sentence_spans(content, sections)
+        if not units:
+            return [], {}
+        
+        import numpy as np
+        
+        embedder = self._get_embedder()
+        embeddings = np.asarray(
+            await embedder.batcher.embed_texts([content[start:end] for start, end in units]),
+            dtype=np.float32
+        )
+        breakpoints = self._find_breakpoints(embeddings)
+        
+        spans: List[Tuple[int, int]] = []
+        seeds: Dict[Tuple[int, int], Tuple[List[float], str]] = {}
+        first = None
+        
+        def close(last: int):
+            span = (units[first][0], units[last][1])
+            spans.append(span)
+            if first == last:
+                seeds[span] = (embeddings[first].tolist(), "sentence")
+            elif self.config.pool_sentence_embeddings:
+                pooled = embeddings[first:last + 1].mean(axis=0)
+                norm = np.linalg.norm(pooled)
+                if norm > 0:
+                    seeds[span] = ((pooled / norm).tolist(), "sentence_mean")
+        
+        for i, (start, end) in enumerate(units):
+            if end - start > self.config.max_chunk_size:
+                # A single unit too large for any chunk
+                if first is not None:
+                    close(i - 1)
+                    first = None
+                spans.extend(self._simple_split(content, start, end))
+                continue
+            
+            if first is not None:
+                chunk_start = units[first][0]
+                too_long = end - chunk_start > self.config.chunk_size
+                long_enough = units[i - 1][1] - chunk_start >= self.config.min_chunk_size
+                if too_long or (breakpoints[i - 1] and long_enough):
+                    close(i - 1)
+                    first = None
+            
+            if first is None:
+                first = i
+        
+        if first is not None:
+            close(len(units) - 1)
+        
+        return spans, seeds
+    
+    def _find_breakpoints(self, embeddings: "np.ndarray") -> "np.ndarray":
+        """
+        Mark the gaps between sentences where the topic shifts.
+        
+        Args:
+            embeddings: (n, dimensions) sentence embeddings
+        
+        Returns:
+            Boolean array of length n - 1; entry i is True when the gap
+            after sentence i is a boundary candidate
+        """
+        import numpy as np
+        
+        count = len(embeddings)
+        if count < 3:
+            return np.zeros(max(count - 1, 0), dtype=bool)
+        
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        unit = embeddings / np.where(norms > 0, norms, 1.0)
+        
+        # Window sums from a cumulative sum: gap i separates sentences
+        # [i - window + 1, i] from [i + 1, i + window]
+        window = self.config.similarity_window
+        cumulative = np.vstack([np.zeros((1, unit.shape[1]), dtype=unit.dtype), np.cumsum(unit, axis=0)])
+        gaps = np.arange(1, count)
+        before = cumulative[gaps] - cumulative[np.maximum(gaps - window, 0)]
+        after = cumulative[np.minimum(gaps + window, count)] - cumulative[gaps]
+        
+        dot = np.einsum("ij,ij->i", before, after)
+        denominator = np.linalg.norm(before, axis=1) * np.linalg.norm(after, axis=1)
+        distance = 1.0 - dot / np.where(denominator > 0, denominator, 1.0)
+        
+        threshold = np.percentile(distance, self.config.breakpoint_percentile)
+        return distance > threshold
+    
+    def _sentence_spans(
+        self,
+        content: str,
+        sections: Optional[List[MarkdownSection]] = None
+    ) -> List[Tuple[int, int]]:
+        """
+        Split content into sentence spans.
+        
+        Code blocks, tables and headings are kept as single units.
+        
+        Args:
+            content: Content to split
+            sections: Pre-scanned structure of content
+        
+        Returns:
+            Trimmed, non-empty (start, end) spans in document order
+        """
+        spans = []
+        
+        if sections is None:
+            sections = scan_markdown(content)
+        
+        for section in sections:
+            if section.kind in ("code", "table", "heading"):
+                spans.append((section.start, section.end))
+                continue
+            
+            start = section.start
+            for match in _SENTENCE_END.finditer(content, section.start, section.end):
+                spans.append(trim_span(content, start, match.start() + len(match.group().rstrip())))
+                start = match.end()
+            spans.append(trim_span(content, start, section.end))
+        
+        return [(start, end) for start, end in spans if end > start]
+    
+    def _get_embedder(self):
+        """Get the embedder used for sentences, creating one if none was given."""
+        if self.embedder is None:
+            from .embedder import create_embedder
+            self.embedder = create_embedder()
+        return self.embedder
+
+
+def trim_span(content: str, start: int, end: int) -> Tuple[int, int]:
+    """
+    Narrow a span so it excludes leading and trailing whitespace.
+    
+    Args:
+        content: Document content
+        start: Span start
+        end: Span end
+    
+    Returns:
+        Trimmed (start, end) span
+    """
+    while start < end and content[start].isspace():
+        start += 1
+    while end > start and content[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
 class SimpleChunker:
     """Simple non-semantic chunker for faster processing."""
     
@@ -372,64 +689,85 @@ class SimpleChunker:
         if not content.strip():
             return []
         
-        base_metadata = {
-            "title": title,
-            "source": source,
-            "chunk_method": "simple",
-            **(metadata or {})
-        }
+        return self.chunks_from_spans(content, self.split_spans(content), title, source, metadata)
+    
+    def split_spans(self, content: str) -> List[Tuple[int, int]]:
+        """
+        Group paragraphs into chunk spans.
         
-        # Split on paragraphs first
-        paragraphs = re.split(r'\n\s*\n', content)
-        chunks = []
-        current_chunk = ""
-        current_pos = 0
-        chunk_index = 0
+        Args:
+            content: Document content
         
-        for paragraph in paragraphs:
-            paragraph = paragraph.strip()
-            if not paragraph:
+        Returns:
+            List of (start, end) chunk spans in content
+        """
+        # Split on paragraphs first, keeping each paragraph's offsets
+        paragraphs = []
+        paragraph_start = 0
+        for separator in re.finditer(r'\n\s*\n', content):
+            paragraphs.append((paragraph_start, separator.start()))
+            paragraph_start = separator.end()
+        paragraphs.append((paragraph_start, len(content)))
+        
+        spans = []
+        chunk_start = chunk_end = None
+        
+        for start, end in paragraphs:
+            start, end = trim_span(content, start, end)
+            if start == end:
                 continue
             
             # Check if adding this paragraph exceeds chunk size
-            potential_chunk = current_chunk + "\n\n" + paragraph if current_chunk else paragraph
+            if chunk_start is not None and end - chunk_start <= self.config.chunk_size:
+                chunk_end = end
+                continue
             
-            if len(potential_chunk) <= self.config.chunk_size:
-                current_chunk = potential_chunk
-            else:
-                # Save current chunk if it exists
-                if current_chunk:
-                    chunks.append(self._create_chunk(
-                        current_chunk,
-                        chunk_index,
-                        current_pos,
-                        current_pos + len(current_chunk),
-                        base_metadata.copy()
-                    ))
-                    
-                    # Move position, but ensure overlap is respected
-                    overlap_start = max(0, len(current_chunk) - self.config.chunk_overlap)
-                    current_pos += overlap_start
-                    chunk_index += 1
-                
-                # Start new chunk with current paragraph
-                current_chunk = paragraph
+            # Save current chunk if it exists
+            if chunk_start is not None:
+                spans.append((chunk_start, chunk_end))
+            
+            # Start new chunk with current paragraph
+            chunk_start, chunk_end = start, end
         
         # Add final chunk
-        if current_chunk:
-            chunks.append(self._create_chunk(
-                current_chunk,
-                chunk_index,
-                current_pos,
-                current_pos + len(current_chunk),
-                base_metadata.copy()
-            ))
+        if chunk_start is not None:
+            spans.append((chunk_start, chunk_end))
         
-        # Update total chunks in metadata
-        for chunk in chunks:
-            chunk.metadata["total_chunks"] = len(chunks)
+        return spans
+    
+    def chunks_from_spans(
+        self,
+        content: str,
+        spans: List[Tuple[int, int]],
+        title: str,
+        source: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> List[DocumentChunk]:
+        """
+        Build chunk objects from spans computed by split_spans().
         
-        return chunks
+        Args:
+            content: Document content
+            spans: (start, end) chunk spans
+            title: Document title
+            source: Document source
+            metadata: Additional metadata
+        
+        Returns:
+            List of document chunks
+        """
+        base_metadata = {
+            "title": title,
+            "source": source,
+            "chunk_method": "simple",
+            **(metadata or {}),
+            "total_chunks": len(spans)
+        }
+        
+        return [
+            self._create_chunk(content, index, start, end, base_metadata.copy())
+            for index, (start, end) in enumerate(spans)
+        ]
     
     def _create_chunk(
         self,
@@ -439,9 +777,9 @@ class SimpleChunker:
         end_pos: int,
         metadata: Dict[str, Any]
     ) -> DocumentChunk:
-        """Create a DocumentChunk object."""
+        """Create a DocumentChunk object from a span of the document."""
         return DocumentChunk(
-            content=content.strip(),
+            content=content[start_pos:end_pos],
             index=index,
             start_char=start_pos,
             end_char=end_pos,
@@ -450,17 +788,20 @@ class SimpleChunker:
 
 
 # Factory function
-def create_chunker(config: ChunkingConfig):
+def create_chunker(config: ChunkingConfig, embedder=None):
     """
     Create appropriate chunker based on configuration.
     
     Args:
         config: Chunking configuration
+        embedder: EmbeddingGenerator for embedding-similarity chunking
     
     Returns:
         Chunker instance
     """
     if config.use_semantic_splitting:
+        if config.semantic_method == "embedding":
+            return EmbeddingSimilarityChunker(config, embedder=embedder)
         return SemanticChunker(config)
     else:
         return SimpleChunker(config)
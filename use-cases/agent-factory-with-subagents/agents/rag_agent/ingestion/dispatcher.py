@@ -0,0 +1,249 @@
+"""
+Rate-limited, adaptive dispatcher for embedding API requests.
+"""
+
+import time
+import asyncio
+import logging
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Optional
+
+from openai import RateLimitError
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Per-minute budget refilled continuously.
+
+    The bucket holds up to one minute of budget, so a burst can use a full
+    minute's quota at once and then proceeds at the steady rate.
+    """
+
+    def __init__(self, per_minute: float):
+        """
+        Initialize bucket.
+
+        Args:
+            per_minute: Budget per minute (requests or tokens)
+        """
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.available = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1.0):
+        """
+        Wait until ``amount`` is available, then consume it.
+
+        Amounts larger than the capacity are capped so they can never
+        block forever.
+
+        Args:
+            amount: Budget to consume
+        """
+        amount = min(float(amount), self.capacity)
+
+        # Waiters are served in order so large requests are not starved
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.available >= amount:
+                    self.available -= amount
+                    return
+                await asyncio.sleep((amount - self.available) / self.rate)
+
+    def _refill(self):
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+
+@dataclass
+class DispatcherStats:
+    """Request and concurrency counters of a dispatcher."""
+    requests: int = 0
+    rate_limited: int = 0
+    tokens: int = 0
+    peak_in_flight: int = 0
+    concurrency_limit: float = 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.requests} requests, {self.tokens} tokens, {self.rate_limited} rate limited, "
+            f"concurrency {self.concurrency_limit:.1f} (peak {self.peak_in_flight} in flight)"
+        )
+
+
+class EmbeddingDispatcher:
+    """
+    Keeps several embedding requests in flight within RPM/TPM budgets.
+
+    Concurrency follows AIMD: every success with acceptable latency grows
+    the limit by roughly one request per round trip, a slow response
+    shrinks it slightly and a 429 halves it. On 429 all requests pause for
+    the server's Retry-After (or an exponential backoff) before retrying.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        initial_concurrency: int = 2,
+        max_concurrency: int = 16,
+        target_latency: Optional[float] = None,
+        max_retries: int = 6,
+        retry_delay: float = 1.0
+    ):
+        """
+        Initialize dispatcher.
+
+        Args:
+            requests_per_minute: Request budget (None for unlimited)
+            tokens_per_minute: Token budget (None for unlimited)
+            initial_concurrency: Requests in flight at start
+            max_concurrency: Upper bound for requests in flight
+            target_latency: Latency in seconds above which concurrency shrinks
+                (default: twice the fastest latency observed)
+            max_retries: Attempts per request when rate limited
+            retry_delay: Base backoff when the server sends no Retry-After
+        """
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_concurrency = max(1, max_concurrency)
+        self.limit = float(min(max(1, initial_concurrency), self.max_concurrency))
+        self.target_latency = target_latency
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.min_latency: Optional[float] = None
+        self.stats = DispatcherStats(concurrency_limit=self.limit)
+        self._slots = asyncio.Condition()
+
+    async def run(
+        self,
+        request: Callable[[], Awaitable[Any]],
+        tokens: int = 0
+    ) -> Any:
+        """
+        Run one API request under the budgets and concurrency limit.
+
+        Args:
+            request: Zero-argument coroutine function performing the call
+            tokens: Tokens the request will consume
+
+        Returns:
+            The request's result
+
+        Raises:
+            RateLimitError: If still rate limited after max_retries attempts
+        """
+        for attempt in range(self.max_retries):
+            await self._acquire_slot()
+            try:
+                await self._wait_for_pause()
+                if self.request_bucket:
+                    await self.request_bucket.acquire(1)
+                if self.token_bucket and tokens:
+                    await self.token_bucket.acquire(tokens)
+
+                start_time = time.monotonic()
+                result = await request()
+            except RateLimitError as e:
+                self._on_rate_limited(e, attempt)
+                if attempt == self.max_retries - 1:
+                    raise
+                continue
+            finally:
+                await self._release_slot()
+
+            self.stats.requests += 1
+            self.stats.tokens += tokens
+            self._on_success(time.monotonic() - start_time)
+            return result
+
+    async def _wait_for_pause(self):
+        while True:
+            delay = self.paused_until - time.monotonic()
+            if delay <= 0:
+                return
+            await asyncio.sleep(delay)
+
+    async def _acquire_slot(self):
+        async with self._slots:
+            await self._slots.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+            self.stats.peak_in_flight = max(self.stats.peak_in_flight, self.in_flight)
+
+    async def _release_slot(self):
+        async with self._slots:
+            self.in_flight -= 1
+            self._slots.notify_all()
+
+    def _on_success(self, latency: float):
+        if self.min_latency is None or latency < self.min_latency:
+            self.min_latency = latency
+
+        target = self.target_latency or 2 * self.min_latency
+        if latency > target:
+            self._set_limit(self.limit * 0.9)
+        else:
+            self._set_limit(self.limit + 1 / self.limit)
+
+    def _on_rate_limited(self, error: RateLimitError, attempt: int):
+        self.stats.rate_limited += 1
+        self._set_limit(self.limit / 2)
+
+        delay = retry_after_seconds(error)
+        if delay is None:
+            delay = self.retry_delay * (2 ** attempt)
+
+        self.paused_until = max(self.paused_until, time.monotonic() + delay)
+        logger.warning(f"Rate limit hit, pausing requests for {delay:.1f}s (concurrency {int(self.limit)})")
+
+    def _set_limit(self, limit: float):
+        self.limit = min(float(self.max_concurrency), max(1.0, limit))
+        self.stats.concurrency_limit = self.limit
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """
+    Read the server's requested delay from a rate-limit error.
+
+    Args:
+        error: Exception raised by the OpenAI client
+
+    Returns:
+        Seconds to wait, or None if the response carries no Retry-After
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+
+    try:
+        return float(retry_after)
+    except ValueError:
+        pass
+
+    # HTTP-date form
+    try:
+        return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
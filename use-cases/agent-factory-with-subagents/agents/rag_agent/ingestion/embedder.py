@@ -5,7 +5,8 @@ Document embedding generation for vector search.
 import os
 import asyncio
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Set, Tuple
 from datetime import datetime
 import json
 
@@ -13,6 +14,8 @@ from openai import RateLimitError, APIError
 from dotenv import load_dotenv
 
 from .chunker import DocumentChunk
+from .embedding_cache import EmbeddingCache, EmbeddingCacheBackend, make_cache_key
+from .dispatcher import EmbeddingDispatcher
 
 # Import flexible providers
 try:
@@ -29,9 +32,36 @@ load_dotenv()
 
 logger = logging.getLogger(__name__)
 
-# Initialize client with flexible provider
-embedding_client = get_embedding_client()
-EMBEDDING_MODEL = get_embedding_model()
+# Rough characters-per-token ratio used when tiktoken is unavailable
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=None)
+def get_tokenizer(model: str):
+    """
+    Get the tiktoken encoding for an embedding model.
+    
+    Args:
+        model: Embedding model name
+    
+    Returns:
+        tiktoken Encoding, or None if tiktoken is not installed or has no
+        encoding for the model (token counts are then estimated)
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        logger.warning("tiktoken not installed, estimating token counts from text length")
+        return None
+    
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        # Non-OpenAI models: cl100k_base is a close enough approximation
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"Failed to load tokenizer for {model}, estimating token counts: {e}")
+        return None
 
 
 class EmbeddingGenerator:
@@ -39,37 +69,103 @@ class EmbeddingGenerator:
     
     def __init__(
         self,
-        model: str = EMBEDDING_MODEL,
-        batch_size: int = 100,
+        model: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        max_batch_tokens: Optional[int] = None,
         max_retries: int = 3,
-        retry_delay: float = 1.0
+        retry_delay: float = 1.0,
+        cache: Optional[EmbeddingCacheBackend] = None,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        max_concurrency: int = 16
     ):
         """
         Initialize embedding generator.
         
         Args:
-            model: OpenAI embedding model to use
-            batch_size: Number of texts to process in parallel
+            model: OpenAI embedding model to use (default: EMBEDDING_MODEL env)
+            batch_size: Maximum number of texts per API request (default: model limit)
+            max_batch_tokens: Maximum total tokens per API request (default: model limit)
             max_retries: Maximum number of retry attempts
             retry_delay: Delay between retries in seconds
+            cache: Optional embedding cache consulted before calling the API
+            requests_per_minute: Request budget of the API key (None for unlimited)
+            tokens_per_minute: Token budget of the API key (None for unlimited)
+            max_concurrency: Upper bound for embedding requests in flight
         """
-        self.model = model
-        self.batch_size = batch_size
+        self.model = model or get_embedding_model()
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.cache = cache
         
-        # Model-specific configurations
+        # Model-specific configurations (max_tokens is per input, the
+        # max_request_* limits apply to a whole batched request)
         self.model_configs = {
-            "text-embedding-3-small": {"dimensions": 1536, "max_tokens": 8191},
-            "text-embedding-3-large": {"dimensions": 3072, "max_tokens": 8191},
-            "text-embedding-ada-002": {"dimensions": 1536, "max_tokens": 8191}
+            "text-embedding-3-small": {"dimensions": 1536, "max_tokens": 8191, "max_request_tokens": 300000, "max_inputs": 2048},
+            "text-embedding-3-large": {"dimensions": 3072, "max_tokens": 8191, "max_request_tokens": 300000, "max_inputs": 2048},
+            "text-embedding-ada-002": {"dimensions": 1536, "max_tokens": 8191, "max_request_tokens": 300000, "max_inputs": 2048}
         }
         
-        if model not in self.model_configs:
-            logger.warning(f"Unknown model {model}, using default config")
-            self.config = {"dimensions": 1536, "max_tokens": 8191}
+        if self.model not in self.model_configs:
+            logger.warning(f"Unknown model {self.model}, using default config")
+            self.config = {"dimensions": 1536, "max_tokens": 8191, "max_request_tokens": 300000, "max_inputs": 2048}
         else:
-            self.config = self.model_configs[model]
+            self.config = self.model_configs[self.model]
+        
+        self.batch_size = batch_size or self.config["max_inputs"]
+        self.max_batch_tokens = max_batch_tokens or self.config["max_request_tokens"]
+        self.tokenizer = get_tokenizer(self.model)
+        
+        # Governs how many requests are in flight and how fast they are sent
+        self.dispatcher = EmbeddingDispatcher(
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+            max_concurrency=max_concurrency,
+            retry_delay=retry_delay
+        )
+        
+        # Packs chunks from concurrent embed_chunks() calls into shared requests
+        self.batcher = EmbeddingBatcher(
+            self,
+            max_batch_tokens=self.max_batch_tokens,
+            max_batch_inputs=self.batch_size
+        )
+    
+    def count_tokens(self, text: str) -> int:
+        """
+        Count the tokens of a text under this model's tokenizer.
+        
+        Args:
+            text: Text to measure
+        
+        Returns:
+            Token count (estimated when tiktoken is unavailable)
+        """
+        return self.truncate(text)[1]
+    
+    def truncate(self, text: str) -> Tuple[str, int]:
+        """
+        Truncate a text to the model's per-input token limit.
+        
+        Args:
+            text: Text to truncate
+        
+        Returns:
+            Tuple of (possibly truncated text, its token count)
+        """
+        max_tokens = self.config["max_tokens"]
+        
+        if self.tokenizer is None:
+            if len(text) > max_tokens * CHARS_PER_TOKEN:
+                text = text[:max_tokens * CHARS_PER_TOKEN]
+            return text, -(-len(text) // CHARS_PER_TOKEN)
+        
+        tokens = self.tokenizer.encode(text, disallowed_special=())
+        if len(tokens) > max_tokens:
+            logger.debug(f"Truncating input from {len(tokens)} to {max_tokens} tokens")
+            return self.tokenizer.decode(tokens[:max_tokens]), max_tokens
+        
+        return text, len(tokens)
     
     async def generate_embedding(self, text: str) -> List[float]:
         """
@@ -82,26 +178,42 @@ class EmbeddingGenerator:
             Embedding vector
         """
         # Truncate text if too long
-        if len(text) > self.config["max_tokens"] * 4:  # Rough token estimation
-            text = text[:self.config["max_tokens"] * 4]
+        text, _ = self.truncate(text)
+        
+        cache_key = self._cache_key(text)
+        if self.cache is not None:
+            cached = await self.cache.get_many([cache_key])
+            if cache_key in cached:
+                return cached[cache_key]
+        
+        embedding = await self._request_embedding(text)
+        
+        if self.cache is not None and text.strip():
+            await self.cache.put_many({cache_key: embedding})
         
+        return embedding
+    
+    async def _create_embeddings(self, inputs, tokens: int):
+        """Send one embeddings request through the dispatcher."""
+        # The dispatcher handles 429s itself, so the client must not retry them
+        client = get_embedding_client().with_options(max_retries=0)
+        
+        return await self.dispatcher.run(
+            lambda: client.embeddings.create(model=self.model, input=inputs),
+            tokens=tokens
+        )
+    
+    async def _request_embedding(self, text: str) -> List[float]:
+        """Call the embeddings API for a single text, with retries."""
         for attempt in range(self.max_retries):
             try:
-                response = await embedding_client.embeddings.create(
-                    model=self.model,
-                    input=text
-                )
+                response = await self._create_embeddings(text, self.count_tokens(text))
                 
                 return response.data[0].embedding
                 
-            except RateLimitError as e:
-                if attempt == self.max_retries - 1:
-                    raise
-                
-                # Exponential backoff for rate limits
-                delay = self.retry_delay * (2 ** attempt)
-                logger.warning(f"Rate limit hit, retrying in {delay}s")
-                await asyncio.sleep(delay)
+            except RateLimitError:
+                # Already retried by the dispatcher
+                raise
                 
             except APIError as e:
                 logger.error(f"OpenAI API error: {e}")
@@ -136,27 +248,65 @@ class EmbeddingGenerator:
                 continue
                 
             # Truncate if too long
-            if len(text) > self.config["max_tokens"] * 4:
-                text = text[:self.config["max_tokens"] * 4]
+            text, _ = self.truncate(text)
             
             processed_texts.append(text)
         
+        if self.cache is None:
+            return self._zero_failed(await self._request_embeddings_batch(processed_texts))
+        
+        # Only cache misses are sent to the API, each distinct text once
+        keys = [self._cache_key(text) for text in processed_texts]
+        embeddings = await self.cache.get_many(keys)
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, processed_texts):
+            if key not in embeddings:
+                missing.setdefault(key, text)
+        
+        if missing:
+            fresh_embeddings = await self._request_embeddings_batch(list(missing.values()))
+            
+            new_items = {}
+            for (key, text), embedding in zip(missing.items(), fresh_embeddings):
+                embeddings[key] = embedding
+                # Never cache empty inputs or failures
+                if text.strip() and not isinstance(embedding, Exception):
+                    new_items[key] = embedding
+            
+            await self.cache.put_many(new_items)
+        
+        return self._zero_failed([embeddings[key] for key in keys])
+    
+    def _zero_failed(self, embeddings: List[Any]) -> List[List[float]]:
+        """Replace failed embeddings with zero vectors."""
+        return [
+            [0.0] * self.config["dimensions"] if isinstance(embedding, Exception) else embedding
+            for embedding in embeddings
+        ]
+    
+    async def _request_embeddings_batch(
+        self,
+        processed_texts: List[str],
+        tokens: Optional[int] = None
+    ) -> List[Any]:
+        """
+        Call the embeddings API for a batch of texts, with retries.
+        
+        If the batch keeps failing, texts are embedded one by one and the
+        exception of each text that still fails takes its place.
+        """
+        if tokens is None:
+            tokens = sum(self.count_tokens(text) for text in processed_texts)
+        
         for attempt in range(self.max_retries):
             try:
-                response = await embedding_client.embeddings.create(
-                    model=self.model,
-                    input=processed_texts
-                )
+                response = await self._create_embeddings(processed_texts, tokens)
                 
                 return [data.embedding for data in response.data]
                 
-            except RateLimitError as e:
-                if attempt == self.max_retries - 1:
-                    raise
-                
-                delay = self.retry_delay * (2 ** attempt)
-                logger.warning(f"Rate limit hit, retrying batch in {delay}s")
-                await asyncio.sleep(delay)
+            except RateLimitError:
+                # Already retried by the dispatcher
+                raise
                 
             except APIError as e:
                 logger.error(f"OpenAI API error in batch: {e}")
@@ -174,7 +324,7 @@ class EmbeddingGenerator:
     async def _process_individually(
         self,
         texts: List[str]
-    ) -> List[List[float]]:
+    ) -> List[Any]:
         """
         Process texts individually as fallback.
         
@@ -182,7 +332,7 @@ class EmbeddingGenerator:
             texts: List of texts to embed
         
         Returns:
-            List of embedding vectors
+            Embedding vector, or the exception of a failed text, for each text
         """
         embeddings = []
         
@@ -192,7 +342,7 @@ class EmbeddingGenerator:
                     embeddings.append([0.0] * self.config["dimensions"])
                     continue
                 
-                embedding = await self.generate_embedding(text)
+                embedding = await self._request_embedding(text)
                 embeddings.append(embedding)
                 
                 # Small delay to avoid overwhelming the API
@@ -200,8 +350,8 @@ class EmbeddingGenerator:
                 
             except Exception as e:
                 logger.error(f"Failed to embed text: {e}")
-                # Use zero vector as fallback
-                embeddings.append([0.0] * self.config["dimensions"])
+                # Callers mark the text as failed instead of storing a fake embedding
+                embeddings.append(e)
         
         return embeddings
     
@@ -213,9 +363,14 @@ class EmbeddingGenerator:
         """
         Generate embeddings for document chunks.
         
+        Chunks go through the shared batcher, so concurrent calls for
+        different documents are packed into the same API requests. Chunks
+        that already carry an embedding (e.g. seeded from sentence
+        embeddings by the chunker) are not embedded again.
+        
         Args:
             chunks: List of document chunks
-            progress_callback: Optional callback for progress updates
+            progress_callback: Optional callback called with (embedded, total) chunks
         
         Returns:
             Chunks with embeddings added
@@ -223,58 +378,56 @@ class EmbeddingGenerator:
         if not chunks:
             return chunks
         
-        logger.info(f"Generating embeddings for {len(chunks)} chunks")
+        pending = [chunk for chunk in chunks if getattr(chunk, "embedding", None) is None]
+        logger.info(f"Generating embeddings for {len(pending)} chunks ({len(chunks) - len(pending)} pre-embedded)")
+        
+        fresh = iter(await self.batcher.embed_texts(
+            [chunk.content for chunk in pending],
+            return_exceptions=True
+        ))
+        results = [
+            chunk.embedding if getattr(chunk, "embedding", None) is not None else next(fresh)
+            for chunk in chunks
+        ]
         
-        # Process chunks in batches
         embedded_chunks = []
-        total_batches = (len(chunks) + self.batch_size - 1) // self.batch_size
+        failed = 0
         
-        for i in range(0, len(chunks), self.batch_size):
-            batch_chunks = chunks[i:i + self.batch_size]
-            batch_texts = [chunk.content for chunk in batch_chunks]
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, BaseException):
+                failed += 1
+                # Add chunk without embedding as fallback
+                chunk.metadata.update({
+                    "embedding_error": str(result),
+                    "embedding_generated_at": datetime.now().isoformat()
+                })
+                chunk.embedding = [0.0] * self.config["dimensions"]
+                embedded_chunks.append(chunk)
+                continue
             
-            try:
-                # Generate embeddings for this batch
-                embeddings = await self.generate_embeddings_batch(batch_texts)
-                
-                # Add embeddings to chunks
-                for chunk, embedding in zip(batch_chunks, embeddings):
-                    # Create a new chunk with embedding
-                    embedded_chunk = DocumentChunk(
-                        content=chunk.content,
-                        index=chunk.index,
-                        start_char=chunk.start_char,
-                        end_char=chunk.end_char,
-                        metadata={
-                            **chunk.metadata,
-                            "embedding_model": self.model,
-                            "embedding_generated_at": datetime.now().isoformat()
-                        },
-                        token_count=chunk.token_count
-                    )
-                    
-                    # Add embedding as a separate attribute
-                    embedded_chunk.embedding = embedding
-                    embedded_chunks.append(embedded_chunk)
-                
-                # Progress update
-                current_batch = (i // self.batch_size) + 1
-                if progress_callback:
-                    progress_callback(current_batch, total_batches)
-                
-                logger.info(f"Processed batch {current_batch}/{total_batches}")
-                
-            except Exception as e:
-                logger.error(f"Failed to process batch {i//self.batch_size + 1}: {e}")
-                
-                # Add chunks without embeddings as fallback
-                for chunk in batch_chunks:
-                    chunk.metadata.update({
-                        "embedding_error": str(e),
-                        "embedding_generated_at": datetime.now().isoformat()
-                    })
-                    chunk.embedding = [0.0] * self.config["dimensions"]
-                    embedded_chunks.append(chunk)
+            # Create a new chunk with embedding
+            embedded_chunk = DocumentChunk(
+                content=chunk.content,
+                index=chunk.index,
+                start_char=chunk.start_char,
+                end_char=chunk.end_char,
+                metadata={
+                    **chunk.metadata,
+                    "embedding_model": self.model,
+                    "embedding_generated_at": datetime.now().isoformat()
+                },
+                token_count=chunk.token_count
+            )
+            
+            # Add embedding as a separate attribute
+            embedded_chunk.embedding = result
+            embedded_chunks.append(embedded_chunk)
+        
+        if failed:
+            logger.error(f"Failed to embed {failed}/{len(chunks)} chunks")
+        
+        if progress_callback:
+            progress_callback(len(chunks) - failed, len(chunks))
         
         logger.info(f"Generated embeddings for {len(embedded_chunks)} chunks")
         return embedded_chunks
@@ -294,81 +447,213 @@ class EmbeddingGenerator:
     def get_embedding_dimension(self) -> int:
         """Get the dimension of embeddings for this model."""
         return self.config["dimensions"]
+    
+    def _cache_key(self, text: str) -> str:
+        """Cache key for a text under this model and dimension."""
+        return make_cache_key(self.model, self.config["dimensions"], text)
 
 
-# Cache for embeddings
-class EmbeddingCache:
-    """Simple in-memory cache for embeddings."""
-    
-    def __init__(self, max_size: int = 1000):
-        """Initialize cache."""
-        self.cache: Dict[str, List[float]] = {}
-        self.access_times: Dict[str, datetime] = {}
-        self.max_size = max_size
-    
-    def get(self, text: str) -> Optional[List[float]]:
-        """Get embedding from cache."""
-        text_hash = self._hash_text(text)
-        if text_hash in self.cache:
-            self.access_times[text_hash] = datetime.now()
-            return self.cache[text_hash]
-        return None
+class EmbeddingBatcher:
+    """
+    Packs texts from concurrent callers into token-bounded embedding requests.
+    
+    Callers enqueue texts and await their embeddings. A batch is sent as soon
+    as adding the next text would exceed the request's token or input limit,
+    or after ``max_wait`` seconds, so small documents embedded concurrently
+    share requests and large documents are split below the provider limit.
+    Results are scattered back to each caller in input order.
+    """
     
-    def put(self, text: str, embedding: List[float]):
-        """Store embedding in cache."""
-        text_hash = self._hash_text(text)
+    def __init__(
+        self,
+        generator: EmbeddingGenerator,
+        max_batch_tokens: int,
+        max_batch_inputs: int,
+        max_wait: float = 0.05
+    ):
+        """
+        Initialize batcher.
+        
+        Args:
+            generator: Embedding generator used for truncation, caching and API calls
+            max_batch_tokens: Maximum total tokens per request
+            max_batch_inputs: Maximum number of texts per request
+            max_wait: Seconds a partial batch waits for more texts before being sent
+        """
+        self.generator = generator
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_inputs = max_batch_inputs
+        self.max_wait = max_wait
         
-        # Evict oldest entries if cache is full
-        if len(self.cache) >= self.max_size:
-            oldest_key = min(self.access_times.keys(), key=lambda k: self.access_times[k])
-            del self.cache[oldest_key]
-            del self.access_times[oldest_key]
+        # Pending (cache key, text, tokens) entries of the next batch
+        self._pending: List[Tuple[str, str, int]] = []
+        self._pending_tokens = 0
+        # cache key -> future, for pending and in-flight texts
+        self._futures: Dict[str, asyncio.Future] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
         
-        self.cache[text_hash] = embedding
-        self.access_times[text_hash] = datetime.now()
+        self.requests_sent = 0
+        self.texts_sent = 0
+        self.tokens_sent = 0
     
-    def _hash_text(self, text: str) -> str:
-        """Generate hash for text."""
-        import hashlib
-        return hashlib.md5(text.encode()).hexdigest()
+    async def embed_texts(
+        self,
+        texts: List[str],
+        return_exceptions: bool = False
+    ) -> List[Any]:
+        """
+        Embed texts through shared, packed requests.
+        
+        Args:
+            texts: Texts to embed
+            return_exceptions: Return failures in place of embeddings instead of raising
+        
+        Returns:
+            Embedding (or exception) for each text, in input order
+        """
+        generator = self.generator
+        loop = asyncio.get_running_loop()
+        
+        prepared = []
+        for text in texts:
+            if not text or not text.strip():
+                prepared.append(("", "", 0))
+                continue
+            text, tokens = generator.truncate(text)
+            prepared.append((generator._cache_key(text), text, tokens))
+        
+        cached = {}
+        if generator.cache is not None:
+            cached = await generator.cache.get_many([key for key, _, _ in prepared if key])
+        
+        results: List[Any] = [None] * len(prepared)
+        waiting: List[Tuple[int, asyncio.Future]] = []
+        
+        for i, (key, text, tokens) in enumerate(prepared):
+            if not key:
+                results[i] = [0.0] * generator.config["dimensions"]
+            elif key in cached:
+                results[i] = cached[key]
+            else:
+                future = self._futures.get(key)
+                if future is None:
+                    future = loop.create_future()
+                    self._enqueue(key, text, tokens, future)
+                waiting.append((i, future))
+        
+        if self._pending and self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+        
+        if waiting:
+            # Futures are shared with other callers of the same text, so a
+            # cancelled caller must not cancel them for everyone else
+            embeddings = await asyncio.gather(
+                *(asyncio.shield(future) for _, future in waiting),
+                return_exceptions=True
+            )
+            for (i, _), embedding in zip(waiting, embeddings):
+                if isinstance(embedding, BaseException) and not return_exceptions:
+                    raise embedding
+                results[i] = embedding
+        
+        return results
+    
+    def _enqueue(self, key: str, text: str, tokens: int, future: asyncio.Future):
+        """Add a text to the pending batch, sending the batch first if it is full."""
+        if self._pending and (
+            self._pending_tokens + tokens > self.max_batch_tokens
+            or len(self._pending) >= self.max_batch_inputs
+        ):
+            self._flush()
+        
+        self._pending.append((key, text, tokens))
+        self._pending_tokens += tokens
+        self._futures[key] = future
+    
+    def _flush(self):
+        """Send the pending batch as one request."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        
+        if not self._pending:
+            return
+        
+        batch, self._pending = self._pending, []
+        self._pending_tokens = 0
+        
+        task = asyncio.get_running_loop().create_task(self._send(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def _send(self, batch: List[Tuple[str, str, int]]):
+        """Request embeddings for a batch and resolve its futures."""
+        keys = [key for key, _, _ in batch]
+        
+        tokens = sum(tokens for _, _, tokens in batch)
+        
+        self.requests_sent += 1
+        self.texts_sent += len(batch)
+        self.tokens_sent += tokens
+        logger.debug(f"Sending embedding request with {len(batch)} texts, {tokens} tokens")
+        
+        try:
+            embeddings = await self.generator._request_embeddings_batch(
+                [text for _, text, _ in batch],
+                tokens=tokens
+            )
+        except Exception as e:
+            for key in keys:
+                future = self._futures.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            return
+        
+        for key, embedding in zip(keys, embeddings):
+            future = self._futures.pop(key, None)
+            if future is None or future.done():
+                continue
+            # Texts that failed individually fail only their own callers
+            if isinstance(embedding, Exception):
+                future.set_exception(embedding)
+            else:
+                future.set_result(embedding)
+        
+        if self.generator.cache is not None:
+            try:
+                # Never cache failures
+                await self.generator.cache.put_many({
+                    key: embedding for key, embedding in zip(keys, embeddings)
+                    if not isinstance(embedding, Exception)
+                })
+            except Exception as e:
+                logger.warning(f"Failed to store embeddings in cache: {e}")
 
 
 # Factory function
 def create_embedder(
-    model: str = EMBEDDING_MODEL,
+    model: Optional[str] = None,
     use_cache: bool = True,
+    cache: Optional[EmbeddingCacheBackend] = None,
     **kwargs
 ) -> EmbeddingGenerator:
     """
     Create embedding generator with optional caching.
     
     Args:
-        model: Embedding model to use
+        model: Embedding model to use (default: EMBEDDING_MODEL env)
         use_cache: Whether to use caching
+        cache: Cache backend to use (defaults to an in-memory cache)
         **kwargs: Additional arguments for EmbeddingGenerator
     
     Returns:
         EmbeddingGenerator instance
     """
-    embedder = EmbeddingGenerator(model=model, **kwargs)
-    
-    if use_cache:
-        # Add caching capability
+    if use_cache and cache is None:
         cache = EmbeddingCache()
-        original_generate = embedder.generate_embedding
-        
-        async def cached_generate(text: str) -> List[float]:
-            cached = cache.get(text)
-            if cached is not None:
-                return cached
-            
-            embedding = await original_generate(text)
-            cache.put(text, embedding)
-            return embedding
-        
-        embedder.generate_embedding = cached_generate
     
-    return embedder
+    return EmbeddingGenerator(model=model, cache=cache if use_cache else None, **kwargs)
 
 
 # Example usage
@@ -402,7 +687,7 @@ async def main():
     
     # Generate embeddings
     def progress_callback(current, total):
-        print(f"Processing batch {current}/{total}")
+        print(f"Embedded {current}/{total} chunks")
     
     embedded_chunks = await embedder.embed_chunks(chunks, progress_callback)
     
@@ -0,0 +1,335 @@
+"""
+Content-addressed embedding caches with pluggable storage backends.
+"""
+
+import sys
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Dict, Optional, Iterable, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+CACHE_BACKENDS = ("none", "memory", "sqlite", "postgres")
+
+# Approximate per-entry cost of the key string, tuple and OrderedDict node
+ENTRY_OVERHEAD_BYTES = 200
+
+
+def make_cache_key(model: str, dimensions: int, text: str) -> str:
+    """
+    Build the cache key for a text embedding.
+
+    Args:
+        model: Embedding model name
+        dimensions: Embedding dimensions
+        text: Text that was embedded
+
+    Returns:
+        Key of the form "<model>:<dimensions>:<sha256 of text>"
+    """
+    text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return f"{model}:{dimensions}:{text_hash}"
+
+
+def pack_embedding(embedding: Iterable[float]) -> bytes:
+    """Pack an embedding as little-endian float32 bytes."""
+    data = array("f", embedding)
+    if sys.byteorder == "big":
+        data.byteswap()
+    return data.tobytes()
+
+
+def unpack_embedding(data: bytes) -> array:
+    """Unpack little-endian float32 bytes into a compact float32 array."""
+    values = array("f")
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+@dataclass
+class CacheStats:
+    """Cache lookup and eviction counters."""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def lookups(self) -> int:
+        """Total number of keys looked up."""
+        return self.hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def __str__(self) -> str:
+        summary = f"{self.hits}/{self.lookups} hits ({self.hit_rate:.1%})"
+        if self.evictions or self.expirations:
+            summary += f", {self.evictions} evictions, {self.expirations} expirations"
+        return summary
+
+
+class EmbeddingCacheBackend:
+    """Base class for embedding caches keyed by make_cache_key()."""
+
+    def __init__(self):
+        """Initialize cache statistics."""
+        self.stats = CacheStats()
+
+    async def get_many(self, keys: List[str]) -> Dict[str, Sequence[float]]:
+        """
+        Look up several keys at once.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Mapping of the keys that were found to their embeddings
+        """
+        if not keys:
+            return {}
+
+        found = await self._get_many(list(dict.fromkeys(keys)))
+
+        hits = sum(1 for key in keys if key in found)
+        self.stats.hits += hits
+        self.stats.misses += len(keys) - hits
+
+        return found
+
+    async def put_many(self, items: Dict[str, Sequence[float]]):
+        """
+        Store several embeddings at once.
+
+        Args:
+            items: Mapping of cache key to embedding
+        """
+        if items:
+            await self._put_many(items)
+
+    async def close(self):
+        """Release backend resources."""
+
+    async def _get_many(self, keys: List[str]) -> Dict[str, Sequence[float]]:
+        raise NotImplementedError
+
+    async def _put_many(self, items: Dict[str, Sequence[float]]):
+        raise NotImplementedError
+
+
+class EmbeddingCache(EmbeddingCacheBackend):
+    """
+    In-memory LRU cache for embeddings with a byte budget and optional TTL.
+
+    Entries are float32 arrays (~6 KB for a 1536-d vector instead of ~37 KB
+    as a list of Python floats) and both get and put are O(1).
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl_seconds: Optional[float] = None
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            max_bytes: Approximate memory budget for all entries
+            ttl_seconds: Optional time-to-live for entries
+        """
+        super().__init__()
+        self.cache: "OrderedDict[str, Tuple[array, float]]" = OrderedDict()
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.current_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self.cache)
+
+    def get(self, key: str) -> Optional[array]:
+        """Get embedding from cache, marking it most recently used."""
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+
+        values, stored_at = entry
+        if self.ttl_seconds is not None and time.monotonic() - stored_at > self.ttl_seconds:
+            self._remove(key)
+            self.stats.expirations += 1
+            return None
+
+        self.cache.move_to_end(key)
+        return values
+
+    def put(self, key: str, embedding: Iterable[float]):
+        """Store embedding in cache, evicting least recently used entries."""
+        values = embedding if isinstance(embedding, array) and embedding.typecode == "f" else array("f", embedding)
+        size = self._entry_size(key, values)
+
+        if key in self.cache:
+            self._remove(key)
+
+        # Entries larger than the whole budget are not cached
+        if size > self.max_bytes:
+            return
+
+        while self.cache and self.current_bytes + size > self.max_bytes:
+            oldest_key = next(iter(self.cache))
+            self._remove(oldest_key)
+            self.stats.evictions += 1
+
+        self.cache[key] = (values, time.monotonic())
+        self.current_bytes += size
+
+    def _remove(self, key: str):
+        values, _ = self.cache.pop(key)
+        self.current_bytes -= self._entry_size(key, values)
+
+    @staticmethod
+    def _entry_size(key: str, values: array) -> int:
+        return len(values) * values.itemsize + len(key) + ENTRY_OVERHEAD_BYTES
+
+    async def _get_many(self, keys: List[str]) -> Dict[str, Sequence[float]]:
+        found = {}
+        for key in keys:
+            embedding = self.get(key)
+            if embedding is not None:
+                found[key] = embedding
+        return found
+
+    async def _put_many(self, items: Dict[str, Sequence[float]]):
+        for key, embedding in items.items():
+            self.put(key, embedding)
+
+
+class SQLiteEmbeddingCache(EmbeddingCacheBackend):
+    """Local on-disk cache stored in a SQLite file."""
+
+    def __init__(self, path: str = ".embedding_cache.sqlite"):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path: SQLite file path
+        """
+        import sqlite3
+
+        super().__init__()
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embedding_cache (cache_key TEXT PRIMARY KEY, embedding BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    async def _get_many(self, keys: List[str]) -> Dict[str, Sequence[float]]:
+        return await asyncio.to_thread(self._select, keys)
+
+    async def _put_many(self, items: Dict[str, Sequence[float]]):
+        rows = [(key, pack_embedding(embedding)) for key, embedding in items.items()]
+        await asyncio.to_thread(self._insert, rows)
+
+    async def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _select(self, keys: List[str]) -> Dict[str, Sequence[float]]:
+        found = {}
+        with self._lock:
+            # Stay below SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT cache_key, embedding FROM embedding_cache WHERE cache_key IN ({placeholders})",
+                    batch
+                )
+                for key, data in rows:
+                    found[key] = unpack_embedding(data)
+        return found
+
+    def _insert(self, rows: List[tuple]):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO embedding_cache (cache_key, embedding) VALUES (?, ?)",
+                rows
+            )
+            self._conn.commit()
+
+
+class PostgresEmbeddingCache(EmbeddingCacheBackend):
+    """Cache stored in the embedding_cache table, shared by all workers."""
+
+    def __init__(self, pool):
+        """
+        Initialize cache.
+
+        Args:
+            pool: DatabasePool or asyncpg pool providing acquire()
+        """
+        super().__init__()
+        self.pool = pool
+
+    async def _get_many(self, keys: List[str]) -> Dict[str, Sequence[float]]:
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(
+                "SELECT cache_key, embedding FROM embedding_cache WHERE cache_key = ANY($1::text[])",
+                keys
+            )
+        return {row["cache_key"]: unpack_embedding(row["embedding"]) for row in rows}
+
+    async def _put_many(self, items: Dict[str, Sequence[float]]):
+        async with self.pool.acquire() as conn:
+            await conn.execute(
+                """
+                INSERT INTO embedding_cache (cache_key, embedding)
+                SELECT * FROM unnest($1::text[], $2::bytea[])
+                ON CONFLICT (cache_key) DO NOTHING
+                """,
+                list(items.keys()),
+                [pack_embedding(embedding) for embedding in items.values()]
+            )
+
+
+def create_embedding_cache(
+    backend: str = "memory",
+    path: Optional[str] = None,
+    pool=None,
+    max_bytes: int = 256 * 1024 * 1024
+) -> Optional[EmbeddingCacheBackend]:
+    """
+    Create an embedding cache backend.
+
+    Args:
+        backend: One of "none", "memory", "sqlite", "postgres"
+        path: SQLite file path (sqlite backend)
+        pool: Database pool (postgres backend)
+        max_bytes: Memory budget (memory backend)
+
+    Returns:
+        Cache backend, or None when caching is disabled
+    """
+    if backend == "none":
+        return None
+    if backend == "memory":
+        return EmbeddingCache(max_bytes=max_bytes)
+    if backend == "sqlite":
+        return SQLiteEmbeddingCache(path or ".embedding_cache.sqlite")
+    if backend == "postgres":
+        if pool is None:
+            raise ValueError("Postgres embedding cache requires a database pool")
+        return PostgresEmbeddingCache(pool)
+
+    raise ValueError(f"Unknown embedding cache backend: {backend}")
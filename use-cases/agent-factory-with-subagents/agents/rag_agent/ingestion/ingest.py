@@ -7,21 +7,38 @@ import asyncio
 import logging
 import json
 import glob
+import time
+import hashlib
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Tuple, Callable
 from datetime import datetime
 import argparse
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import islice
 
 import asyncpg
 from dotenv import load_dotenv
 
 from .chunker import ChunkingConfig, create_chunker, DocumentChunk
-from .embedder import create_embedder
+from .embedding_cache import CACHE_BACKENDS, create_embedding_cache
+from .journal import JOURNAL_BACKENDS, JournalEntry, create_run_journal, default_journal_path
+from .preprocess import (
+    prepare_document,
+    read_document,
+    hash_content,
+    extract_title,
+    extract_document_metadata
+)
+from .streaming import StreamStats, scan_file, iter_chunks
+from .structure import MarkdownSection
+from .stages import PipelineStage, StageStats, feed_queue, report_progress
 
 # Import utilities
 try:
     from ..utils.db_utils import initialize_database, close_database, db_pool
     from ..utils.models import IngestionConfig, IngestionResult
+    from ..utils.vector_index import VectorIndexConfig, drop_vector_index, maintain_vector_index
 except ImportError:
     # For direct execution or testing
     import sys
@@ -29,12 +46,43 @@ except ImportError:
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     from utils.db_utils import initialize_database, close_database, db_pool
     from utils.models import IngestionConfig, IngestionResult
+    from utils.vector_index import VectorIndexConfig, drop_vector_index, maintain_vector_index
 
 # Load environment variables
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Column order of the records passed to DocumentIngestionPipeline._copy_chunks
+CHUNK_COPY_COLUMNS = [
+    "document_id", "content", "embedding", "chunk_index", "metadata", "token_count", "content_hash"
+]
+
+
+@dataclass
+class _DocumentJob:
+    """A document moving through the ingestion stages."""
+    index: int
+    file_path: str
+    started_at: float = field(default_factory=time.perf_counter)
+    title: str = ""
+    source: str = ""
+    content: str = ""
+    content_hash: str = ""
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    chunk_spans: Optional[List[Tuple[int, int]]] = None
+    sections: Optional[List[MarkdownSection]] = None
+    stream: Optional[StreamStats] = None
+    file_size: Optional[int] = None
+    mtime_ns: Optional[int] = None
+    chunk_count: int = 0
+    new_chunks: List[DocumentChunk] = field(default_factory=list)
+    kept_chunks: List[Tuple[str, DocumentChunk]] = field(default_factory=list)
+    
+    def elapsed_ms(self) -> float:
+        """Milliseconds since the job started."""
+        return (time.perf_counter() - self.started_at) * 1000
+
 
 class DocumentIngestionPipeline:
     """Pipeline for ingesting documents into vector DB and knowledge graph."""
@@ -43,7 +91,9 @@ class DocumentIngestionPipeline:
         self,
         config: IngestionConfig,
         documents_folder: str = "documents",
-        clean_before_ingest: bool = False
+        clean_before_ingest: bool = False,
+        prune_missing: bool = True,
+        resume: bool = False
     ):
         """
         Initialize ingestion pipeline.
@@ -52,21 +102,72 @@ class DocumentIngestionPipeline:
             config: Ingestion configuration
             documents_folder: Folder containing markdown documents
             clean_before_ingest: Whether to clean existing data before ingestion
+            prune_missing: Whether to delete documents of this folder whose files no longer exist
+            resume: Continue the last unfinished run recorded in the journal
         """
         self.config = config
         self.documents_folder = documents_folder
+        # Sources are relative to the folder; stored documents are scoped to it
+        self.source_root = os.path.abspath(documents_folder)
         self.clean_before_ingest = clean_before_ingest
+        self.prune_missing = prune_missing
+        self.resume = resume
         
         # Initialize components
         self.chunker_config = ChunkingConfig(
             chunk_size=config.chunk_size,
             chunk_overlap=config.chunk_overlap,
             max_chunk_size=config.max_chunk_size,
-            use_semantic_splitting=config.use_semantic_chunking
+            use_semantic_splitting=config.use_semantic_chunking,
+            llm_concurrency=config.llm_concurrency,
+            semantic_method=config.semantic_method
+        )
+        
+        self.embedding_cache = create_embedding_cache(
+            config.embedding_cache,
+            path=config.embedding_cache_path,
+            pool=db_pool,
+            max_bytes=config.embedding_cache_max_mb * 1024 * 1024
+        )
+        # Imported here so --help and module imports skip the OpenAI client
+        from .embedder import create_embedder
+        
+        self.embedder = create_embedder(
+            use_cache=self.embedding_cache is not None,
+            cache=self.embedding_cache,
+            max_batch_tokens=config.embed_batch_tokens,
+            requests_per_minute=config.embed_requests_per_minute,
+            tokens_per_minute=config.embed_tokens_per_minute,
+            max_concurrency=config.embed_max_in_flight
         )
+        # The embedding-similarity chunker shares the embedder's batching and cache
+        self.chunker = create_chunker(self.chunker_config, embedder=self.embedder)
+        
+        # Vector index build settings, from the same environment as the agent
+        self.index_config = VectorIndexConfig.from_env() if config.vector_index_maintenance else None
+        
+        # Description of the vector index rebuilt after the last run, if any
+        self.index_rebuilt: Optional[str] = None
+        
+        # Per-file progress of each run, for --resume
+        self.journal = create_run_journal(
+            config.journal,
+            path=config.journal_path or default_journal_path(documents_folder),
+            pool=db_pool
+        )
+        
+        # source -> content hash of documents already in the database
+        self._manifest: Dict[str, str] = {}
+        
+        # Per-stage statistics of the last run
+        self.stage_stats: List[StageStats] = []
         
-        self.chunker = create_chunker(self.chunker_config)
-        self.embedder = create_embedder()
+        # Chunk rows bulk-copied in the last run, and time spent copying
+        self.rows_copied = 0
+        self.copy_seconds = 0.0
+        
+        # Runs document preparation; None means the default thread pool
+        self._executor: Optional[Executor] = None
         
         self._initialized = False
     
@@ -85,6 +186,12 @@ class DocumentIngestionPipeline:
     
     async def close(self):
         """Close database connections."""
+        if self.embedding_cache is not None:
+            await self.embedding_cache.close()
+        
+        if self.journal is not None:
+            await self.journal.close()
+        
         if self._initialized:
             await close_database()
             self._initialized = False
@@ -96,6 +203,11 @@ class DocumentIngestionPipeline:
         """
         Ingest all documents from the documents folder.
         
+        Documents flow through read -> chunk -> embed -> write stages linked
+        by bounded queues, so embedding one document overlaps with writing
+        the previous one and reading the next. Memory in flight is bounded
+        by queue sizes and worker counts, not by corpus size.
+        
         Args:
             progress_callback: Optional callback for progress updates
         
@@ -105,54 +217,220 @@ class DocumentIngestionPipeline:
         if not self._initialized:
             await self.initialize()
         
-        # Clean existing data if requested
-        if self.clean_before_ingest:
+        self.rows_copied = 0
+        self.copy_seconds = 0.0
+        
+        resumed = False
+        if self.journal is not None:
+            resumed = await self.journal.start(self.documents_folder, self.clean_before_ingest, self.resume)
+        elif self.resume:
+            logger.warning("Cannot resume without a run journal, starting a new run")
+        
+        if resumed:
+            logger.info(
+                f"Resuming run {self.journal.run.run_id} started {self.journal.run.started_at}: "
+                f"{self.journal.counts()}"
+            )
+            if self.config.embedding_cache in ("none", "memory"):
+                logger.warning(
+                    "Files embedded but not committed before the interruption are embedded again; "
+                    "use the sqlite or postgres embedding cache to keep them"
+                )
+        
+        # Clean existing data if requested; a resumed run already did
+        clean = self.clean_before_ingest and not resumed
+        if clean:
             await self._clean_databases()
         
-        # Find all markdown files
+        # Discover all markdown files
         markdown_files = self._find_markdown_files()
         
         if not markdown_files:
             logger.warning(f"No markdown files found in {self.documents_folder}")
-            return []
+            # An emptied folder still prunes its stored documents; a missing
+            # one (e.g. an unmounted volume) never does
+            if not os.path.isdir(self.documents_folder):
+                return []
         
-        logger.info(f"Found {len(markdown_files)} markdown files to process")
+        total_files = len(markdown_files)
+        logger.info(f"Found {total_files} markdown files to process")
+
+        # Load what is already stored so unchanged files can be skipped
+        self._manifest = {} if clean else await self._load_manifest()
+        stored_documents = 0 if clean else await self._count_documents()
+
+        current_sources = {self._get_source(file_path) for file_path in markdown_files}
+        removed_sources = []
+        if self.prune_missing and self._manifest:
+            removed_sources = [source for source in self._manifest if source not in current_sources]
+            await self._prune_documents(removed_sources)
         
-        results = []
+        # Bulk loads are faster into an unindexed table; the index is rebuilt afterwards
+        new_files = len(current_sources - self._manifest.keys())
+        index_dropped = self._should_drop_vector_index(new_files, stored_documents)
+        if index_dropped:
+            async with db_pool.acquire() as conn:
+                await drop_vector_index(conn)
+            logger.info(f"Dropped the vector index for a bulk load of {new_files} new files")
+
+        # Results keep file order regardless of completion order
+        results: List[Optional[IngestionResult]] = [None] * total_files
+        completed = 0
+
+        def finish(job: _DocumentJob, result: IngestionResult):
+            nonlocal completed
+            results[job.index] = result
+            completed += 1
+            
+            if progress_callback:
+                progress_callback(completed, total_files)
+
+        def fail(job: _DocumentJob, error: Exception):
+            logger.error(f"Failed to process {job.file_path}: {error}")
+            finish(job, IngestionResult(
+                document_id="",
+                title=job.title or os.path.basename(job.file_path),
+                chunks_created=0,
+                entities_extracted=0,
+                relationships_created=0,
+                processing_time_ms=job.elapsed_ms(),
+                errors=[str(error)]
+            ))
+
+        async def read(job: _DocumentJob) -> Optional[_DocumentJob]:
+            logger.info(f"Processing file {job.index + 1}/{total_files}: {job.file_path}")
+            return self._finish_early(job, finish, await self._read_step(job))
+
+        async def chunk(job: _DocumentJob) -> Optional[_DocumentJob]:
+            job = self._finish_early(job, finish, await self._chunk_step(job))
+            if job is not None:
+                await self._record_state(job, "chunked")
+            return job
+
+        async def embed(job: _DocumentJob) -> _DocumentJob:
+            await self._embed_step(job)
+            await self._record_state(job, "embedded")
+            return job
+
+        async def write(job: _DocumentJob) -> None:
+            finish(job, await self._write_step(job))
+
+        queue_size = self.config.queue_size
+        concurrency = self.config.concurrency
+        # Keep every worker process busy
+        read_workers = max(concurrency, self.config.cpu_workers)
+        # Embed workers mostly wait on the shared batcher, so run enough of
+        # them for chunks of several documents to share each request
+        embed_workers = self.config.embed_concurrency or max(concurrency, queue_size)
+        queues = [asyncio.Queue(maxsize=queue_size) for _ in range(4)]
+        stages = [
+            PipelineStage("read", read, read_workers, queues[0], queues[1], fail),
+            PipelineStage("chunk", chunk, concurrency, queues[1], queues[2], fail),
+            PipelineStage("embed", embed, embed_workers, queues[2], queues[3], fail),
+            PipelineStage("write", write, self.config.write_concurrency or concurrency, queues[3], None, fail),
+        ]
+
+        jobs = (_DocumentJob(index=i, file_path=file_path) for i, file_path in enumerate(markdown_files))
+        reporter = asyncio.create_task(report_progress(stages, self.config.stats_interval))
         
-        for i, file_path in enumerate(markdown_files):
-            try:
-                logger.info(f"Processing file {i+1}/{len(markdown_files)}: {file_path}")
-                
-                result = await self._ingest_single_document(file_path)
-                results.append(result)
-                
-                if progress_callback:
-                    progress_callback(i + 1, len(markdown_files))
-                
-            except Exception as e:
-                logger.error(f"Failed to process {file_path}: {e}")
-                results.append(IngestionResult(
-                    document_id="",
-                    title=os.path.basename(file_path),
-                    chunks_created=0,
-                    entities_extracted=0,
-                    relationships_created=0,
-                    processing_time_ms=0,
-                    errors=[str(e)]
-                ))
+        if self.config.cpu_workers:
+            logger.info(f"Preparing documents in {self.config.cpu_workers} worker processes")
+            self._executor = ProcessPoolExecutor(max_workers=self.config.cpu_workers)
         
+        try:
+            await asyncio.gather(
+                feed_queue(queues[0], jobs),
+                *(stage.run() for stage in stages)
+            )
+        finally:
+            reporter.cancel()
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+        
+        self.stage_stats = [stage.stats for stage in stages]
+        for stats in self.stage_stats:
+            logger.info(f"Stage {stats}")
+        
+        batcher = self.embedder.batcher
+        logger.info(
+            f"Embedding requests: {batcher.requests_sent} "
+            f"({batcher.texts_sent} texts, {batcher.tokens_sent} tokens)"
+        )
+        logger.info(f"Embedding dispatcher: {self.embedder.dispatcher.stats}")
+
         # Log summary
         total_chunks = sum(r.chunks_created for r in results)
         total_errors = sum(len(r.errors) for r in results)
+        total_skipped = sum(1 for r in results if r.skipped)
+        
+        logger.info(
+            f"Ingestion complete: {len(results)} documents ({total_skipped} unchanged), "
+            f"{total_chunks} chunks, {total_errors} errors"
+        )
         
-        logger.info(f"Ingestion complete: {len(results)} documents, {total_chunks} chunks, {total_errors} errors")
+        if self.embedding_cache is not None:
+            logger.info(f"Embedding cache ({self.config.embedding_cache}): {self.embedding_cache.stats}")
+        
+        self.index_rebuilt = None
+        if self.index_config is not None and (
+            index_dropped or removed_sources or any(r.chunks_created for r in results)
+        ):
+            # Rebuild a dropped or outgrown index, then VACUUM ANALYZE chunks
+            self.index_rebuilt = await self._maintain_vector_index()
+        
+        if self.journal is not None:
+            failed = sum(1 for r in results if r.errors)
+            if failed:
+                logger.warning(f"{failed} documents failed; run again with --resume to retry them")
+            else:
+                await self.journal.finish()
         
         return results
     
+    async def _maintain_vector_index(self) -> Optional[str]:
+        """
+        Rebuild the vector index if needed, then VACUUM ANALYZE chunks.
+        
+        Runs on its own connection: pooled connections time out commands
+        after 60 seconds, far less than an index build on a large corpus.
+        Failures are logged, not raised, as the documents are already stored.
+        
+        Returns:
+            Description of the rebuilt index, or None if it was kept or failed
+        """
+        try:
+            conn = await asyncpg.connect(db_pool.database_url or os.getenv("DATABASE_URL"))
+            try:
+                return await maintain_vector_index(conn, self.index_config)
+            finally:
+                await conn.close()
+        except Exception as e:
+            logger.error(
+                f"Vector index maintenance failed: {e}; "
+                "searches scan chunks until python -m utils.vector_index --maintain succeeds"
+            )
+            return None
+    
+    def _should_drop_vector_index(self, new_files: int, stored_documents: int) -> bool:
+        """
+        Decide whether to drop the vector index before loading.
+        
+        In auto mode the index is dropped when the run at least doubles
+        the number of stored documents (of all folders), where one index
+        build after the load is cheaper than updating the index row by row.
+        """
+        mode = self.config.drop_vector_index
+        if self.index_config is None or mode == "never" or self.index_config.vector_index_type == "exact":
+            return False
+        if mode == "always":
+            return True
+        
+        return new_files > 0 and new_files >= stored_documents
+    
     async def _ingest_single_document(self, file_path: str) -> IngestionResult:
         """
-        Ingest a single document.
+        Ingest a single document by running every stage step in sequence.
         
         Args:
             file_path: Path to the document file
@@ -160,75 +438,368 @@ class DocumentIngestionPipeline:
         Returns:
             Ingestion result
         """
-        start_time = datetime.now()
+        job = _DocumentJob(index=0, file_path=file_path)
         
-        # Read document
-        document_content = self._read_document(file_path)
-        document_title = self._extract_title(document_content, file_path)
-        document_source = os.path.relpath(file_path, self.documents_folder)
+        result = await self._read_step(job) or await self._chunk_step(job)
+        if result:
+            return result
         
-        # Extract metadata from content
-        document_metadata = self._extract_document_metadata(document_content, file_path)
+        await self._embed_step(job)
+        return await self._write_step(job)
+    
+    @staticmethod
+    def _finish_early(
+        job: "_DocumentJob",
+        finish: Callable[["_DocumentJob", IngestionResult], None],
+        result: Optional[IngestionResult]
+    ) -> Optional["_DocumentJob"]:
+        """Record a step's early result, or pass the job on to the next stage."""
+        if result is None:
+            return job
         
-        logger.info(f"Processing document: {document_title}")
+        finish(job, result)
+        return None
+    
+    async def _read_step(self, job: "_DocumentJob") -> Optional[IngestionResult]:
+        """
+        Read the document and skip it if unchanged.
         
-        # Chunk the document
-        chunks = await self.chunker.chunk_document(
-            content=document_content,
-            title=document_title,
-            source=document_source,
-            metadata=document_metadata
+        Returns:
+            A final result if the document needs no further work, else None
+        """
+        job.source = self._get_source(job.file_path)
+        loop = asyncio.get_running_loop()
+        
+        stat = os.stat(job.file_path)
+        job.file_size, job.mtime_ns = stat.st_size, stat.st_mtime_ns
+        
+        # Files committed before a resumed run was interrupted are not even read
+        entry = self.journal.entries.get(job.source) if self.journal is not None else None
+        if entry is not None and entry.state == "committed" and entry.matches(stat) \
+                and self._manifest.get(job.source) == entry.content_hash:
+            logger.debug(f"Skipping document committed by the resumed run: {job.source}")
+            return IngestionResult(
+                document_id="",
+                title=entry.title or os.path.basename(job.file_path),
+                chunks_created=0,
+                processing_time_ms=job.elapsed_ms(),
+                skipped=True
+            )
+        
+        # Very large files are only scanned here and chunked while writing
+        threshold = self.config.stream_threshold_mb * 1024 * 1024
+        if threshold and job.file_size >= threshold:
+            return await self._read_streamed(job, loop)
+        
+        # Read, parse and pre-chunk off the event loop (in a worker process
+        # when cpu_workers is set)
+        prepared = await loop.run_in_executor(
+            self._executor,
+            prepare_document,
+            job.file_path,
+            job.source,
+            self._manifest.get(job.source),
+            self.chunker_config
         )
+        job.title = prepared.title
+        job.content_hash = prepared.content_hash
+        
+        # Skip documents whose content has not changed since the last run
+        if prepared.skipped:
+            logger.debug(f"Skipping unchanged document: {job.source}")
+            await self._record_state(job, "committed")
+            return IngestionResult(
+                document_id="",
+                title=job.title,
+                chunks_created=0,
+                processing_time_ms=job.elapsed_ms(),
+                skipped=True
+            )
+        
+        job.content = prepared.content
+        job.metadata = prepared.metadata
+        job.chunk_spans = prepared.chunk_spans
+        job.sections = prepared.sections
+        
+        return None
+    
+    async def _read_streamed(
+        self,
+        job: "_DocumentJob",
+        loop: asyncio.AbstractEventLoop
+    ) -> Optional[IngestionResult]:
+        """
+        Hash and count a very large document without loading it.
+        
+        Returns:
+            A final result if the document is unchanged, else None
+        """
+        job.stream = await loop.run_in_executor(self._executor, scan_file, job.file_path)
+        job.title = self._extract_title(job.stream.head, job.file_path)
+        job.content_hash = job.stream.content_hash
+        
+        if self._manifest.get(job.source) == job.content_hash:
+            logger.debug(f"Skipping unchanged document: {job.source}")
+            await self._record_state(job, "committed")
+            return IngestionResult(
+                document_id="",
+                title=job.title,
+                chunks_created=0,
+                processing_time_ms=job.elapsed_ms(),
+                skipped=True
+            )
+        
+        # Frontmatter comes from the head, counts from the full scan
+        job.metadata = self._extract_document_metadata(job.stream.head, job.file_path)
+        job.metadata.update({
+            "file_size": job.stream.char_count,
+            "line_count": job.stream.line_count,
+            "word_count": job.stream.word_count,
+            "streamed": True
+        })
+        
+        logger.info(f"Streaming large document {job.source} ({job.stream.char_count} characters)")
+        return None
+    
+    async def _chunk_step(self, job: "_DocumentJob") -> Optional[IngestionResult]:
+        """
+        Chunk the document and find chunks whose stored rows can be kept.
+        
+        Returns:
+            A final result if no chunks were created, else None
+        """
+        if job.stream is not None:
+            # Chunked, embedded and written batch by batch in _write_streamed
+            return None
+        
+        logger.info(f"Processing document: {job.title}")
+        
+        # Chunk the document; rule-based chunks were already split while reading
+        if job.chunk_spans is not None:
+            chunks = self.chunker.chunks_from_spans(
+                job.content,
+                job.chunk_spans,
+                job.title,
+                job.source,
+                job.metadata
+            )
+        else:
+            chunks = await self.chunker.chunk_document(
+                content=job.content,
+                title=job.title,
+                source=job.source,
+                metadata=job.metadata,
+                sections=job.sections
+            )
+        job.chunk_spans = job.sections = None
         
         if not chunks:
-            logger.warning(f"No chunks created for {document_title}")
+            logger.warning(f"No chunks created for {job.title}")
             return IngestionResult(
                 document_id="",
-                title=document_title,
+                title=job.title,
                 chunks_created=0,
                 entities_extracted=0,
                 relationships_created=0,
-                processing_time_ms=(datetime.now() - start_time).total_seconds() * 1000,
+                processing_time_ms=job.elapsed_ms(),
                 errors=["No chunks created"]
             )
         
         logger.info(f"Created {len(chunks)} chunks")
+        job.chunk_count = len(chunks)
+        job.new_chunks = chunks
+        
+        # Reuse stored rows for chunks whose content is unchanged
+        if job.source in self._manifest:
+            existing_ids = await self._load_chunk_ids(job.source)
+            job.new_chunks = []
+            
+            for chunk in chunks:
+                matching_ids = existing_ids.get(self._chunk_hash(chunk.content))
+                if matching_ids:
+                    job.kept_chunks.append((matching_ids.pop(), chunk))
+                else:
+                    job.new_chunks.append(chunk)
+            
+            logger.info(f"Reusing {len(job.kept_chunks)} unchanged chunks, embedding {len(job.new_chunks)}")
         
-        # Entity extraction removed (graph-related functionality)
-        entities_extracted = 0
+        return None
+    
+    async def _embed_step(self, job: "_DocumentJob"):
+        """Generate embeddings for new or changed chunks only."""
+        if job.stream is not None:
+            return
         
-        # Generate embeddings
-        embedded_chunks = await self.embedder.embed_chunks(chunks)
-        logger.info(f"Generated embeddings for {len(embedded_chunks)} chunks")
+        job.new_chunks = await self.embedder.embed_chunks(job.new_chunks)
+        logger.info(f"Generated embeddings for {len(job.new_chunks)} chunks")
+    
+    async def _write_step(self, job: "_DocumentJob") -> IngestionResult:
+        """Save the document and its chunks to PostgreSQL."""
+        if job.stream is not None:
+            return await self._write_streamed(job)
         
-        # Save to PostgreSQL
+        failed = self._count_failed(job.new_chunks)
         document_id = await self._save_to_postgres(
-            document_title,
-            document_source,
-            document_content,
-            embedded_chunks,
-            document_metadata
+            job.title,
+            job.source,
+            job.content,
+            job.new_chunks,
+            job.metadata,
+            # No stored hash, so the next run processes the file again
+            None if failed else job.content_hash,
+            job.kept_chunks,
+            journal_entry=self._journal_entry(job, "committed")
         )
         
         logger.info(f"Saved document to PostgreSQL with ID: {document_id}")
         
-        # Knowledge graph functionality removed
-        relationships_created = 0
-        graph_errors = []
+        return IngestionResult(
+            document_id=document_id,
+            title=job.title,
+            chunks_created=job.chunk_count,
+            chunks_reused=len(job.kept_chunks),
+            entities_extracted=0,
+            relationships_created=0,
+            processing_time_ms=job.elapsed_ms(),
+            errors=self._embedding_errors(failed)
+        )
+    
+    async def _write_streamed(self, job: "_DocumentJob") -> IngestionResult:
+        """
+        Chunk, embed and save a very large document batch by batch.
         
-        # Calculate processing time
-        processing_time = (datetime.now() - start_time).total_seconds() * 1000
+        Chunks come from a sliding window over the file, so memory is
+        bounded by the batch size rather than the document size. Embedding
+        the next batch overlaps with copying the previous one, all in one
+        transaction that replaces any previous version. Only the head of
+        the document is stored as its content.
+        """
+        chunk_stream = iter_chunks(
+            job.file_path,
+            job.stream.encoding,
+            self.chunker_config.chunk_size,
+            self.chunker_config.max_chunk_size
+        )
+        base_metadata = {
+            "title": job.title,
+            "source": job.source,
+            "chunk_method": "streaming",
+            **job.metadata
+        }
+        chunk_count = 0
+        failed = 0
+        
+        def next_batch() -> List[DocumentChunk]:
+            nonlocal chunk_count
+            batch = []
+            for start, text in islice(chunk_stream, self.config.stream_batch_size):
+                batch.append(DocumentChunk(
+                    content=text,
+                    index=chunk_count,
+                    start_char=start,
+                    end_char=start + len(text),
+                    metadata=base_metadata.copy()
+                ))
+                chunk_count += 1
+            return batch
+        
+        async with db_pool.acquire() as conn:
+            async with conn.transaction():
+                document_id = await self._upsert_document(
+                    conn,
+                    job.title,
+                    job.source,
+                    job.stream.head,
+                    {**job.metadata, "content_truncated": job.stream.char_count > len(job.stream.head)},
+                    job.content_hash
+                )
+                await conn.execute("DELETE FROM chunks WHERE document_id = $1::uuid", document_id)
+                
+                pending: Optional[asyncio.Task] = None
+                next_task: Optional[asyncio.Task] = None
+                try:
+                    while True:
+                        # File reads happen off the event loop
+                        batch = await asyncio.to_thread(next_batch)
+                        next_task = asyncio.create_task(self.embedder.embed_chunks(batch)) if batch else None
+                        
+                        if pending is not None:
+                            embedded = await pending
+                            failed += self._count_failed(embedded)
+                            await self._copy_chunks(conn, [
+                                self._chunk_record(document_id, chunk) for chunk in embedded
+                            ])
+                        
+                        if next_task is None:
+                            break
+                        pending = next_task
+                finally:
+                    # A failed batch aborts the transaction; stop embedding the next one
+                    outstanding = [task for task in (pending, next_task) if task is not None]
+                    for task in outstanding:
+                        task.cancel()
+                    await asyncio.gather(*outstanding, return_exceptions=True)
+                
+                # The total is only known once the whole file was read
+                await conn.execute(
+                    """
+                    UPDATE chunks
+                    SET metadata = metadata || jsonb_build_object('total_chunks', $2::int)
+                    WHERE document_id = $1::uuid
+                    """,
+                    document_id,
+                    chunk_count
+                )
+                
+                if failed:
+                    # No stored hash, so the next run processes the file again
+                    await conn.execute(
+                        "UPDATE documents SET content_hash = NULL WHERE id = $1::uuid",
+                        document_id
+                    )
+                
+                await self._record_state(job, "committed", conn)
+        
+        logger.info(f"Streamed {chunk_count} chunks of {job.source} to PostgreSQL")
         
         return IngestionResult(
             document_id=document_id,
-            title=document_title,
-            chunks_created=len(chunks),
-            entities_extracted=entities_extracted,
-            relationships_created=relationships_created,
-            processing_time_ms=processing_time,
-            errors=graph_errors
+            title=job.title,
+            chunks_created=chunk_count,
+            entities_extracted=0,
+            relationships_created=0,
+            processing_time_ms=job.elapsed_ms(),
+            errors=self._embedding_errors(failed) if chunk_count else ["No chunks created"]
+        )
+    
+    @staticmethod
+    def _count_failed(chunks: List[DocumentChunk]) -> int:
+        """Number of chunks whose embedding request failed."""
+        return sum(1 for chunk in chunks if "embedding_error" in chunk.metadata)
+    
+    @staticmethod
+    def _embedding_errors(failed: int) -> List[str]:
+        """Result errors for chunks stored without an embedding."""
+        if not failed:
+            return []
+        return [f"Failed to embed {failed} chunks; they are retried on the next run"]
+    
+    def _journal_entry(self, job: "_DocumentJob", state: str) -> JournalEntry:
+        """Build the run journal entry of a job."""
+        return JournalEntry(
+            source=job.source,
+            state=state,
+            content_hash=job.content_hash,
+            title=job.title,
+            file_size=job.file_size,
+            mtime_ns=job.mtime_ns
         )
     
+    async def _record_state(self, job: "_DocumentJob", state: str, conn: Optional[asyncpg.Connection] = None):
+        """Record a job's progress in the run journal, if there is one."""
+        if self.journal is not None:
+            await self.journal.record(self._journal_entry(job, state), conn)
+    
     def _find_markdown_files(self) -> List[str]:
         """Find all markdown files in the documents folder."""
         if not os.path.exists(self.documents_folder):
@@ -243,57 +814,30 @@ class DocumentIngestionPipeline:
         
         return sorted(files)
     
+    def _get_source(self, file_path: str) -> str:
+        """Get the document source (path relative to the documents folder)."""
+        return os.path.relpath(file_path, self.documents_folder)
+    
+    def _hash_content(self, content: str) -> str:
+        """Hash document content for change detection."""
+        return hash_content(content)
+    
+    def _chunk_hash(self, content: str) -> str:
+        """Stable chunk identity: normalized text plus the embedding model."""
+        normalized = " ".join(content.split())
+        return hashlib.sha256(f"{self.embedder.model}\n{normalized}".encode('utf-8')).hexdigest()
+    
     def _read_document(self, file_path: str) -> str:
         """Read document content from file."""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read()
-        except UnicodeDecodeError:
-            # Try with different encoding
-            with open(file_path, 'r', encoding='latin-1') as f:
-                return f.read()
+        return read_document(file_path)
     
     def _extract_title(self, content: str, file_path: str) -> str:
         """Extract title from document content or filename."""
-        # Try to find markdown title
-        lines = content.split('\n')
-        for line in lines[:10]:  # Check first 10 lines
-            line = line.strip()
-            if line.startswith('# '):
-                return line[2:].strip()
-        
-        # Fallback to filename
-        return os.path.splitext(os.path.basename(file_path))[0]
+        return extract_title(content, file_path)
     
     def _extract_document_metadata(self, content: str, file_path: str) -> Dict[str, Any]:
         """Extract metadata from document content."""
-        metadata = {
-            "file_path": file_path,
-            "file_size": len(content),
-            "ingestion_date": datetime.now().isoformat()
-        }
-        
-        # Try to extract YAML frontmatter
-        if content.startswith('---'):
-            try:
-                import yaml
-                end_marker = content.find('\n---\n', 4)
-                if end_marker != -1:
-                    frontmatter = content[4:end_marker]
-                    yaml_metadata = yaml.safe_load(frontmatter)
-                    if isinstance(yaml_metadata, dict):
-                        metadata.update(yaml_metadata)
-            except ImportError:
-                logger.warning("PyYAML not installed, skipping frontmatter extraction")
-            except Exception as e:
-                logger.warning(f"Failed to parse frontmatter: {e}")
-        
-        # Extract some basic metadata from content
-        lines = content.split('\n')
-        metadata['line_count'] = len(lines)
-        metadata['word_count'] = len(content.split())
-        
-        return metadata
+        return extract_document_metadata(content, file_path)
     
     async def _save_to_postgres(
         self,
@@ -301,48 +845,204 @@ class DocumentIngestionPipeline:
         source: str,
         content: str,
         chunks: List[DocumentChunk],
-        metadata: Dict[str, Any]
+        metadata: Dict[str, Any],
+        content_hash: Optional[str] = None,
+        kept_chunks: Optional[List[Tuple[str, DocumentChunk]]] = None,
+        journal_entry: Optional[JournalEntry] = None
     ) -> str:
-        """Save document and chunks to PostgreSQL."""
+        """
+        Save document and chunks to PostgreSQL, replacing any previous version.
+        
+        Args:
+            title: Document title
+            source: Document source
+            content: Document content
+            chunks: New chunks with embeddings to insert
+            metadata: Document metadata
+            content_hash: Hash of the document content
+            kept_chunks: (chunk_id, chunk) pairs whose stored rows are kept
+            journal_entry: Run journal entry recorded with the document
+        
+        Returns:
+            Document ID
+        """
+        kept_chunks = kept_chunks or []
+        
         async with db_pool.acquire() as conn:
             async with conn.transaction():
-                # Insert document
-                document_result = await conn.fetchrow(
+                document_id = await self._upsert_document(
+                    conn, title, source, content, metadata, content_hash
+                )
+
+                # Drop chunks of the previous version that are not kept
+                await conn.execute(
                     """
-                    INSERT INTO documents (title, source, content, metadata)
-                    VALUES ($1, $2, $3, $4)
-                    RETURNING id::text
+                    DELETE FROM chunks
+                    WHERE document_id = $1::uuid AND NOT (id = ANY($2::uuid[]))
                     """,
-                    title,
-                    source,
-                    content,
-                    json.dumps(metadata)
+                    document_id,
+                    [chunk_id for chunk_id, _ in kept_chunks]
                 )
                 
-                document_id = document_result["id"]
-                
-                # Insert chunks
-                for chunk in chunks:
-                    # Convert embedding to PostgreSQL vector string format
-                    embedding_data = None
-                    if hasattr(chunk, 'embedding') and chunk.embedding:
-                        # PostgreSQL vector format: '[1.0,2.0,3.0]' (no spaces after commas)
-                        embedding_data = '[' + ','.join(map(str, chunk.embedding)) + ']'
-                    
+                # Kept rows keep their embedding; refresh position, metadata and
+                # content, which may differ in whitespace the chunk hash ignores
+                if kept_chunks:
                     await conn.execute(
                         """
-                        INSERT INTO chunks (document_id, content, embedding, chunk_index, metadata, token_count)
-                        VALUES ($1::uuid, $2, $3::vector, $4, $5, $6)
+                        UPDATE chunks
+                        SET chunk_index = u.chunk_index,
+                            metadata = chunks.metadata || u.metadata,
+                            token_count = u.token_count,
+                            content = u.content
+                        FROM unnest($1::uuid[], $2::int[], $3::jsonb[], $4::int[], $5::text[])
+                            AS u(id, chunk_index, metadata, token_count, content)
+                        WHERE chunks.id = u.id
                         """,
-                        document_id,
-                        chunk.content,
-                        embedding_data,
-                        chunk.index,
-                        json.dumps(chunk.metadata),
-                        chunk.token_count
+                        [chunk_id for chunk_id, _ in kept_chunks],
+                        [chunk.index for _, chunk in kept_chunks],
+                        [json.dumps(chunk.metadata) for _, chunk in kept_chunks],
+                        [chunk.token_count for _, chunk in kept_chunks],
+                        [chunk.content for _, chunk in kept_chunks]
                     )
-                
+
+                # Insert new chunks with a single bulk copy
+                await self._copy_chunks(conn, [
+                    self._chunk_record(document_id, chunk) for chunk in chunks
+                ])
+
+                if journal_entry is not None and self.journal is not None:
+                    await self.journal.record(journal_entry, conn)
+
                 return document_id
+
+    async def _upsert_document(
+        self,
+        conn: asyncpg.Connection,
+        title: str,
+        source: str,
+        content: str,
+        metadata: Dict[str, Any],
+        content_hash: Optional[str]
+    ) -> str:
+        """Insert a document, or update it in place if this folder's source exists."""
+        document_result = await conn.fetchrow(
+            """
+            INSERT INTO documents (title, source, source_root, content, metadata, content_hash)
+            VALUES ($1, $2, $3, $4, $5, $6)
+            ON CONFLICT (source_root, source) DO UPDATE SET
+                title = EXCLUDED.title,
+                content = EXCLUDED.content,
+                metadata = EXCLUDED.metadata,
+                content_hash = EXCLUDED.content_hash
+            RETURNING id::text
+            """,
+            title,
+            source,
+            self.source_root,
+            content,
+            json.dumps(metadata),
+            content_hash
+        )
+
+        return document_result["id"]
+
+    def _chunk_record(self, document_id: str, chunk: DocumentChunk) -> Tuple:
+        """Build a _copy_chunks record for a chunk."""
+        # Failed embeddings are stored as NULL with no identity, so the next
+        # run embeds them again instead of reusing the row
+        failed = "embedding_error" in chunk.metadata
+        return (
+            document_id,
+            chunk.content,
+            chunk.embedding if getattr(chunk, 'embedding', None) and not failed else None,
+            chunk.index,
+            json.dumps(chunk.metadata),
+            chunk.token_count,
+            None if failed else self._chunk_hash(chunk.content)
+        )
+
+    async def _copy_chunks(
+        self,
+        conn: asyncpg.Connection,
+        records: List[Tuple[str, str, Optional[List[float]], int, str, Optional[int], Optional[str]]]
+    ) -> None:
+        """
+        Bulk-load chunk rows, possibly spanning several documents.
+
+        Rows are streamed straight into ``chunks`` with one binary COPY;
+        embeddings are encoded by the pool's pgvector codec, never as text.
+
+        Args:
+            conn: Connection with the vector codec registered
+            records: (document_id, content, embedding, chunk_index, metadata_json, token_count, content_hash)
+        """
+        if not records:
+            return
+
+        start_time = time.perf_counter()
+
+        await conn.copy_records_to_table(
+            "chunks",
+            records=records,
+            columns=CHUNK_COPY_COLUMNS
+        )
+
+        elapsed = time.perf_counter() - start_time
+        self.rows_copied += len(records)
+        self.copy_seconds += elapsed
+        logger.debug(
+            f"Copied {len(records)} chunk rows in {elapsed * 1000:.1f}ms "
+            f"({len(records) / max(elapsed, 1e-9):.0f} rows/s)"
+        )
+    
+    async def _load_manifest(self) -> Dict[str, str]:
+        """Load source -> content hash for the stored documents of this folder."""
+        async with db_pool.acquire() as conn:
+            rows = await conn.fetch(
+                "SELECT source, content_hash FROM documents WHERE source_root = $1",
+                self.source_root
+            )
+        
+        return {row["source"]: row["content_hash"] for row in rows}
+    
+    async def _count_documents(self) -> int:
+        """Count stored documents of all folders."""
+        async with db_pool.acquire() as conn:
+            return await conn.fetchval("SELECT count(*) FROM documents")
+    
+    async def _load_chunk_ids(self, source: str) -> Dict[str, List[str]]:
+        """Load chunk content hash -> chunk IDs for a stored document."""
+        async with db_pool.acquire() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT c.id::text, c.content_hash
+                FROM chunks c
+                JOIN documents d ON d.id = c.document_id
+                WHERE d.source_root = $1 AND d.source = $2 AND c.content_hash IS NOT NULL
+                """,
+                self.source_root,
+                source
+            )
+        
+        chunk_ids: Dict[str, List[str]] = {}
+        for row in rows:
+            chunk_ids.setdefault(row["content_hash"], []).append(row["id"])
+        
+        return chunk_ids
+    
+    async def _prune_documents(self, sources: List[str]):
+        """Delete documents (and their chunks) of this folder whose files were removed."""
+        if not sources:
+            return
+        
+        async with db_pool.acquire() as conn:
+            await conn.execute(
+                "DELETE FROM documents WHERE source_root = $1 AND source = ANY($2::text[])",
+                self.source_root,
+                sources
+            )
+        
+        logger.info(f"Pruned {len(sources)} documents no longer in {self.documents_folder}")
     
     async def _clean_databases(self):
         """Clean existing data from databases."""
@@ -361,9 +1061,32 @@ async def main():
     parser = argparse.ArgumentParser(description="Ingest documents into vector DB")
     parser.add_argument("--documents", "-d", default="documents", help="Documents folder path")
     parser.add_argument("--clean", "-c", action="store_true", help="Clean existing data before ingestion")
+    parser.add_argument("--no-prune", action="store_true", help="Keep documents whose files were removed")
     parser.add_argument("--chunk-size", type=int, default=1000, help="Chunk size for splitting documents")
     parser.add_argument("--chunk-overlap", type=int, default=200, help="Chunk overlap size")
     parser.add_argument("--no-semantic", action="store_true", help="Disable semantic chunking")
+    parser.add_argument("--semantic-method", choices=["llm", "embedding"], default="llm", help="How semantic chunk boundaries are found")
+    parser.add_argument("--llm-concurrency", type=int, default=4, help="Oversized sections split by the LLM at once")
+    parser.add_argument("--concurrency", type=int, default=1, help="Workers per pipeline stage")
+    parser.add_argument("--stream-threshold-mb", type=int, default=64, help="Stream files at least this large instead of loading them (0: never)")
+    parser.add_argument("--cpu-workers", type=int, default=0, help="Processes for reading and rule-based chunking (0: threads in this process)")
+    parser.add_argument("--embed-workers", type=int, default=None, help="Embedding stage workers (default: max of --concurrency and --queue-size)")
+    parser.add_argument("--embed-batch-tokens", type=int, default=None, help="Maximum tokens per embedding request (default: model limit)")
+    parser.add_argument("--embed-rpm", type=int, default=None, help="Embedding API requests per minute budget")
+    parser.add_argument("--embed-tpm", type=int, default=None, help="Embedding API tokens per minute budget")
+    parser.add_argument("--embed-max-in-flight", type=int, default=16, help="Upper bound for concurrent embedding requests")
+    parser.add_argument("--write-workers", type=int, default=None, help="Database write stage workers (default: --concurrency)")
+    parser.add_argument("--queue-size", type=int, default=8, help="Capacity of the queues between pipeline stages")
+    parser.add_argument("--embedding-cache", choices=CACHE_BACKENDS, default="memory", help="Embedding cache backend")
+    parser.add_argument("--embedding-cache-path", default=None, help="SQLite file for the sqlite embedding cache")
+    parser.add_argument("--embedding-cache-mb", type=int, default=256, help="Memory budget of the memory embedding cache")
+    parser.add_argument("--journal", choices=JOURNAL_BACKENDS, default="file", help="Where per-file run progress is recorded")
+    parser.add_argument("--journal-path", default=None, help="File for the file run journal (default: .<folder>.ingest_journal.jsonl beside the documents folder)")
+    parser.add_argument("--resume", action="store_true", help="Continue the last interrupted run instead of starting over")
+    parser.add_argument("--drop-vector-index", choices=["auto", "always", "never"], default="auto",
+                        help="Drop the vector index before loading and rebuild it after (auto: when the corpus at least doubles)")
+    parser.add_argument("--no-index-maintenance", action="store_true",
+                        help="Skip rebuilding an outgrown vector index and VACUUM ANALYZE after ingestion")
     # Graph-related arguments removed
     parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose logging")
     
@@ -380,14 +1103,35 @@ async def main():
     config = IngestionConfig(
         chunk_size=args.chunk_size,
         chunk_overlap=args.chunk_overlap,
-        use_semantic_chunking=not args.no_semantic
+        use_semantic_chunking=not args.no_semantic,
+        llm_concurrency=args.llm_concurrency,
+        semantic_method=args.semantic_method,
+        concurrency=args.concurrency,
+        cpu_workers=args.cpu_workers,
+        stream_threshold_mb=args.stream_threshold_mb,
+        embed_concurrency=args.embed_workers,
+        embed_batch_tokens=args.embed_batch_tokens,
+        embed_requests_per_minute=args.embed_rpm,
+        embed_tokens_per_minute=args.embed_tpm,
+        embed_max_in_flight=args.embed_max_in_flight,
+        write_concurrency=args.write_workers,
+        queue_size=args.queue_size,
+        embedding_cache=args.embedding_cache,
+        embedding_cache_path=args.embedding_cache_path,
+        embedding_cache_max_mb=args.embedding_cache_mb,
+        journal=args.journal,
+        journal_path=args.journal_path,
+        vector_index_maintenance=not args.no_index_maintenance,
+        drop_vector_index=args.drop_vector_index
     )
     
     # Create and run pipeline
     pipeline = DocumentIngestionPipeline(
         config=config,
         documents_folder=args.documents,
-        clean_before_ingest=args.clean
+        clean_before_ingest=args.clean,
+        prune_missing=not args.no_prune,
+        resume=args.resume
     )
     
     def progress_callback(current: int, total: int):
@@ -406,14 +1150,26 @@ async def main():
         print("INGESTION SUMMARY")
         print("="*50)
         print(f"Documents processed: {len(results)}")
+        print(f"Unchanged documents skipped: {sum(1 for r in results if r.skipped)}")
         print(f"Total chunks created: {sum(r.chunks_created for r in results)}")
+        print(f"Chunks reused without re-embedding: {sum(r.chunks_reused for r in results)}")
         # Graph-related stats removed
         print(f"Total errors: {sum(len(r.errors) for r in results)}")
+        print(f"Embedding requests: {pipeline.embedder.dispatcher.stats}")
+        if pipeline.embedding_cache is not None:
+            print(f"Embedding cache: {pipeline.embedding_cache.stats}")
+        if pipeline.index_rebuilt:
+            print(f"Vector index rebuilt: {pipeline.index_rebuilt}")
         print(f"Total processing time: {total_time:.2f} seconds")
+        for stats in pipeline.stage_stats:
+            print(f"  {stats}")
         print()
         
         # Print individual results
         for result in results:
+            if result.skipped:
+                continue
+            
             status = "✓" if not result.errors else "✗"
             print(f"{status} {result.title}: {result.chunks_created} chunks")
             
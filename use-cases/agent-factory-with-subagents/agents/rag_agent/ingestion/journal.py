@@ -0,0 +1,356 @@
+"""
+Run journal for checkpointed, resumable ingestion.
+
+The journal records how far each file of a run got (pending, chunked,
+embedded, committed), so an interrupted run can be resumed without
+re-cleaning the database, re-reading committed files or re-embedding them.
+"""
+
+import os
+import json
+import uuid
+import logging
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_BACKENDS = ("none", "file", "postgres")
+
+# Files without an entry are pending
+FILE_STATES = ("pending", "chunked", "embedded", "committed")
+
+
+@dataclass
+class JournalEntry:
+    """Progress of one file within a run."""
+    source: str
+    state: str = "pending"
+    content_hash: Optional[str] = None
+    title: Optional[str] = None
+    file_size: Optional[int] = None
+    mtime_ns: Optional[int] = None
+
+    def matches(self, stat: os.stat_result) -> bool:
+        """Whether the file looks unchanged since the entry was written."""
+        return self.file_size == stat.st_size and self.mtime_ns == stat.st_mtime_ns
+
+
+@dataclass
+class RunInfo:
+    """An ingestion run tracked by the journal."""
+    run_id: str
+    documents_folder: str
+    clean: bool
+    started_at: str
+    finished_at: Optional[str] = None
+
+
+class RunJournal:
+    """Base class for journals of per-file ingestion states."""
+
+    # Whether record() can join the caller's database transaction
+    transactional = False
+
+    def __init__(self):
+        """Initialize an empty journal."""
+        self.run: Optional[RunInfo] = None
+        self.entries: Dict[str, JournalEntry] = {}
+
+    async def start(self, documents_folder: str, clean: bool, resume: bool) -> bool:
+        """
+        Start a new run, or continue the last one.
+
+        A run can only be resumed if it did not finish and ingested the
+        same documents folder; otherwise a new run is started.
+
+        Args:
+            documents_folder: Folder being ingested
+            clean: Whether the run starts by cleaning the database
+            resume: Continue the last unfinished run if there is one
+
+        Returns:
+            True if an earlier run is being resumed
+        """
+        if resume:
+            previous = await self._load_last_run()
+            if previous is not None and previous[0].finished_at is None \
+                    and previous[0].documents_folder == documents_folder:
+                self.run, self.entries = previous
+                return True
+
+            logger.warning("No unfinished run of this folder in the journal, starting a new run")
+
+        self.run = RunInfo(
+            run_id=str(uuid.uuid4()),
+            documents_folder=documents_folder,
+            clean=clean,
+            started_at=_now()
+        )
+        self.entries = {}
+        await self._begin(self.run)
+        return False
+
+    async def record(self, entry: JournalEntry, conn=None):
+        """
+        Record a file's new state.
+
+        Args:
+            entry: File progress
+            conn: Open database connection whose transaction the entry
+                should join (used by transactional journals)
+        """
+        if self.run is None:
+            return
+
+        self.entries[entry.source] = entry
+        await self._write(entry, conn)
+
+    async def finish(self):
+        """Mark the run as finished, so it is no longer resumable."""
+        if self.run is None:
+            return
+
+        self.run.finished_at = _now()
+        await self._finish(self.run)
+
+    def counts(self) -> Dict[str, int]:
+        """Number of recorded files per state."""
+        counts = dict.fromkeys(FILE_STATES[1:], 0)
+        for entry in self.entries.values():
+            counts[entry.state] = counts.get(entry.state, 0) + 1
+        return counts
+
+    async def close(self):
+        """Release backend resources."""
+
+    async def _load_last_run(self) -> Optional[Tuple[RunInfo, Dict[str, JournalEntry]]]:
+        raise NotImplementedError
+
+    async def _begin(self, run: RunInfo):
+        raise NotImplementedError
+
+    async def _write(self, entry: JournalEntry, conn):
+        raise NotImplementedError
+
+    async def _finish(self, run: RunInfo):
+        raise NotImplementedError
+
+
+class FileRunJournal(RunJournal):
+    """
+    Journal kept as a JSON-lines file.
+
+    The first line describes the run and every state change appends a line,
+    flushed immediately so it survives a crash of the process. A torn last
+    line is ignored on load.
+    """
+
+    def __init__(self, path: str = ".ingest_journal.jsonl"):
+        """
+        Initialize journal.
+
+        Args:
+            path: Journal file path
+        """
+        super().__init__()
+        self.path = path
+        self._file = None
+
+    async def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    async def _load_last_run(self) -> Optional[Tuple[RunInfo, Dict[str, JournalEntry]]]:
+        if not os.path.exists(self.path):
+            return None
+
+        run: Optional[RunInfo] = None
+        entries: Dict[str, JournalEntry] = {}
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+
+                if "run" in record:
+                    run = RunInfo(**record["run"])
+                elif "finished_at" in record and run is not None:
+                    run.finished_at = record["finished_at"]
+                elif "source" in record:
+                    entries[record["source"]] = JournalEntry(**record)
+
+        if run is None:
+            return None
+
+        # Later state changes of the resumed run are appended
+        self._file = open(self.path, "a", encoding="utf-8")
+        return run, entries
+
+    async def _begin(self, run: RunInfo):
+        await self.close()
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._append({"run": asdict(run)})
+
+    async def _write(self, entry: JournalEntry, conn):
+        self._append(asdict(entry))
+
+    async def _finish(self, run: RunInfo):
+        self._append({"finished_at": run.finished_at})
+
+    def _append(self, record: dict):
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+
+
+class PostgresRunJournal(RunJournal):
+    """
+    Journal kept in the ingestion_runs and ingestion_journal tables.
+
+    A file's committed state is written in the same transaction as its
+    document, so the journal never disagrees with the database.
+    """
+
+    transactional = True
+
+    def __init__(self, pool):
+        """
+        Initialize journal.
+
+        Args:
+            pool: DatabasePool or asyncpg pool providing acquire()
+        """
+        super().__init__()
+        self.pool = pool
+
+    async def _load_last_run(self) -> Optional[Tuple[RunInfo, Dict[str, JournalEntry]]]:
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow(
+                """
+                SELECT id::text AS run_id, documents_folder, clean,
+                       started_at::text AS started_at, finished_at::text AS finished_at
+                FROM ingestion_runs
+                ORDER BY started_at DESC
+                LIMIT 1
+                """
+            )
+            if row is None:
+                return None
+
+            rows = await conn.fetch(
+                """
+                SELECT source, state, content_hash, title, file_size, mtime_ns
+                FROM ingestion_journal
+                WHERE run_id = $1::uuid
+                """,
+                row["run_id"]
+            )
+
+        return RunInfo(**dict(row)), {r["source"]: JournalEntry(**dict(r)) for r in rows}
+
+    async def _begin(self, run: RunInfo):
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                # Only the latest run is kept; its entries cascade
+                await conn.execute("DELETE FROM ingestion_runs")
+                await conn.execute(
+                    """
+                    INSERT INTO ingestion_runs (id, documents_folder, clean, started_at)
+                    VALUES ($1::uuid, $2, $3, $4::timestamptz)
+                    """,
+                    run.run_id,
+                    run.documents_folder,
+                    run.clean,
+                    run.started_at
+                )
+
+    async def _write(self, entry: JournalEntry, conn):
+        if conn is not None:
+            await self._upsert(conn, entry)
+            return
+
+        async with self.pool.acquire() as conn:
+            await self._upsert(conn, entry)
+
+    async def _upsert(self, conn, entry: JournalEntry):
+        await conn.execute(
+            """
+            INSERT INTO ingestion_journal (run_id, source, state, content_hash, title, file_size, mtime_ns)
+            VALUES ($1::uuid, $2, $3, $4, $5, $6, $7)
+            ON CONFLICT (run_id, source) DO UPDATE SET
+                state = EXCLUDED.state,
+                content_hash = EXCLUDED.content_hash,
+                title = EXCLUDED.title,
+                file_size = EXCLUDED.file_size,
+                mtime_ns = EXCLUDED.mtime_ns,
+                updated_at = CURRENT_TIMESTAMP
+            """,
+            self.run.run_id,
+            entry.source,
+            entry.state,
+            entry.content_hash,
+            entry.title,
+            entry.file_size,
+            entry.mtime_ns
+        )
+
+    async def _finish(self, run: RunInfo):
+        async with self.pool.acquire() as conn:
+            await conn.execute(
+                "UPDATE ingestion_runs SET finished_at = $2::timestamptz WHERE id = $1::uuid",
+                run.run_id,
+                run.finished_at
+            )
+
+
+def default_journal_path(documents_folder: str) -> str:
+    """
+    Journal file of a documents folder.
+
+    The journal is kept beside the folder rather than in the working
+    directory, one per folder, so runs of different folders do not
+    overwrite each other's progress.
+
+    Args:
+        documents_folder: Folder being ingested
+
+    Returns:
+        Path of the form "<parent>/.<folder name>.ingest_journal.jsonl"
+    """
+    folder = os.path.abspath(documents_folder)
+    return os.path.join(os.path.dirname(folder), f".{os.path.basename(folder)}.ingest_journal.jsonl")
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def create_run_journal(
+    backend: str = "none",
+    path: Optional[str] = None,
+    pool=None
+) -> Optional[RunJournal]:
+    """
+    Create a run journal backend.
+
+    Args:
+        backend: One of "none", "file", "postgres"
+        path: Journal file path (file backend)
+        pool: Database pool (postgres backend)
+
+    Returns:
+        Journal, or None when journaling is disabled
+    """
+    if backend == "none":
+        return None
+    if backend == "file":
+        return FileRunJournal(path or ".ingest_journal.jsonl")
+    if backend == "postgres":
+        if pool is None:
+            raise ValueError("Postgres run journal requires a database pool")
+        return PostgresRunJournal(pool)
+
+    raise ValueError(f"Unknown run journal backend: {backend}")
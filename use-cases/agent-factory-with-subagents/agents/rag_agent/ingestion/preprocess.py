@@ -0,0 +1,138 @@
+"""
+CPU-bound document preparation that can run in worker processes.
+
+Everything here is a top-level function of picklable arguments, so the
+ingestion pipeline can hand it to a ProcessPoolExecutor and get compact
+results back: document text and metadata plus chunk spans, rather than
+chunk objects.
+"""
+
+import os
+import hashlib
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from .chunker import ChunkingConfig, SimpleChunker
+from .structure import MarkdownSection, scan_markdown
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PreparedDocument:
+    """A document read and pre-chunked outside the event loop."""
+    source: str
+    title: str
+    content_hash: str
+    content: Optional[str] = None
+    metadata: Optional[Dict[str, Any]] = None
+    chunk_spans: Optional[List[Tuple[int, int]]] = None
+    sections: Optional[List[MarkdownSection]] = None
+    skipped: bool = False
+
+
+def read_document(file_path: str) -> str:
+    """Read document content from file."""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except UnicodeDecodeError:
+        # Try with different encoding
+        with open(file_path, 'r', encoding='latin-1') as f:
+            return f.read()
+
+
+def hash_content(content: str) -> str:
+    """Hash document content for change detection."""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def extract_title(content: str, file_path: str) -> str:
+    """Extract title from document content or filename."""
+    # Try to find markdown title
+    lines = content.split('\n', 10)
+    for line in lines[:10]:  # Check first 10 lines
+        line = line.strip()
+        if line.startswith('# '):
+            return line[2:].strip()
+
+    # Fallback to filename
+    return os.path.splitext(os.path.basename(file_path))[0]
+
+
+def extract_document_metadata(content: str, file_path: str) -> Dict[str, Any]:
+    """Extract metadata from document content."""
+    metadata = {
+        "file_path": file_path,
+        "file_size": len(content),
+        "ingestion_date": datetime.now().isoformat()
+    }
+
+    # Try to extract YAML frontmatter
+    if content.startswith('---'):
+        try:
+            import yaml
+            end_marker = content.find('\n---\n', 4)
+            if end_marker != -1:
+                frontmatter = content[4:end_marker]
+                yaml_metadata = yaml.safe_load(frontmatter)
+                if isinstance(yaml_metadata, dict):
+                    metadata.update(yaml_metadata)
+        except ImportError:
+            logger.warning("PyYAML not installed, skipping frontmatter extraction")
+        except Exception as e:
+            logger.warning(f"Failed to parse frontmatter: {e}")
+
+    # Extract some basic metadata from content
+    metadata['line_count'] = content.count('\n') + 1
+    metadata['word_count'] = len(content.split())
+
+    return metadata
+
+
+def prepare_document(
+    file_path: str,
+    source: str,
+    known_hash: Optional[str],
+    chunking_config: ChunkingConfig
+) -> PreparedDocument:
+    """
+    Read, hash and pre-chunk one document.
+
+    Rule-based chunking is done here in full; for semantic chunking only
+    the structure scan is, since the rest needs the LLM or embeddings.
+
+    Args:
+        file_path: Path of the markdown file
+        source: Document source stored in the database
+        known_hash: Content hash stored for this source, if any
+        chunking_config: Chunking configuration of the pipeline
+
+    Returns:
+        Prepared document, with skipped=True (and no content) if the
+        content hash equals known_hash
+    """
+    content = read_document(file_path)
+    content_hash = hash_content(content)
+    title = extract_title(content, file_path)
+
+    # Unchanged documents are not parsed or chunked at all
+    if known_hash == content_hash:
+        return PreparedDocument(source=source, title=title, content_hash=content_hash, skipped=True)
+
+    prepared = PreparedDocument(
+        source=source,
+        title=title,
+        content_hash=content_hash,
+        content=content,
+        metadata=extract_document_metadata(content, file_path)
+    )
+
+    if chunking_config.use_semantic_splitting:
+        prepared.sections = list(scan_markdown(content))
+    else:
+        prepared.chunk_spans = SimpleChunker(chunking_config).split_spans(content)
+
+    return prepared
@@ -0,0 +1,145 @@
+"""
+Bounded-queue stages for the streaming ingestion pipeline.
+"""
+
+import time
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a stage's input
+_STOP = object()
+
+
+@dataclass
+class StageStats:
+    """Throughput and queue statistics for one stage."""
+    name: str
+    workers: int
+    processed: int = 0
+    failed: int = 0
+    busy_seconds: float = 0.0
+    max_queue_depth: int = 0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def elapsed_seconds(self) -> float:
+        """Wall time the stage has been running."""
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.perf_counter()) - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        """Items completed per second of wall time."""
+        elapsed = self.elapsed_seconds
+        return self.processed / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def utilization(self) -> float:
+        """Fraction of worker time spent processing items."""
+        capacity = self.elapsed_seconds * self.workers
+        return self.busy_seconds / capacity if capacity > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.name}: {self.processed} done, {self.failed} failed, "
+            f"{self.throughput:.1f}/s, {self.workers} workers at {self.utilization:.0%}, "
+            f"max queue depth {self.max_queue_depth}"
+        )
+
+
+class PipelineStage:
+    """
+    A pipeline stage: a pool of workers between two bounded queues.
+
+    Each worker takes an item from ``input_queue``, awaits ``handler(item)``
+    and puts the returned item on ``output_queue``. Returning None drops the
+    item (e.g. it was fully handled). Because queues are bounded, a slow
+    stage blocks its upstream instead of letting items pile up in memory.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[Any], Awaitable[Any]],
+        workers: int,
+        input_queue: asyncio.Queue,
+        output_queue: Optional[asyncio.Queue] = None,
+        on_error: Optional[Callable[[Any, Exception], None]] = None
+    ):
+        """
+        Initialize stage.
+
+        Args:
+            name: Stage name used in stats and logs
+            handler: Coroutine function processing one item
+            workers: Number of concurrent workers
+            input_queue: Queue the stage consumes
+            output_queue: Queue the stage feeds (None for the last stage)
+            on_error: Called with (item, exception) when the handler fails
+        """
+        self.name = name
+        self.handler = handler
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+        self.on_error = on_error
+        self.stats = StageStats(name=name, workers=max(1, workers))
+
+    async def run(self):
+        """Run all workers until the input is exhausted, then close the output."""
+        self.stats.started_at = time.perf_counter()
+
+        await asyncio.gather(*(self._worker() for _ in range(self.stats.workers)))
+
+        self.stats.finished_at = time.perf_counter()
+        if self.output_queue is not None:
+            await self.output_queue.put(_STOP)
+
+    async def _worker(self):
+        while True:
+            item = await self.input_queue.get()
+            if item is _STOP:
+                # Leave the marker for sibling workers
+                await self.input_queue.put(_STOP)
+                return
+
+            self.stats.max_queue_depth = max(self.stats.max_queue_depth, self.input_queue.qsize() + 1)
+            start_time = time.perf_counter()
+
+            try:
+                result = await self.handler(item)
+            except Exception as e:
+                self.stats.failed += 1
+                if self.on_error:
+                    self.on_error(item, e)
+                else:
+                    logger.error(f"Stage {self.name} failed: {e}")
+                continue
+            finally:
+                self.stats.busy_seconds += time.perf_counter() - start_time
+
+            self.stats.processed += 1
+            if result is not None and self.output_queue is not None:
+                await self.output_queue.put(result)
+
+
+async def feed_queue(queue: asyncio.Queue, items):
+    """Put items on a stage's input queue (blocking when full), then close it."""
+    for item in items:
+        await queue.put(item)
+    await queue.put(_STOP)
+
+
+async def report_progress(stages: List[PipelineStage], interval: float):
+    """Log queue depth and throughput of every stage until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        logger.info(" | ".join(
+            f"{stage.name} q={stage.input_queue.qsize()} {stage.stats.throughput:.1f}/s"
+            for stage in stages
+        ))
@@ -0,0 +1,208 @@
+"""
+Constant-memory reading and chunking of very large documents.
+"""
+
+import re
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import Iterator, List, Tuple
+
+from .chunker import trim_span
+
+logger = logging.getLogger(__name__)
+
+# Characters read per block
+STREAM_BLOCK_SIZE = 1024 * 1024
+
+# Characters of the document start kept for title and frontmatter
+HEAD_SIZE = 64 * 1024
+
+_PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+
+
+@dataclass
+class StreamStats:
+    """Content hash and counts of a file, gathered in one streaming pass."""
+    content_hash: str
+    encoding: str
+    char_count: int
+    line_count: int
+    word_count: int
+    head: str
+
+
+def scan_file(file_path: str, block_size: int = STREAM_BLOCK_SIZE) -> StreamStats:
+    """
+    Hash and count a file without loading it.
+
+    The hash equals ``sha256(content.encode("utf-8"))`` of the fully read
+    document, so streamed and in-memory ingestion agree on whether a
+    document changed.
+
+    Args:
+        file_path: Path of the file
+        block_size: Characters read per block
+
+    Returns:
+        Stream statistics, including the first HEAD_SIZE characters
+    """
+    try:
+        return _scan_file(file_path, 'utf-8', block_size)
+    except UnicodeDecodeError:
+        # Try with different encoding
+        return _scan_file(file_path, 'latin-1', block_size)
+
+
+def _scan_file(file_path: str, encoding: str, block_size: int) -> StreamStats:
+    digest = hashlib.sha256()
+    char_count = 0
+    newline_count = 0
+    word_count = 0
+    head_parts: List[str] = []
+    head_size = 0
+    in_word = False
+
+    with open(file_path, 'r', encoding=encoding) as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+
+            digest.update(block.encode('utf-8'))
+            char_count += len(block)
+            newline_count += block.count('\n')
+
+            # A word split across two blocks is counted once
+            word_count += len(block.split())
+            if in_word and not block[0].isspace():
+                word_count -= 1
+            in_word = not block[-1].isspace()
+
+            if head_size < HEAD_SIZE:
+                head_parts.append(block[:HEAD_SIZE - head_size])
+                head_size += len(head_parts[-1])
+
+    return StreamStats(
+        content_hash=digest.hexdigest(),
+        encoding=encoding,
+        char_count=char_count,
+        line_count=newline_count + 1,
+        word_count=word_count,
+        head="".join(head_parts)
+    )
+
+
+def iter_chunks(
+    file_path: str,
+    encoding: str,
+    chunk_size: int,
+    max_chunk_size: int,
+    block_size: int = STREAM_BLOCK_SIZE
+) -> Iterator[Tuple[int, str]]:
+    """
+    Chunk a file through a sliding window over its text.
+
+    Paragraphs are grouped into chunks of up to ``chunk_size`` characters as
+    SimpleChunker does; paragraphs longer than ``max_chunk_size`` (e.g. logs
+    without blank lines) are cut at line breaks. Only the current chunk and
+    one block are held in memory.
+
+    Args:
+        file_path: Path of the file
+        encoding: Text encoding (from scan_file)
+        chunk_size: Target chunk size in characters
+        max_chunk_size: Paragraph size above which paragraphs are cut
+        block_size: Characters read per block
+
+    Yields:
+        (start offset in the document, chunk text), in document order
+    """
+    buffer = ""
+    base = 0            # Document offset of buffer[0]
+    pos = 0             # Buffer index where the next paragraph starts
+    chunk_start = -1    # Buffer span of the chunk being built
+    chunk_end = -1
+    eof = False
+
+    with open(file_path, 'r', encoding=encoding) as f:
+        while not eof:
+            block = f.read(block_size)
+            eof = not block
+            buffer += block
+
+            # Collect complete paragraphs from the window
+            paragraphs: List[Tuple[int, int]] = []
+            no_break = False
+            while True:
+                # Once a search fails, the rest of this window has no break
+                match = None if no_break else _PARAGRAPH_BREAK.search(buffer, pos)
+                no_break = match is None
+                # A break touching the window end may continue in the next block
+                if match and (match.end() < len(buffer) or eof):
+                    paragraphs.extend(_cut_paragraph(buffer, pos, match.start(), chunk_size, max_chunk_size))
+                    pos = match.end()
+                elif eof:
+                    paragraphs.extend(_cut_paragraph(buffer, pos, len(buffer), chunk_size, max_chunk_size))
+                    pos = len(buffer)
+                    break
+                elif not match and len(buffer) - pos > max_chunk_size:
+                    # No paragraph break in sight: cut what cannot be grouped anyway
+                    cut = buffer.rfind('\n', pos + 1, pos + chunk_size)
+                    if cut == -1:
+                        cut = pos + chunk_size
+                    paragraphs.append((pos, cut))
+                    pos = cut
+                else:
+                    break
+
+            for start, end in paragraphs:
+                start, end = trim_span(buffer, start, end)
+                if start == end:
+                    continue
+
+                # Check if adding this paragraph exceeds chunk size
+                if chunk_start >= 0 and end - chunk_start <= chunk_size:
+                    chunk_end = end
+                    continue
+
+                if chunk_start >= 0:
+                    yield base + chunk_start, buffer[chunk_start:chunk_end]
+
+                chunk_start, chunk_end = start, end
+
+            # Slide the window past everything already emitted
+            keep_from = chunk_start if chunk_start >= 0 else pos
+            if keep_from > 0:
+                buffer = buffer[keep_from:]
+                base += keep_from
+                pos -= keep_from
+                if chunk_start >= 0:
+                    chunk_start -= keep_from
+                    chunk_end -= keep_from
+
+    if chunk_start >= 0:
+        yield base + chunk_start, buffer[chunk_start:chunk_end]
+
+
+def _cut_paragraph(
+    text: str,
+    start: int,
+    end: int,
+    chunk_size: int,
+    max_chunk_size: int
+) -> List[Tuple[int, int]]:
+    """Split a paragraph longer than max_chunk_size at line breaks."""
+    if end - start <= max_chunk_size:
+        return [(start, end)]
+
+    pieces = []
+    while end - start > chunk_size:
+        cut = text.rfind('\n', start + 1, start + chunk_size)
+        if cut == -1:
+            cut = start + chunk_size
+        pieces.append((start, cut))
+        start = cut
+    pieces.append((start, end))
+
+    return pieces
@@ -0,0 +1,118 @@
+"""
+Single-pass markdown structure scanner for chunking.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+# Line prefixes (after leading whitespace) that start a block
+_HEADING = re.compile(r"#{1,6}(?:\s|$)")
+_LIST_ITEM = re.compile(r"(?:[-*+]|\d+[.)])\s")
+_FENCE = re.compile(r"`{3,}|~{3,}")
+
+SECTION_KINDS = ("heading", "paragraph", "list_item", "code", "table")
+
+
+@dataclass
+class MarkdownSection:
+    """A structural block of a markdown document."""
+    kind: str
+    start: int
+    end: int
+
+    def text(self, content: str) -> str:
+        """Return the section's text from the document it was scanned from."""
+        return content[self.start:self.end]
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+
+def scan_markdown(content: str) -> Iterator[MarkdownSection]:
+    """
+    Scan markdown into structural sections in one pass over its lines.
+
+    Headings are single-line sections; paragraphs and list items run until
+    a blank line or the next block; fenced code blocks (``` or ~~~) and
+    tables (consecutive lines starting with "|") are always kept whole,
+    whatever they contain. Offsets exclude surrounding whitespace, and the
+    scan is linear in the document length.
+
+    Args:
+        content: Markdown text
+
+    Yields:
+        Sections in document order with [start, end) character offsets
+    """
+    length = len(content)
+    pos = 0
+
+    kind: Optional[str] = None
+    start = end = 0
+    fence: Optional[str] = None
+
+    while pos < length:
+        newline = content.find("\n", pos)
+        line_end = length if newline == -1 else newline
+        next_pos = line_end + 1
+
+        line = content[pos:line_end]
+        stripped = line.strip()
+
+        if fence is not None:
+            if stripped:
+                end = pos + len(line.rstrip())
+            # A closing fence uses the same character, at least as many times
+            if stripped.startswith(fence) and stripped.count(fence[0]) == len(stripped):
+                yield MarkdownSection(kind, start, end)
+                kind = None
+                fence = None
+            pos = next_pos
+            continue
+
+        if not stripped:
+            if kind is not None:
+                yield MarkdownSection(kind, start, end)
+                kind = None
+            pos = next_pos
+            continue
+
+        line_start = pos + len(line) - len(line.lstrip())
+        content_end = pos + len(line.rstrip())
+
+        fence_match = _FENCE.match(stripped)
+        if fence_match:
+            if kind is not None:
+                yield MarkdownSection(kind, start, end)
+            kind, start, end = "code", line_start, content_end
+            fence = fence_match.group(0)
+        elif stripped[0] == "|":
+            if kind != "table":
+                if kind is not None:
+                    yield MarkdownSection(kind, start, end)
+                kind, start = "table", line_start
+            end = content_end
+        elif _HEADING.match(stripped):
+            if kind is not None:
+                yield MarkdownSection(kind, start, end)
+                kind = None
+            yield MarkdownSection("heading", line_start, content_end)
+        elif _LIST_ITEM.match(stripped):
+            if kind is not None:
+                yield MarkdownSection(kind, start, end)
+            kind, start, end = "list_item", line_start, content_end
+        else:
+            # Plain text continues a paragraph or list item
+            if kind not in ("paragraph", "list_item"):
+                if kind is not None:
+                    yield MarkdownSection(kind, start, end)
+                kind, start = "paragraph", line_start
+            end = content_end
+
+        pos = next_pos
+
+    # Unterminated blocks (including an unclosed fence) run to the end
+    if kind is not None:
+        yield MarkdownSection(kind, start, end)
+
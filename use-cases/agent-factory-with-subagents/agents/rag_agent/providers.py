@@ -1,23 +1,32 @@
 """Model providers for Semantic Search Agent."""
 
-from typing import Optional
-from pydantic_ai.providers.openai import OpenAIProvider
-from pydantic_ai.models.openai import OpenAIModel
-from settings import load_settings
+from functools import lru_cache
+from typing import Optional, TYPE_CHECKING
+from settings import get_settings
 
+if TYPE_CHECKING:
+    from pydantic_ai.models.openai import OpenAIModel
 
-def get_llm_model(model_choice: Optional[str] = None) -> OpenAIModel:
+
+@lru_cache(maxsize=None)
+def get_llm_model(model_choice: Optional[str] = None) -> "OpenAIModel":
     """
     Get LLM model configuration based on environment variables.
     Supports any OpenAI-compatible API provider.
     
+    The model is created on first use and shared afterwards; the OpenAI
+    client libraries are only imported then.
+    
     Args:
         model_choice: Optional override for model choice
     
     Returns:
         Configured OpenAI-compatible model
     """
-    settings = load_settings()
+    from pydantic_ai.providers.openai import OpenAIProvider
+    from pydantic_ai.models.openai import OpenAIModel
+    
+    settings = get_settings()
     
     llm_choice = model_choice or settings.llm_model
     base_url = settings.llm_base_url
@@ -29,7 +38,8 @@ def get_llm_model(model_choice: Optional[str] = None) -> OpenAIModel:
     return OpenAIModel(llm_choice, provider=provider)
 
 
-def get_embedding_model() -> OpenAIModel:
+@lru_cache(maxsize=1)
+def get_embedding_model() -> "OpenAIModel":
     """
     Get embedding model configuration.
     Uses OpenAI embeddings API (or compatible provider).
@@ -37,7 +47,10 @@ def get_embedding_model() -> OpenAIModel:
     Returns:
         Configured embedding model
     """
-    settings = load_settings()
+    from pydantic_ai.providers.openai import OpenAIProvider
+    from pydantic_ai.models.openai import OpenAIModel
+    
+    settings = get_settings()
     
     # For embeddings, use the same provider configuration
     provider = OpenAIProvider(
@@ -55,7 +68,7 @@ def get_model_info() -> dict:
     Returns:
         Dictionary with model configuration info
     """
-    settings = load_settings()
+    settings = get_settings()
     
     return {
         "llm_provider": settings.llm_provider,
@@ -3,7 +3,8 @@
 from pydantic_settings import BaseSettings
 from pydantic import Field, ConfigDict
 from dotenv import load_dotenv
-from typing import Optional
+from functools import lru_cache
+from typing import Literal, Optional
 
 # Load environment variables from .env file
 load_dotenv()
@@ -62,6 +63,73 @@ class Settings(BaseSettings):
         description="Default text weight for hybrid search (0-1)"
     )
     
+    hybrid_fusion: Literal["weighted", "rrf"] = Field(
+        default="weighted",
+        description="How hybrid search fuses vector and keyword candidates: weighted scores or reciprocal rank fusion"
+    )
+    
+    hybrid_candidates: int = Field(
+        default=40,
+        ge=1,
+        description="Candidates hybrid search takes from each index before fusing"
+    )
+    
+    keyword_candidates: int = Field(
+        default=100,
+        ge=1,
+        description="Full-text matches keyword search scores with BM25"
+    )
+    
+    search_quantization: Literal["none", "halfvec", "binary"] = Field(
+        default="none",
+        description="Two-stage search: over-fetch by halfvec or binary distance, then rescore exactly (none: exact only)"
+    )
+    
+    rescore_factor: int = Field(
+        default=4,
+        ge=1,
+        description="Candidates fetched from the quantized index per requested result"
+    )
+    
+    # Vector Index Configuration (rebuild with `python -m utils.vector_index`)
+    vector_index_type: Literal["hnsw", "ivfflat", "exact"] = Field(
+        default="hnsw",
+        description="Index on chunk embeddings: hnsw, ivfflat or exact (no index)"
+    )
+    
+    hnsw_m: int = Field(
+        default=16,
+        ge=2,
+        le=100,
+        description="HNSW connections per node (higher: better recall, larger index)"
+    )
+    
+    hnsw_ef_construction: int = Field(
+        default=64,
+        ge=4,
+        le=1000,
+        description="HNSW candidate list size while building (higher: better graph, slower build)"
+    )
+    
+    hnsw_ef_search: int = Field(
+        default=40,
+        ge=1,
+        le=1000,
+        description="Default HNSW candidate list size per query"
+    )
+    
+    ivfflat_lists: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="ivfflat list count (default: rows/1000, sqrt(rows) above 1M rows)"
+    )
+    
+    ivfflat_probes: int = Field(
+        default=10,
+        ge=1,
+        description="Default ivfflat lists scanned per query"
+    )
+    
     # Connection Pool Configuration
     db_pool_min_size: int = Field(
         default=10,
@@ -83,6 +151,24 @@ class Settings(BaseSettings):
         default=1536,
         description="Embedding vector dimension"
     )
+    
+    # Query embedding cache, shared by all sessions of the process
+    query_cache_enabled: bool = Field(
+        default=True,
+        description="Cache query embeddings instead of embedding repeated queries again"
+    )
+    
+    query_cache_max_mb: int = Field(
+        default=32,
+        ge=1,
+        description="Memory budget of the query embedding cache in MB"
+    )
+    
+    query_cache_ttl_seconds: float = Field(
+        default=3600,
+        ge=0,
+        description="Time-to-live of cached query embeddings (0 keeps them until evicted)"
+    )
 
 
 def load_settings() -> Settings:
@@ -95,4 +181,15 @@ def load_settings() -> Settings:
             error_msg += "\nMake sure to set DATABASE_URL in your .env file"
         if "openai_api_key" in str(e).lower():
             error_msg += "\nMake sure to set OPENAI_API_KEY in your .env file"
-        raise ValueError(error_msg) from e
\ No newline at end of file
+        raise ValueError(error_msg) from e
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Get the process-wide settings, loading them on first use.
+    
+    Use load_settings() to re-read the environment; call
+    get_settings.cache_clear() to make this pick up changes.
+    """
+    return load_settings()
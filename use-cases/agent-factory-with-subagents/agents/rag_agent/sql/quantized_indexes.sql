@@ -0,0 +1,14 @@
+-- Optional compact indexes for two-stage search (requires pgvector 0.7+).
+-- Enable with SEARCH_QUANTIZATION=halfvec or binary; see match_chunks_rescored.
+--
+-- Both are expression indexes over chunks.embedding, so every row written
+-- by ingestion is indexed without storing a second copy of its vector:
+--   halfvec: 16-bit floats, ~3 KB per 1536-d vector instead of ~6 KB
+--   binary:  one bit per dimension, 192 bytes per vector
+-- Create only the one you search with; each slows down ingestion writes.
+
+CREATE INDEX IF NOT EXISTS idx_chunks_embedding_halfvec
+    ON chunks USING hnsw ((embedding::halfvec(1536)) halfvec_cosine_ops);
+
+CREATE INDEX IF NOT EXISTS idx_chunks_embedding_binary
+    ON chunks USING hnsw ((binary_quantize(embedding)::bit(1536)) bit_hamming_ops);
@@ -2,23 +2,35 @@ CREATE EXTENSION IF NOT EXISTS vector;
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 CREATE EXTENSION IF NOT EXISTS pg_trgm;
 
+DROP TABLE IF EXISTS ingestion_journal CASCADE;
+DROP TABLE IF EXISTS ingestion_runs CASCADE;
 DROP TABLE IF EXISTS chunks CASCADE;
 DROP TABLE IF EXISTS documents CASCADE;
 DROP INDEX IF EXISTS idx_chunks_embedding;
 DROP INDEX IF EXISTS idx_chunks_document_id;
 DROP INDEX IF EXISTS idx_documents_metadata;
+DROP INDEX IF EXISTS idx_documents_source;
 DROP INDEX IF EXISTS idx_chunks_content_trgm;
+DROP INDEX IF EXISTS idx_chunks_content_hash;
+DROP INDEX IF EXISTS idx_chunks_content_tsv;
+-- Earlier signatures of hybrid search
+DROP FUNCTION IF EXISTS hybrid_search(vector, text, int, float);
+DROP FUNCTION IF EXISTS hybrid_search_rescored(vector, text, int, float, text, int);
 
 CREATE TABLE documents (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     title TEXT NOT NULL,
     source TEXT NOT NULL,
+    -- Absolute path of the documents folder that source is relative to
+    source_root TEXT NOT NULL DEFAULT '',
     content TEXT NOT NULL,
     metadata JSONB DEFAULT '{}',
+    content_hash TEXT,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+CREATE UNIQUE INDEX idx_documents_source ON documents (source_root, source);
 CREATE INDEX idx_documents_metadata ON documents USING GIN (metadata);
 CREATE INDEX idx_documents_created_at ON documents (created_at DESC);
 
@@ -30,13 +42,48 @@ CREATE TABLE chunks (
     chunk_index INTEGER NOT NULL,
     metadata JSONB DEFAULT '{}',
     token_count INTEGER,
+    content_hash TEXT,
+    -- Maintained by Postgres on every insert/update, including COPY
+    content_tsv tsvector GENERATED ALWAYS AS (to_tsvector('english', content)) STORED,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
-CREATE INDEX idx_chunks_embedding ON chunks USING ivfflat (embedding vector_cosine_ops) WITH (lists = 1);
+-- Matches the default settings; rebuild for other strategies with `python -m utils.vector_index`
+CREATE INDEX idx_chunks_embedding ON chunks USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
 CREATE INDEX idx_chunks_document_id ON chunks (document_id);
 CREATE INDEX idx_chunks_chunk_index ON chunks (document_id, chunk_index);
+CREATE INDEX idx_chunks_content_hash ON chunks (document_id, content_hash);
 CREATE INDEX idx_chunks_content_trgm ON chunks USING GIN (content gin_trgm_ops);
+CREATE INDEX idx_chunks_content_tsv ON chunks USING GIN (content_tsv);
+
+-- Content-addressed embedding cache shared by ingestion workers.
+-- Not dropped above so paid-for embeddings survive schema resets.
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    cache_key TEXT PRIMARY KEY,
+    embedding BYTEA NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Per-file progress of the latest ingestion run, for --resume.
+CREATE TABLE ingestion_runs (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    documents_folder TEXT NOT NULL,
+    clean BOOLEAN NOT NULL DEFAULT FALSE,
+    started_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    finished_at TIMESTAMP WITH TIME ZONE
+);
+
+CREATE TABLE ingestion_journal (
+    run_id UUID NOT NULL REFERENCES ingestion_runs(id) ON DELETE CASCADE,
+    source TEXT NOT NULL,
+    state TEXT NOT NULL CHECK (state IN ('pending', 'chunked', 'embedded', 'committed')),
+    content_hash TEXT,
+    title TEXT,
+    file_size BIGINT,
+    mtime_ns BIGINT,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (run_id, source)
+);
 
 CREATE OR REPLACE FUNCTION match_chunks(
     query_embedding vector(1536),
@@ -71,11 +118,85 @@ BEGIN
 END;
 $$;
 
+-- Two-stage search: over-fetch candidates by a compact quantized distance
+-- (served by the indexes in quantized_indexes.sql), then rescore them with
+-- the exact full-precision distance. quantization is 'halfvec' or 'binary'.
+CREATE OR REPLACE FUNCTION match_chunks_rescored(
+    query_embedding vector(1536),
+    match_count INT DEFAULT 10,
+    quantization TEXT DEFAULT 'halfvec',
+    candidate_count INT DEFAULT 40
+)
+RETURNS TABLE (
+    chunk_id UUID,
+    document_id UUID,
+    content TEXT,
+    similarity FLOAT,
+    metadata JSONB,
+    document_title TEXT,
+    document_source TEXT
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    candidate_ids UUID[];
+BEGIN
+    -- ORDER BY expressions must match the index expressions exactly
+    IF quantization = 'binary' THEN
+        SELECT array_agg(q.id) INTO candidate_ids FROM (
+            SELECT c.id
+            FROM chunks c
+            WHERE c.embedding IS NOT NULL
+            ORDER BY binary_quantize(c.embedding)::bit(1536) <~> binary_quantize(query_embedding)
+            LIMIT candidate_count
+        ) q;
+    ELSIF quantization = 'halfvec' THEN
+        SELECT array_agg(q.id) INTO candidate_ids FROM (
+            SELECT c.id
+            FROM chunks c
+            WHERE c.embedding IS NOT NULL
+            ORDER BY c.embedding::halfvec(1536) <=> query_embedding::halfvec(1536)
+            LIMIT candidate_count
+        ) q;
+    ELSE
+        RAISE EXCEPTION 'Unknown quantization: %', quantization;
+    END IF;
+
+    RETURN QUERY
+    SELECT 
+        c.id AS chunk_id,
+        c.document_id,
+        c.content,
+        1 - (c.embedding <=> query_embedding) AS similarity,
+        c.metadata,
+        d.title AS document_title,
+        d.source AS document_source
+    FROM chunks c
+    JOIN documents d ON c.document_id = d.id
+    WHERE c.id = ANY(candidate_ids)
+    ORDER BY c.embedding <=> query_embedding
+    LIMIT match_count;
+END;
+$$;
+
+-- Hybrid search fusing the top candidate_count chunks of each index: the
+-- vector index (or the quantized indexes, see match_chunks_rescored) and
+-- the GIN index on content_tsv. Only candidates are scored, so latency
+-- depends on candidate_count rather than corpus size.
+--   fusion = 'weighted': (1 - text_weight) * vector similarity + text_weight * text rank
+--   fusion = 'rrf':      reciprocal rank fusion, each list weighted the same way
+-- vector_similarity and text_similarity are computed for every candidate,
+-- including those found by only one index.
 CREATE OR REPLACE FUNCTION hybrid_search(
     query_embedding vector(1536),
     query_text TEXT,
     match_count INT DEFAULT 10,
-    text_weight FLOAT DEFAULT 0.3
+    text_weight FLOAT DEFAULT 0.3,
+    fusion TEXT DEFAULT 'weighted',
+    candidate_count INT DEFAULT 40,
+    quantization TEXT DEFAULT 'none',
+    rescore_factor INT DEFAULT 4,
+    rrf_k INT DEFAULT 60
 )
 RETURNS TABLE (
     chunk_id UUID,
@@ -90,48 +211,201 @@ RETURNS TABLE (
 )
 LANGUAGE plpgsql
 AS $$
+DECLARE
+    vector_ids UUID[];
+    text_query tsquery := plainto_tsquery('english', query_text);
 BEGIN
+    IF fusion NOT IN ('weighted', 'rrf') THEN
+        RAISE EXCEPTION 'Unknown fusion: %', fusion;
+    END IF;
+
+    -- Vector candidates, best first
+    IF quantization = 'none' THEN
+        SELECT array_agg(m.chunk_id ORDER BY m.similarity DESC) INTO vector_ids
+        FROM match_chunks(query_embedding, candidate_count) m;
+    ELSE
+        SELECT array_agg(m.chunk_id ORDER BY m.similarity DESC) INTO vector_ids
+        FROM match_chunks_rescored(query_embedding, candidate_count, quantization, candidate_count * rescore_factor) m;
+    END IF;
+
     RETURN QUERY
-    WITH vector_results AS (
+    WITH vector_candidates AS (
+        SELECT v.id, v.rank
+        FROM unnest(COALESCE(vector_ids, '{}'::uuid[])) WITH ORDINALITY AS v(id, rank)
+    ),
+    text_candidates AS (
+        SELECT t.id, row_number() OVER (ORDER BY t.text_rank DESC) AS rank
+        FROM (
+            SELECT c.id, ts_rank_cd(c.content_tsv, text_query) AS text_rank
+            FROM chunks c
+            WHERE c.content_tsv @@ text_query
+            ORDER BY text_rank DESC
+            LIMIT candidate_count
+        ) t
+    ),
+    fused AS (
         SELECT 
-            c.id AS chunk_id,
+            COALESCE(v.id, t.id) AS id,
+            v.rank AS vector_rank,
+            t.rank AS text_rank
+        FROM vector_candidates v
+        FULL OUTER JOIN text_candidates t ON v.id = t.id
+    ),
+    scored AS (
+        SELECT 
+            c.id,
             c.document_id,
             c.content,
-            1 - (c.embedding <=> query_embedding) AS vector_sim,
+            COALESCE(1 - (c.embedding <=> query_embedding), 0)::float8 AS vector_sim,
+            ts_rank_cd(c.content_tsv, text_query)::float8 AS text_sim,
+            f.vector_rank,
+            f.text_rank,
             c.metadata,
-            d.title AS doc_title,
-            d.source AS doc_source
-        FROM chunks c
+            d.title,
+            d.source
+        FROM fused f
+        JOIN chunks c ON c.id = f.id
         JOIN documents d ON c.document_id = d.id
-        WHERE c.embedding IS NOT NULL
     ),
-    text_results AS (
+    ranked AS (
         SELECT 
+            s.*,
+            (CASE WHEN fusion = 'rrf' THEN
+                (1 - text_weight) * COALESCE(1.0 / (rrf_k + s.vector_rank), 0)
+                + text_weight * COALESCE(1.0 / (rrf_k + s.text_rank), 0)
+            ELSE
+                s.vector_sim * (1 - text_weight) + s.text_sim * text_weight
+            END)::float8 AS score
+        FROM scored s
+    )
+    SELECT 
+        r.id AS chunk_id,
+        r.document_id,
+        r.content,
+        r.score AS combined_score,
+        r.vector_sim AS vector_similarity,
+        r.text_sim AS text_similarity,
+        r.metadata,
+        r.title AS document_title,
+        r.source AS document_source
+    FROM ranked r
+    ORDER BY r.score DESC
+    LIMIT match_count;
+END;
+$$;
+
+-- Keyword search without a query embedding, for identifiers, error codes
+-- and product names. Chunks matching the query on the GIN index of
+-- content_tsv are ranked by BM25: IDF from per-term document counts on the
+-- same index, document length from token_count. Only the best
+-- candidate_count matches (by ts_rank_cd) are scored. When nothing matches
+-- in full text (e.g. a fragment of an identifier), falls back to trigram
+-- word similarity on idx_chunks_content_trgm.
+CREATE OR REPLACE FUNCTION keyword_search(
+    query_text TEXT,
+    match_count INT DEFAULT 10,
+    candidate_count INT DEFAULT 100,
+    k1 FLOAT DEFAULT 1.2,
+    b FLOAT DEFAULT 0.75
+)
+RETURNS TABLE (
+    chunk_id UUID,
+    document_id UUID,
+    content TEXT,
+    score FLOAT,
+    match_type TEXT,
+    metadata JSONB,
+    document_title TEXT,
+    document_source TEXT
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    text_query tsquery := websearch_to_tsquery('english', query_text);
+    total_chunks FLOAT;
+    avg_length FLOAT;
+BEGIN
+    -- Queries of only stop words have no full-text terms
+    IF numnode(text_query) > 0 THEN
+        -- Planner estimate, kept current by ANALYZE; counted before the first one
+        SELECT GREATEST(c.reltuples, 1) INTO total_chunks FROM pg_class c WHERE c.oid = 'chunks'::regclass;
+        IF total_chunks <= 1 THEN
+            SELECT GREATEST(count(*), 1) INTO total_chunks FROM chunks;
+        END IF;
+
+        -- Average length from a sample of about 2000 rows' pages
+        SELECT avg(s.token_count) INTO avg_length
+        FROM chunks s TABLESAMPLE SYSTEM (LEAST(100, 100.0 * 2000 / total_chunks));
+        IF avg_length IS NULL THEN
+            SELECT avg(s.token_count) INTO avg_length FROM chunks s;
+        END IF;
+        avg_length := GREATEST(COALESCE(avg_length, 1), 1);
+
+        RETURN QUERY
+        WITH terms AS (
+            SELECT t.lexeme, ln(1 + (total_chunks - df.n + 0.5) / (df.n + 0.5)) AS idf
+            FROM unnest(tsvector_to_array(to_tsvector('english', query_text))) AS t(lexeme)
+            CROSS JOIN LATERAL (
+                SELECT count(*)::float8 AS n
+                FROM chunks c
+                WHERE c.content_tsv @@ quote_literal(t.lexeme)::tsquery
+            ) df
+        ),
+        candidates AS (
+            SELECT c.id, c.content_tsv, COALESCE(c.token_count, avg_length) AS doc_length
+            FROM chunks c
+            WHERE c.content_tsv @@ text_query
+            ORDER BY ts_rank_cd(c.content_tsv, text_query, 1) DESC
+            LIMIT candidate_count
+        ),
+        scored AS (
+            SELECT
+                cand.id,
+                sum(
+                    terms.idf * tf.n * (k1 + 1)
+                    / (tf.n + k1 * (1 - b + b * cand.doc_length / avg_length))
+                ) AS bm25
+            FROM candidates cand
+            CROSS JOIN LATERAL (
+                SELECT u.lexeme, array_length(u.positions, 1)::float8 AS n
+                FROM unnest(cand.content_tsv) u
+            ) tf
+            JOIN terms ON terms.lexeme = tf.lexeme
+            GROUP BY cand.id
+        )
+        SELECT
+            c.id AS chunk_id,
+            c.document_id,
+            c.content,
+            s.bm25::float8 AS score,
+            'fulltext'::text AS match_type,
+            c.metadata,
+            d.title AS document_title,
+            d.source AS document_source
+        FROM scored s
+        JOIN chunks c ON c.id = s.id
+        JOIN documents d ON c.document_id = d.id
+        ORDER BY s.bm25 DESC
+        LIMIT match_count;
+    END IF;
+
+    IF NOT FOUND THEN
+        RETURN QUERY
+        SELECT
             c.id AS chunk_id,
             c.document_id,
             c.content,
-            ts_rank_cd(to_tsvector('english', c.content), plainto_tsquery('english', query_text)) AS text_sim,
+            word_similarity(query_text, c.content)::float8 AS score,
+            'trigram'::text AS match_type,
             c.metadata,
-            d.title AS doc_title,
-            d.source AS doc_source
+            d.title AS document_title,
+            d.source AS document_source
         FROM chunks c
         JOIN documents d ON c.document_id = d.id
-        WHERE to_tsvector('english', c.content) @@ plainto_tsquery('english', query_text)
-    )
-    SELECT 
-        COALESCE(v.chunk_id, t.chunk_id) AS chunk_id,
-        COALESCE(v.document_id, t.document_id) AS document_id,
-        COALESCE(v.content, t.content) AS content,
-        (COALESCE(v.vector_sim, 0) * (1 - text_weight) + COALESCE(t.text_sim, 0) * text_weight)::float8 AS combined_score,
-        COALESCE(v.vector_sim, 0)::float8 AS vector_similarity,
-        COALESCE(t.text_sim, 0)::float8 AS text_similarity,
-        COALESCE(v.metadata, t.metadata) AS metadata,
-        COALESCE(v.doc_title, t.doc_title) AS document_title,
-        COALESCE(v.doc_source, t.doc_source) AS document_source
-    FROM vector_results v
-    FULL OUTER JOIN text_results t ON v.chunk_id = t.chunk_id
-    ORDER BY combined_score DESC
-    LIMIT match_count;
+        WHERE query_text <% c.content
+        ORDER BY word_similarity(query_text, c.content) DESC
+        LIMIT match_count;
+    END IF;
 END;
 $$;
 
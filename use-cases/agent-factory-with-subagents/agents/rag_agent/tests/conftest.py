@@ -13,6 +13,7 @@ from ..agent import search_agent
 from ..dependencies import AgentDependencies
 from ..settings import Settings
 from ..tools import SearchResult
+from ..utils.query_cache import QueryEmbeddingCache
 
 
 @pytest.fixture
@@ -39,6 +40,8 @@ def mock_db_pool():
     connection = AsyncMock()
     pool.acquire.return_value.__aenter__.return_value = connection
     pool.acquire.return_value.__aexit__.return_value = None
+    # conn.transaction() is a synchronous call returning an async context manager
+    connection.transaction = MagicMock()
     return pool, connection
 
 
@@ -67,7 +70,9 @@ async def test_dependencies(test_settings, mock_db_pool, mock_openai_client):
         settings=test_settings,
         session_id="test_session",
         user_preferences={},
-        query_history=[]
+        query_history=[],
+        # Per-test cache, so cached queries do not leak between tests
+        embedding_cache=QueryEmbeddingCache()
     )
     
     return deps, connection
@@ -185,7 +190,7 @@ def function_model_with_search(sample_search_results):
 
 @pytest.fixture  
 def mock_database_responses():
-    """Mock database query responses."""
+    """Mock database query responses (JSONB metadata arrives as a JSON string)."""
     return {
         'semantic_search': [
             {
@@ -193,7 +198,7 @@ def mock_database_responses():
                 'document_id': 'doc_1',
                 'content': 'This is a sample chunk about Python programming.',
                 'similarity': 0.85,
-                'metadata': {'page': 1},
+                'metadata': '{"page": 1}',
                 'document_title': 'Python Tutorial', 
                 'document_source': 'tutorial.pdf'
             }
@@ -206,7 +211,7 @@ def mock_database_responses():
                 'combined_score': 0.85,
                 'vector_similarity': 0.80,
                 'text_similarity': 0.90,
-                'metadata': {'page': 1},
+                'metadata': '{"page": 1}',
                 'document_title': 'Python Tutorial',
                 'document_source': 'tutorial.pdf'
             }
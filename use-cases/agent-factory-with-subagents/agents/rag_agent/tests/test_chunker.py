@@ -0,0 +1,99 @@
+"""Test LLM splitting of oversized sections in the semantic chunker."""
+
+import asyncio
+import pytest
+from types import SimpleNamespace
+
+from ..ingestion.chunker import ChunkingConfig, SemanticChunker
+
+
+class FakeSplitAgent:
+    """Agent splitting the prompt's text in two, recording concurrent calls."""
+
+    def __init__(self, delay: float = 0.01, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def run(self, prompt: str):
+        self.calls += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.fail:
+                raise ConnectionError("LLM unavailable")
+        finally:
+            self.in_flight -= 1
+
+        # The LLM may reflow whitespace; cut points must still be found
+        sentences = prompt.split("Text to split:")[1].split(". ")
+        half = len(sentences) // 2
+        return SimpleNamespace(data=" ".join(
+            [". ".join(sentences[:half]) + ".", "---CHUNK---", "  ".join(sentences[half:])]
+        ))
+
+
+def long_section(topic: str) -> str:
+    """A paragraph of ten sentences, longer than max_chunk_size."""
+    return " ".join(f"Sentence {i} about {topic} goes on for a while here." for i in range(10))
+
+
+def make_chunker(agent: FakeSplitAgent, llm_concurrency: int = 2) -> SemanticChunker:
+    """Semantic chunker using the fake agent."""
+    chunker = SemanticChunker(ChunkingConfig(
+        chunk_size=300,
+        chunk_overlap=50,
+        max_chunk_size=400,
+        min_chunk_size=10,
+        llm_concurrency=llm_concurrency
+    ))
+    chunker._agent = agent
+    return chunker
+
+
+class TestSemanticChunker:
+    """Test oversized sections are split concurrently and in order."""
+
+    @pytest.mark.asyncio
+    async def test_sections_split_concurrently_within_limit(self):
+        """Test LLM calls overlap but never exceed llm_concurrency."""
+        agent = FakeSplitAgent()
+        chunker = make_chunker(agent, llm_concurrency=2)
+        content = "\n\n".join(long_section(topic) for topic in ("alpha", "beta", "gamma", "delta"))
+
+        chunks = await chunker.chunk_document(content, "Title", "doc.md")
+
+        assert agent.calls == 4
+        assert agent.peak_in_flight == 2
+        assert len(chunks) == 8
+
+    @pytest.mark.asyncio
+    async def test_chunks_keep_document_order_and_text(self):
+        """Test chunks are exact spans of the original, in document order."""
+        chunker = make_chunker(FakeSplitAgent())
+        content = "# Title\n\n" + "\n\n".join(long_section(topic) for topic in ("alpha", "beta", "gamma"))
+
+        chunks = await chunker.chunk_document(content, "Title", "doc.md")
+
+        for chunk in chunks:
+            assert content[chunk.start_char:chunk.end_char] == chunk.content
+            assert len(chunk.content) <= chunker.config.max_chunk_size
+        assert [chunk.start_char for chunk in chunks] == sorted(chunk.start_char for chunk in chunks)
+        assert [chunk.index for chunk in chunks] == list(range(len(chunks)))
+        assert "alpha" in chunks[0].content and "gamma" in chunks[-1].content
+
+    @pytest.mark.asyncio
+    async def test_llm_failure_falls_back_to_simple_split(self):
+        """Test a failing LLM call still yields chunks of the section."""
+        chunker = make_chunker(FakeSplitAgent(fail=True))
+        content = long_section("alpha") + "\n\n" + long_section("beta")
+
+        chunks = await chunker.chunk_document(content, "Title", "doc.md")
+
+        assert chunks
+        for chunk in chunks:
+            assert content[chunk.start_char:chunk.end_char] == chunk.content
+            assert len(chunk.content) <= chunker.config.chunk_size
@@ -7,6 +7,7 @@ import openai
 
 from ..dependencies import AgentDependencies
 from ..settings import Settings, load_settings
+from ..utils.vector_codec import encode_vector, decode_vector, register_vector_codec
 
 
 class TestAgentDependencies:
@@ -66,7 +67,8 @@ class TestAgentDependencies:
                         mock_create_pool.assert_called_once_with(
                             test_settings.database_url,
                             min_size=test_settings.db_pool_min_size,
-                            max_size=test_settings.db_pool_max_size
+                            max_size=test_settings.db_pool_max_size,
+                            init=register_vector_codec
                         )
                         
                         # Verify OpenAI client creation
@@ -346,7 +348,8 @@ class TestDatabaseIntegration:
             mock_create_pool.assert_called_once_with(
                 test_settings.database_url,
                 min_size=test_settings.db_pool_min_size,
-                max_size=test_settings.db_pool_max_size
+                max_size=test_settings.db_pool_max_size,
+                init=register_vector_codec
             )
             assert deps.db_pool is mock_pool
     
@@ -387,6 +390,40 @@ class TestDatabaseIntegration:
             assert conn is not None
 
 
+class TestVectorCodec:
+    """Test the binary pgvector codec registered on database pools."""
+    
+    def test_vector_roundtrip(self):
+        """Test encoding and decoding preserves float32 values."""
+        embedding = [0.5, -1.25, 3.0, 0.0]
+        
+        payload = encode_vector(embedding)
+        
+        assert len(payload) == 4 + 4 * len(embedding)
+        assert decode_vector(payload) == embedding
+    
+    def test_vector_binary_header(self):
+        """Test payload starts with big-endian dimension header."""
+        payload = encode_vector([1.0] * 1536)
+        
+        assert payload[:4] == (1536).to_bytes(2, 'big') + b'\x00\x00'
+        assert payload[4:8] == b'\x3f\x80\x00\x00'  # 1.0 as big-endian float4
+    
+    @pytest.mark.asyncio
+    async def test_register_vector_codec(self):
+        """Test codec is registered in binary format."""
+        connection = AsyncMock()
+        
+        await register_vector_codec(connection)
+        
+        connection.set_type_codec.assert_called_once_with(
+            'vector',
+            encoder=encode_vector,
+            decoder=decode_vector,
+            format='binary'
+        )
+
+
 class TestOpenAIIntegration:
     """Test OpenAI client integration."""
     
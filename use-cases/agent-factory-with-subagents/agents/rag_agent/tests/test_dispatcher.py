@@ -0,0 +1,153 @@
+"""Test the adaptive, rate-limited embedding dispatcher."""
+
+import asyncio
+import httpx
+import pytest
+from email.utils import formatdate
+from unittest.mock import patch
+
+from openai import RateLimitError
+
+from ..ingestion.dispatcher import EmbeddingDispatcher, retry_after_seconds
+
+
+def rate_limit_error(headers=None) -> RateLimitError:
+    """A 429 error as raised by the OpenAI client."""
+    response = httpx.Response(
+        429,
+        headers=headers or {},
+        request=httpx.Request("POST", "https://api.openai.com/v1/embeddings")
+    )
+    return RateLimitError("Rate limit exceeded", response=response, body=None)
+
+
+def flaky_request(failures: int, headers=None):
+    """Request raising a 429 for its first calls, then succeeding."""
+    calls = []
+
+    async def request():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise rate_limit_error(headers)
+        return "ok"
+
+    return request, calls
+
+
+class TestRetryAfter:
+    """Test parsing of the server's requested delay."""
+
+    def test_seconds(self):
+        """Test Retry-After in seconds."""
+        assert retry_after_seconds(rate_limit_error({"retry-after": "3"})) == 3.0
+
+    def test_milliseconds_preferred(self):
+        """Test retry-after-ms takes precedence over Retry-After."""
+        error = rate_limit_error({"retry-after-ms": "250", "retry-after": "3"})
+
+        assert retry_after_seconds(error) == 0.25
+
+    def test_http_date(self):
+        """Test Retry-After as an HTTP date."""
+        with patch("time.time", return_value=1_700_000_000.0):
+            error = rate_limit_error({"retry-after": formatdate(1_700_000_010, usegmt=True)})
+            assert retry_after_seconds(error) == pytest.approx(10.0)
+
+    def test_missing(self):
+        """Test errors without headers give no delay."""
+        assert retry_after_seconds(rate_limit_error()) is None
+        assert retry_after_seconds(ValueError("no response")) is None
+
+
+class TestAIMD:
+    """Test concurrency grows additively and halves on 429."""
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_halves_concurrency_and_retries(self):
+        """Test a 429 halves the limit and the request is retried."""
+        dispatcher = EmbeddingDispatcher(initial_concurrency=8)
+        request, calls = flaky_request(1, {"retry-after-ms": "10"})
+
+        result = await dispatcher.run(request, tokens=5)
+
+        assert result == "ok"
+        assert len(calls) == 2
+        assert dispatcher.stats.rate_limited == 1
+        assert dispatcher.stats.requests == 1
+        assert dispatcher.stats.tokens == 5
+        # Halved to 4, then one success adds 1/4
+        assert dispatcher.limit == pytest.approx(4.25)
+
+    @pytest.mark.asyncio
+    async def test_limit_never_below_one(self):
+        """Test repeated 429s keep at least one request in flight."""
+        dispatcher = EmbeddingDispatcher(initial_concurrency=2, max_retries=4)
+        request, _ = flaky_request(3, {"retry-after-ms": "1"})
+
+        await dispatcher.run(request)
+
+        assert dispatcher.stats.rate_limited == 3
+        assert dispatcher.limit >= 1.0
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_retries(self):
+        """Test the last 429 is raised once retries are exhausted."""
+        dispatcher = EmbeddingDispatcher(max_retries=2)
+        request, calls = flaky_request(5, {"retry-after-ms": "1"})
+
+        with pytest.raises(RateLimitError):
+            await dispatcher.run(request)
+
+        assert len(calls) == 2
+
+    def test_backoff_without_retry_after(self):
+        """Test the pause doubles per attempt when the server gives no delay."""
+        dispatcher = EmbeddingDispatcher(retry_delay=1.0)
+
+        with patch("time.monotonic", return_value=100.0):
+            dispatcher._on_rate_limited(rate_limit_error(), attempt=2)
+
+        assert dispatcher.paused_until == 104.0
+
+    def test_retry_after_sets_pause(self):
+        """Test the server's Retry-After pauses all requests."""
+        dispatcher = EmbeddingDispatcher(retry_delay=1.0)
+
+        with patch("time.monotonic", return_value=100.0):
+            dispatcher._on_rate_limited(rate_limit_error({"retry-after": "7"}), attempt=0)
+
+        assert dispatcher.paused_until == 107.0
+
+    def test_additive_increase_capped(self):
+        """Test fast successes grow the limit up to max_concurrency."""
+        dispatcher = EmbeddingDispatcher(initial_concurrency=2, max_concurrency=4)
+
+        for _ in range(3):
+            dispatcher._on_success(0.1)
+        assert 2.0 < dispatcher.limit < 4.0
+
+        for _ in range(100):
+            dispatcher._on_success(0.1)
+        assert dispatcher.limit == 4.0
+
+    def test_slow_response_shrinks(self):
+        """Test a response over the target latency shrinks the limit."""
+        dispatcher = EmbeddingDispatcher(initial_concurrency=10, target_latency=0.5)
+
+        dispatcher._on_success(1.0)
+
+        assert dispatcher.limit == pytest.approx(9.0)
+
+    @pytest.mark.asyncio
+    async def test_in_flight_bounded_by_limit(self):
+        """Test no more requests run at once than the concurrency limit."""
+        dispatcher = EmbeddingDispatcher(initial_concurrency=3, max_concurrency=3)
+
+        async def request():
+            await asyncio.sleep(0.01)
+            return "ok"
+
+        results = await asyncio.gather(*(dispatcher.run(request) for _ in range(10)))
+
+        assert results == ["ok"] * 10
+        assert dispatcher.stats.peak_in_flight == 3
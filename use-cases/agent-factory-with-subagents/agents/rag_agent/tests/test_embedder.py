@@ -0,0 +1,230 @@
+"""Test token-bounded packing of embedding requests and per-text failures."""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from ..ingestion import embedder as embedder_module
+from ..ingestion.chunker import DocumentChunk
+from ..ingestion.embedder import CHARS_PER_TOKEN, EmbeddingGenerator
+from ..ingestion.embedding_cache import EmbeddingCache
+
+
+def make_generator(batches, failing=(), **kwargs) -> EmbeddingGenerator:
+    """
+    Generator whose API requests are recorded instead of sent.
+
+    Token counts use the length estimate, so a text of 4 * n characters
+    counts as n tokens. Texts in ``failing`` get an exception in place of
+    their embedding, as the per-text fallback returns them.
+    """
+    with patch.object(embedder_module, "get_tokenizer", return_value=None):
+        generator = EmbeddingGenerator(model="text-embedding-3-small", **kwargs)
+
+    async def request(texts, tokens=None):
+        batches.append(list(texts))
+        return [
+            ConnectionError("Embedding failed") if text in failing else [float(len(text)), 1.0]
+            for text in texts
+        ]
+
+    generator._request_embeddings_batch = request
+    return generator
+
+
+def text_of(tokens: int, char: str = "a") -> str:
+    """Text counting as the given number of tokens."""
+    return char * (tokens * CHARS_PER_TOKEN)
+
+
+class TestTruncation:
+    """Test inputs are cut to the model's per-input token limit."""
+
+    def test_short_text_unchanged(self):
+        """Test a text within the limit is kept whole."""
+        generator = make_generator([])
+
+        assert generator.truncate(text_of(10)) == (text_of(10), 10)
+
+    def test_long_text_truncated(self):
+        """Test a text over the limit is cut to exactly the limit."""
+        generator = make_generator([])
+        generator.config = {**generator.config, "max_tokens": 10}
+
+        text, tokens = generator.truncate(text_of(25))
+
+        assert text == text_of(10)
+        assert tokens == 10
+
+    @pytest.mark.asyncio
+    async def test_batcher_sends_truncated_text(self):
+        """Test the batcher packs and sends the truncated text."""
+        batches = []
+        generator = make_generator(batches)
+        generator.config = {**generator.config, "max_tokens": 10}
+
+        await generator.batcher.embed_texts([text_of(25)])
+
+        assert batches == [[text_of(10)]]
+        assert generator.batcher.tokens_sent == 10
+
+
+class TestEmbeddingBatcher:
+    """Test requests are packed by tokens and inputs across callers."""
+
+    @pytest.mark.asyncio
+    async def test_packs_by_token_budget(self):
+        """Test a batch is sent before it would exceed the token budget."""
+        batches = []
+        generator = make_generator(batches, max_batch_tokens=25)
+        texts = [text_of(10, char) for char in "abcde"]
+
+        embeddings = await generator.batcher.embed_texts(texts)
+
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+        assert [text for batch in batches for text in batch] == texts
+        assert embeddings == [[40.0, 1.0]] * 5
+        assert generator.batcher.requests_sent == 3
+        assert generator.batcher.tokens_sent == 50
+
+    @pytest.mark.asyncio
+    async def test_packs_by_input_limit(self):
+        """Test a batch never holds more than max_batch_inputs texts."""
+        batches = []
+        generator = make_generator(batches, batch_size=2)
+
+        await generator.batcher.embed_texts([text_of(1, char) for char in "abcde"])
+
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+
+    @pytest.mark.asyncio
+    async def test_results_in_input_order(self):
+        """Test results are scattered back in each caller's order."""
+        batches = []
+        generator = make_generator(batches, max_batch_tokens=3)
+        texts = [text_of(tokens, char) for tokens, char in ((2, "a"), (1, "b"), (3, "c"))]
+
+        embeddings = await generator.batcher.embed_texts(texts)
+
+        assert [embedding[0] for embedding in embeddings] == [8.0, 4.0, 12.0]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_requests(self):
+        """Test small texts of concurrent callers go out in one request."""
+        batches = []
+        generator = make_generator(batches)
+
+        first, second = await asyncio.gather(
+            generator.batcher.embed_texts([text_of(1, "a")]),
+            generator.batcher.embed_texts([text_of(2, "b"), text_of(1, "a")])
+        )
+
+        assert batches == [[text_of(1, "a"), text_of(2, "b")]]
+        assert first == [[4.0, 1.0]]
+        assert second == [[8.0, 1.0], [4.0, 1.0]]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_keeps_shared_request(self):
+        """Test cancelling one caller does not fail another waiting on the same text."""
+        batches = []
+        generator = make_generator(batches)
+        sent = generator._request_embeddings_batch
+        release = asyncio.Event()
+
+        async def slow_request(texts, tokens=None):
+            await release.wait()
+            return await sent(texts, tokens)
+
+        generator._request_embeddings_batch = slow_request
+        text = text_of(1, "a")
+
+        cancelled = asyncio.create_task(generator.batcher.embed_texts([text]))
+        waiting = asyncio.create_task(generator.batcher.embed_texts([text], return_exceptions=True))
+        await asyncio.sleep(generator.batcher.max_wait * 2)
+        cancelled.cancel()
+        release.set()
+
+        assert await waiting == [[4.0, 1.0]]
+        assert cancelled.cancelled()
+        assert batches == [[text]]
+
+    @pytest.mark.asyncio
+    async def test_empty_texts_not_sent(self):
+        """Test blank texts get zero vectors without an API request."""
+        batches = []
+        generator = make_generator(batches)
+
+        embeddings = await generator.batcher.embed_texts(["", "   "])
+
+        assert batches == []
+        assert embeddings == [[0.0] * generator.config["dimensions"]] * 2
+
+
+class TestFailedEmbeddings:
+    """Test failed texts are reported per text and never cached."""
+
+    @pytest.mark.asyncio
+    async def test_failure_only_fails_its_text(self):
+        """Test other texts of the same request still get embeddings."""
+        batches = []
+        generator = make_generator(batches, failing={text_of(1, "b")})
+
+        embeddings = await generator.batcher.embed_texts(
+            [text_of(1, "a"), text_of(1, "b")],
+            return_exceptions=True
+        )
+
+        assert embeddings[0] == [4.0, 1.0]
+        assert isinstance(embeddings[1], ConnectionError)
+
+        with pytest.raises(ConnectionError):
+            await generator.batcher.embed_texts([text_of(1, "b")])
+
+    @pytest.mark.asyncio
+    async def test_failure_not_cached(self):
+        """Test a failed text is requested again instead of served from the cache."""
+        batches = []
+        generator = make_generator(batches, failing={text_of(1, "b")}, cache=EmbeddingCache())
+        texts = [text_of(1, "a"), text_of(1, "b")]
+
+        await generator.batcher.embed_texts(texts, return_exceptions=True)
+        await generator.batcher.embed_texts(texts, return_exceptions=True)
+
+        assert batches == [texts, [text_of(1, "b")]]
+        assert len(generator.cache) == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_chunk_marked(self):
+        """Test embed_chunks marks failed chunks instead of storing fake embeddings as real."""
+        generator = make_generator([], failing={text_of(1, "b")})
+        chunks = [
+            DocumentChunk(content=text_of(1, char), index=i, start_char=0, end_char=4, metadata={})
+            for i, char in enumerate("ab")
+        ]
+
+        embedded = await generator.embed_chunks(chunks)
+
+        assert "embedding_error" not in embedded[0].metadata
+        assert "embedding_error" in embedded[1].metadata
+
+    @pytest.mark.asyncio
+    async def test_batch_zero_fills_without_caching(self):
+        """Test generate_embeddings_batch zero-fills failures and caches only successes."""
+        generator = make_generator([], failing={text_of(1, "b")}, cache=EmbeddingCache())
+
+        embeddings = await generator.generate_embeddings_batch([text_of(1, "a"), text_of(1, "b")])
+
+        assert embeddings[1] == [0.0] * generator.config["dimensions"]
+        assert len(generator.cache) == 1
+
+    @pytest.mark.asyncio
+    async def test_individual_fallback_returns_exceptions(self):
+        """Test the per-text fallback puts each failure in its text's place."""
+        generator = make_generator([])
+        error = ConnectionError("Embedding failed")
+        generator._request_embedding = AsyncMock(side_effect=[[1.0, 1.0], error])
+
+        with patch("asyncio.sleep", new=AsyncMock()):
+            embeddings = await generator._process_individually(["first", "second"])
+
+        assert embeddings == [[1.0, 1.0], error]
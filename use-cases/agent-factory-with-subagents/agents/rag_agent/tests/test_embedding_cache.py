@@ -0,0 +1,176 @@
+"""Test the embedding cache backends."""
+
+import pytest
+from array import array
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from ..ingestion.embedding_cache import (
+    EmbeddingCache,
+    ENTRY_OVERHEAD_BYTES,
+    PostgresEmbeddingCache,
+    SQLiteEmbeddingCache,
+    create_embedding_cache,
+    make_cache_key,
+    pack_embedding,
+    unpack_embedding
+)
+
+
+def entry_size(key: str, dimensions: int) -> int:
+    """Bytes an entry of a float32 embedding is charged against the budget."""
+    return dimensions * 4 + len(key) + ENTRY_OVERHEAD_BYTES
+
+
+class TestEmbeddingCache:
+    """Test LRU eviction, TTL expiry and byte accounting."""
+
+    def test_make_cache_key(self):
+        """Test keys separate models and dimensions of the same text."""
+        key = make_cache_key("text-embedding-3-small", 1536, "hello")
+
+        assert key.startswith("text-embedding-3-small:1536:")
+        assert key != make_cache_key("text-embedding-3-large", 1536, "hello")
+        assert key != make_cache_key("text-embedding-3-small", 512, "hello")
+
+    def test_stores_float32_arrays(self):
+        """Test entries are stored compactly and returned unchanged."""
+        cache = EmbeddingCache()
+        cache.put("a", [0.5, 1.0, 2.0])
+
+        values = cache.get("a")
+
+        assert isinstance(values, array)
+        assert values.typecode == "f"
+        assert list(values) == [0.5, 1.0, 2.0]
+        assert cache.current_bytes == entry_size("a", 3)
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted over budget."""
+        cache = EmbeddingCache(max_bytes=2 * entry_size("a", 4))
+        cache.put("a", [1.0] * 4)
+        cache.put("b", [2.0] * 4)
+
+        # Touch "a" so "b" becomes the least recently used
+        assert cache.get("a") is not None
+        cache.put("c", [3.0] * 4)
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        assert cache.stats.evictions == 1
+        assert cache.current_bytes <= cache.max_bytes
+
+    def test_replacing_entry_keeps_accounting(self):
+        """Test overwriting a key does not count it twice."""
+        cache = EmbeddingCache()
+        cache.put("a", [1.0] * 4)
+        cache.put("a", [2.0] * 8)
+
+        assert len(cache) == 1
+        assert list(cache.get("a")) == [2.0] * 8
+        assert cache.current_bytes == entry_size("a", 8)
+
+    def test_oversized_entry_not_cached(self):
+        """Test an entry larger than the whole budget evicts nothing."""
+        cache = EmbeddingCache(max_bytes=entry_size("a", 4))
+        cache.put("a", [1.0] * 4)
+        cache.put("b", [1.0] * 1000)
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.stats.evictions == 0
+
+    def test_ttl_expiry(self):
+        """Test entries older than the TTL are dropped on lookup."""
+        cache = EmbeddingCache(ttl_seconds=60)
+
+        with patch("time.monotonic", return_value=1000.0):
+            cache.put("a", [1.0] * 4)
+        with patch("time.monotonic", return_value=1060.0):
+            assert cache.get("a") is not None
+        with patch("time.monotonic", return_value=1061.0):
+            assert cache.get("a") is None
+
+        assert cache.stats.expirations == 1
+        assert len(cache) == 0
+        assert cache.current_bytes == 0
+
+    @pytest.mark.asyncio
+    async def test_get_many_counts_hits(self):
+        """Test batched lookups count each requested key."""
+        cache = EmbeddingCache()
+        await cache.put_many({"a": [1.0], "b": [2.0]})
+
+        found = await cache.get_many(["a", "b", "c", "a"])
+
+        assert set(found) == {"a", "b"}
+        assert cache.stats.hits == 3
+        assert cache.stats.misses == 1
+
+
+class TestPersistentCaches:
+    """Test the SQLite and Postgres backends and the factory."""
+
+    def test_pack_round_trip(self):
+        """Test embeddings survive packing as float32 bytes."""
+        packed = pack_embedding([0.25, -1.5, 3.0])
+
+        assert len(packed) == 12
+        assert list(unpack_embedding(packed)) == [0.25, -1.5, 3.0]
+
+    @pytest.mark.asyncio
+    async def test_sqlite_persists_across_instances(self, tmp_path):
+        """Test embeddings stored by one run are found by the next."""
+        path = str(tmp_path / "cache.sqlite")
+        cache = SQLiteEmbeddingCache(path)
+        await cache.put_many({"a": [1.0, 2.0], "b": [3.0, 4.0]})
+        await cache.close()
+
+        cache = SQLiteEmbeddingCache(path)
+        found = await cache.get_many(["a", "b", "c"])
+        await cache.close()
+
+        assert {key: list(values) for key, values in found.items()} == {"a": [1.0, 2.0], "b": [3.0, 4.0]}
+        assert cache.stats.hits == 2
+        assert cache.stats.misses == 1
+
+    @pytest.mark.asyncio
+    async def test_sqlite_keeps_first_embedding(self, tmp_path):
+        """Test a content-addressed key is never overwritten."""
+        cache = SQLiteEmbeddingCache(str(tmp_path / "cache.sqlite"))
+        await cache.put_many({"a": [1.0]})
+        await cache.put_many({"a": [2.0]})
+
+        found = await cache.get_many(["a"])
+        await cache.close()
+
+        assert list(found["a"]) == [1.0]
+
+    @pytest.mark.asyncio
+    async def test_postgres_round_trip(self):
+        """Test the Postgres backend stores packed bytes and unpacks rows."""
+        conn = AsyncMock()
+        conn.fetch.return_value = [{"cache_key": "a", "embedding": pack_embedding([1.0, 2.0])}]
+        pool = MagicMock()
+        pool.acquire.return_value.__aenter__.return_value = conn
+        cache = PostgresEmbeddingCache(pool)
+
+        await cache.put_many({"a": [1.0, 2.0]})
+        found = await cache.get_many(["a", "b"])
+
+        keys, blobs = conn.execute.await_args.args[1:]
+        assert keys == ["a"]
+        assert blobs == [pack_embedding([1.0, 2.0])]
+        assert list(found["a"]) == [1.0, 2.0]
+        assert cache.stats.misses == 1
+
+    def test_factory(self, tmp_path):
+        """Test backends are created by name and misconfiguration is rejected."""
+        assert create_embedding_cache("none") is None
+        assert isinstance(create_embedding_cache("memory", max_bytes=1024), EmbeddingCache)
+        assert isinstance(create_embedding_cache("sqlite", path=str(tmp_path / "c.sqlite")), SQLiteEmbeddingCache)
+
+        with pytest.raises(ValueError):
+            create_embedding_cache("postgres")
+        with pytest.raises(ValueError):
+            create_embedding_cache("redis")
@@ -0,0 +1,105 @@
+"""Test the benchmark's fake embedding server and corpus generator."""
+
+import json
+import time
+import base64
+import numpy as np
+import pytest
+from openai import AsyncOpenAI
+
+from ..benchmarks.corpus import write_corpus
+from ..benchmarks.fake_embedding_server import FakeEmbeddingServer, fake_embedding
+from ..ingestion.dispatcher import EmbeddingDispatcher
+
+
+async def post_embeddings(server: FakeEmbeddingServer, **request):
+    """Send an embeddings request body straight to the server's router."""
+    status, headers, body = await server._route("POST", "/v1/embeddings", json.dumps(request).encode())
+    return status, headers, json.loads(body)
+
+
+class TestFakeEmbeddingServer:
+    """Test responses follow the OpenAI embeddings API."""
+
+    def test_embeddings_deterministic_unit_vectors(self):
+        """Test the same text always gets the same normalized vector."""
+        first = fake_embedding("hello", 64)
+
+        assert np.array_equal(first, fake_embedding("hello", 64))
+        assert not np.array_equal(first, fake_embedding("world", 64))
+        assert np.linalg.norm(first) == pytest.approx(1.0, abs=1e-5)
+
+    @pytest.mark.asyncio
+    async def test_float_and_base64_encodings(self):
+        """Test both encoding formats carry the same embedding."""
+        server = FakeEmbeddingServer(dimensions=8, latency=0)
+
+        _, _, as_float = await post_embeddings(server, model="m", input=["a", "b"])
+        _, _, as_base64 = await post_embeddings(server, model="m", input="a", encoding_format="base64")
+
+        assert [item["index"] for item in as_float["data"]] == [0, 1]
+        decoded = np.frombuffer(base64.b64decode(as_base64["data"][0]["embedding"]), dtype="<f4")
+        assert np.allclose(decoded, as_float["data"][0]["embedding"])
+        assert server.stats.requests == 2
+        assert server.stats.inputs == 3
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_answers_429(self):
+        """Test an exhausted budget is answered with 429 and retry-after-ms."""
+        server = FakeEmbeddingServer(dimensions=8, latency=0, tokens_per_minute=10)
+
+        status, _, _ = await post_embeddings(server, model="m", input="a" * 40)
+        assert status == "200 OK"
+
+        status, headers, body = await post_embeddings(server, model="m", input="a" * 40)
+        assert status == "429 Too Many Requests"
+        assert int(headers["retry-after-ms"]) > 0
+        assert body["error"]["code"] == "rate_limit_exceeded"
+        assert server.stats.rate_limited == 1
+
+    @pytest.mark.asyncio
+    async def test_dispatcher_recovers_from_server_429(self):
+        """Test the OpenAI client and dispatcher back off and retry over HTTP."""
+        server = FakeEmbeddingServer(dimensions=8, latency=0, requests_per_minute=600)
+        listener = await server.serve()
+        port = listener.sockets[0].getsockname()[1]
+        client = AsyncOpenAI(api_key="test", base_url=f"http://127.0.0.1:{port}/v1", max_retries=0)
+        dispatcher = EmbeddingDispatcher(initial_concurrency=4)
+
+        def embed():
+            return client.embeddings.create(model="text-embedding-3-small", input=["hello"])
+
+        try:
+            # Warm up the connection so the budget below is not spent on setup
+            await embed()
+
+            # Budget in debt, refilling at 10 requests/s: the next call gets a ~0.2s 429
+            server.request_window.available = -1
+            server.request_window.updated_at = time.monotonic()
+
+            response = await dispatcher.run(embed)
+        finally:
+            await client.close()
+            listener.close()
+            await listener.wait_closed()
+
+        assert len(response.data[0].embedding) == 8
+        assert server.stats.requests == 2
+        assert server.stats.rate_limited == 1
+        assert dispatcher.stats.rate_limited == 1
+        assert dispatcher.limit < 4
+
+
+class TestCorpus:
+    """Test synthetic corpora are reproducible."""
+
+    def test_same_seed_same_corpus(self, tmp_path):
+        """Test a seed always writes the same documents."""
+        first = write_corpus(str(tmp_path / "first"), docs=5, doc_kb=2, subdirs=2, seed=7)
+        second = write_corpus(str(tmp_path / "second"), docs=5, doc_kb=2, subdirs=2, seed=7)
+
+        assert len(first) == 5
+        for a, b in zip(first, second):
+            with open(a, encoding="utf-8") as fa, open(b, encoding="utf-8") as fb:
+                assert fa.read() == fb.read()
+        assert "part-001" in first[1]
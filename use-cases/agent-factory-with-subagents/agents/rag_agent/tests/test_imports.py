@@ -0,0 +1,20 @@
+"""Test the CLI and ingestion entry points defer heavy imports.
+
+Import times are checked by benchmarks/bench_imports, not here, since
+wall-clock budgets depend on the machine running the suite.
+"""
+
+import pytest
+
+from ..benchmarks.bench_imports import ENTRY_POINTS, measure_import
+
+
+class TestDeferredImports:
+    """Entry points defer heavy client libraries."""
+
+    @pytest.mark.parametrize("module", sorted(ENTRY_POINTS))
+    def test_entry_point_defers_heavy_imports(self, module):
+        """Test importing an entry point does not load heavy libraries."""
+        timing = measure_import(module, repeat=1)
+
+        assert timing.heavy_loaded == []
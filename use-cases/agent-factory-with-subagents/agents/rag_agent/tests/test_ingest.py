@@ -0,0 +1,335 @@
+"""Test incremental re-ingestion of a documents folder."""
+
+import os
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from ..ingestion import embedder as embedder_module
+from ..ingestion import ingest as ingest_module
+from ..ingestion.ingest import DocumentIngestionPipeline
+from ..ingestion.preprocess import hash_content
+from ..utils.models import IngestionConfig
+from ..utils.vector_index import VectorIndexConfig
+
+
+DOCUMENTS = {
+    "a.md": "# Alpha\n\nAlpha is the first document, long enough to fill most of a chunk.\n",
+    "b.md": "# Beta\n\nBeta is the second document.\n",
+}
+
+
+@pytest.fixture
+def documents(tmp_path):
+    """Folder holding the sample documents."""
+    folder = tmp_path / "docs"
+    folder.mkdir()
+    for name, content in DOCUMENTS.items():
+        (folder / name).write_text(content, encoding="utf-8")
+    return folder
+
+
+def make_pipeline(folder, manifest=None, **kwargs) -> DocumentIngestionPipeline:
+    """
+    Pipeline whose database access and embedding requests are mocked.
+
+    ``manifest`` is the stored source -> content hash of the folder; texts
+    sent to the API are recorded in ``pipeline.embedded_texts``.
+    """
+    config = IngestionConfig(
+        chunk_size=100,
+        chunk_overlap=0,
+        max_chunk_size=500,
+        use_semantic_chunking=False,
+        embedding_cache="none",
+        vector_index_maintenance=False
+    )
+    with patch.object(embedder_module, "get_tokenizer", return_value=None):
+        pipeline = DocumentIngestionPipeline(config, str(folder), **kwargs)
+    pipeline._initialized = True
+
+    pipeline.embedded_texts = []
+
+    async def request(texts, tokens=None):
+        pipeline.embedded_texts.extend(texts)
+        return [[1.0] * 4 for _ in texts]
+
+    pipeline.embedder._request_embeddings_batch = request
+
+    manifest = manifest or {}
+    pipeline._load_manifest = AsyncMock(return_value=manifest)
+    pipeline._count_documents = AsyncMock(return_value=len(manifest))
+    pipeline._load_chunk_ids = AsyncMock(return_value={})
+    pipeline._prune_documents = AsyncMock()
+    pipeline._save_to_postgres = AsyncMock(return_value="document-id")
+    return pipeline
+
+
+def saved_sources(pipeline):
+    """Sources written to the database, in call order."""
+    return [call.args[1] for call in pipeline._save_to_postgres.await_args_list]
+
+
+def fail_texts_containing(pipeline, word: str):
+    """Make embedding requests fail for texts containing a word, as a per-text fallback would."""
+    async def request(texts, tokens=None):
+        pipeline.embedded_texts.extend(texts)
+        return [
+            ConnectionError("Embedding failed") if word in text else [1.0] * 4
+            for text in texts
+        ]
+
+    pipeline.embedder._request_embeddings_batch = request
+
+
+def mock_pool():
+    """Pool whose connections record the queries they run."""
+    conn = AsyncMock()
+    conn.fetch.return_value = []
+    pool = MagicMock()
+    pool.acquire.return_value.__aenter__.return_value = conn
+    return pool, conn
+
+
+class TestManifest:
+    """Test unchanged documents are skipped and removed ones pruned."""
+
+    @pytest.mark.asyncio
+    async def test_first_run_ingests_everything(self, documents):
+        """Test every document is written with its content hash."""
+        pipeline = make_pipeline(documents)
+
+        results = await pipeline.ingest_documents()
+
+        assert not any(result.skipped for result in results)
+        assert saved_sources(pipeline) == ["a.md", "b.md"]
+        hashes = [call.args[5] for call in pipeline._save_to_postgres.await_args_list]
+        assert hashes == [hash_content(DOCUMENTS["a.md"]), hash_content(DOCUMENTS["b.md"])]
+
+    @pytest.mark.asyncio
+    async def test_unchanged_documents_skipped(self, documents):
+        """Test documents whose hash matches the manifest are not re-embedded."""
+        manifest = {name: hash_content(content) for name, content in DOCUMENTS.items()}
+        pipeline = make_pipeline(documents, manifest)
+
+        results = await pipeline.ingest_documents()
+
+        assert all(result.skipped for result in results)
+        assert pipeline.embedded_texts == []
+        pipeline._save_to_postgres.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_changed_document_reingested(self, documents):
+        """Test only the document whose content changed is processed."""
+        manifest = {"a.md": hash_content(DOCUMENTS["a.md"]), "b.md": "stale"}
+        pipeline = make_pipeline(documents, manifest)
+
+        results = await pipeline.ingest_documents()
+
+        assert [result.skipped for result in results] == [True, False]
+        assert saved_sources(pipeline) == ["b.md"]
+
+    @pytest.mark.asyncio
+    async def test_removed_documents_pruned(self, documents):
+        """Test stored documents without a file are deleted."""
+        manifest = {name: hash_content(content) for name, content in DOCUMENTS.items()}
+        manifest["gone.md"] = "hash"
+        pipeline = make_pipeline(documents, manifest)
+
+        await pipeline.ingest_documents()
+
+        pipeline._prune_documents.assert_awaited_once_with(["gone.md"])
+
+    @pytest.mark.asyncio
+    async def test_emptied_folder_pruned(self, documents):
+        """Test removing every file prunes all of the folder's documents and finishes the run."""
+        for name in DOCUMENTS:
+            (documents / name).unlink()
+        manifest = {name: hash_content(content) for name, content in DOCUMENTS.items()}
+        pipeline = make_pipeline(documents, manifest)
+        pipeline.journal = AsyncMock()
+        pipeline.journal.start.return_value = False
+
+        results = await pipeline.ingest_documents()
+
+        assert results == []
+        pipeline._prune_documents.assert_awaited_once_with(["a.md", "b.md"])
+        pipeline.journal.finish.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_missing_folder_not_pruned(self, tmp_path):
+        """Test a folder that does not exist never prunes stored documents."""
+        pipeline = make_pipeline(tmp_path / "missing", {"a.md": "hash"})
+
+        assert await pipeline.ingest_documents() == []
+        pipeline._prune_documents.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_pruning_disabled(self, documents):
+        """Test prune_missing=False keeps documents of removed files."""
+        pipeline = make_pipeline(documents, {"gone.md": "hash"}, prune_missing=False)
+
+        await pipeline.ingest_documents()
+
+        pipeline._prune_documents.assert_not_awaited()
+
+
+class TestChangedChunks:
+    """Test only new, changed or failed chunks are embedded again."""
+
+    @pytest.mark.asyncio
+    async def test_unchanged_chunks_reused(self, documents):
+        """Test chunks whose stored rows match are kept, not re-embedded."""
+        added = "A new closing paragraph was added at the end."
+        (documents / "a.md").write_text(DOCUMENTS["a.md"] + "\n" + added + "\n", encoding="utf-8")
+        pipeline = make_pipeline(documents, {"a.md": "stale", "b.md": hash_content(DOCUMENTS["b.md"])})
+        kept_hash = pipeline._chunk_hash(DOCUMENTS["a.md"])
+        pipeline._load_chunk_ids.return_value = {kept_hash: ["chunk-id"]}
+
+        results = await pipeline.ingest_documents()
+
+        assert results[0].chunks_reused == 1
+        assert pipeline.embedded_texts == [added]
+        kept_chunks = pipeline._save_to_postgres.await_args.args[6]
+        assert [chunk_id for chunk_id, _ in kept_chunks] == ["chunk-id"]
+
+    @pytest.mark.asyncio
+    async def test_kept_chunk_content_refreshed(self, documents):
+        """Test a whitespace-only edit keeps the chunk row but stores its new text."""
+        edited = DOCUMENTS["a.md"].replace("the first", "the  first")
+        (documents / "a.md").write_text(edited, encoding="utf-8")
+        pipeline = make_pipeline(documents, {"a.md": "stale", "b.md": hash_content(DOCUMENTS["b.md"])})
+        pipeline._load_chunk_ids.return_value = {pipeline._chunk_hash(DOCUMENTS["a.md"]): ["chunk-id"]}
+
+        await pipeline.ingest_documents()
+
+        assert pipeline.embedded_texts == []
+        pool, conn = mock_pool()
+        conn.transaction = MagicMock()
+        with patch.object(ingest_module, "db_pool", pool):
+            await DocumentIngestionPipeline._save_to_postgres(pipeline, *pipeline._save_to_postgres.await_args.args)
+
+        query, ids, *_, contents = next(
+            call.args for call in conn.execute.await_args_list if "UPDATE chunks" in call.args[0]
+        )
+        assert "content = u.content" in query
+        assert ids == ["chunk-id"]
+        assert contents == [edited.strip()]
+
+    @pytest.mark.asyncio
+    async def test_failed_embedding_marked(self, documents):
+        """Test a failed chunk is stored without embedding, hash or chunk identity."""
+        pipeline = make_pipeline(documents)
+        fail_texts_containing(pipeline, "Alpha")
+
+        results = await pipeline.ingest_documents()
+
+        assert results[0].errors == ["Failed to embed 1 chunks; they are retried on the next run"]
+        assert results[1].errors == []
+
+        calls = pipeline._save_to_postgres.await_args_list
+        # No document hash, so the next run does not skip the file
+        assert calls[0].args[5] is None
+        assert calls[1].args[5] == hash_content(DOCUMENTS["b.md"])
+
+        chunk, = calls[0].args[3]
+        assert "embedding_error" in chunk.metadata
+        record = pipeline._chunk_record("document-id", chunk)
+        assert record[2] is None
+        assert record[6] is None
+
+    @pytest.mark.asyncio
+    async def test_failed_document_retried(self, documents):
+        """Test a document stored after a failure is embedded on the next run."""
+        manifest = {"a.md": None, "b.md": hash_content(DOCUMENTS["b.md"])}
+        pipeline = make_pipeline(documents, manifest)
+
+        results = await pipeline.ingest_documents()
+
+        assert [result.skipped for result in results] == [False, True]
+        assert results[0].errors == []
+        assert pipeline.embedded_texts == [DOCUMENTS["a.md"].strip()]
+        assert pipeline._save_to_postgres.await_args.args[5] == hash_content(DOCUMENTS["a.md"])
+
+
+class TestSourceRoot:
+    """Test stored documents are scoped to the ingested folder."""
+
+    def test_source_root_is_absolute_folder(self, documents):
+        """Test sources are relative to an absolute folder path."""
+        pipeline = make_pipeline(documents)
+
+        assert pipeline.source_root == os.path.abspath(documents)
+        assert pipeline._get_source(str(documents / "a.md")) == "a.md"
+
+    @pytest.mark.asyncio
+    async def test_manifest_scoped_to_folder(self, documents):
+        """Test only this folder's documents are loaded into the manifest."""
+        pipeline = make_pipeline(documents)
+        pool, conn = mock_pool()
+
+        with patch.object(ingest_module, "db_pool", pool):
+            await DocumentIngestionPipeline._load_manifest(pipeline)
+
+        query, root = conn.fetch.await_args.args
+        assert "WHERE source_root = $1" in query
+        assert root == os.path.abspath(documents)
+
+    @pytest.mark.asyncio
+    async def test_pruning_scoped_to_folder(self, tmp_path, documents):
+        """Test pruning one folder never deletes another folder's sources."""
+        other = tmp_path / "other"
+        other.mkdir()
+        pool, conn = mock_pool()
+
+        with patch.object(ingest_module, "db_pool", pool):
+            await DocumentIngestionPipeline._prune_documents(make_pipeline(other), ["a.md"])
+
+        query, root, sources = conn.execute.await_args.args
+        assert "source_root = $1" in query
+        assert root == os.path.abspath(other)
+        assert sources == ["a.md"]
+
+
+class TestIndexMaintenance:
+    """Test the vector index is maintained after loading."""
+
+    @pytest.mark.asyncio
+    async def test_maintenance_on_dedicated_connection(self, documents):
+        """Test the index build runs outside the pool and its command timeout."""
+        pipeline = make_pipeline(documents)
+        pipeline.index_config = VectorIndexConfig()
+        conn = AsyncMock()
+
+        pool, _ = mock_pool()
+
+        with patch.object(ingest_module, "db_pool", pool), \
+                patch.object(ingest_module.asyncpg, "connect", AsyncMock(return_value=conn)) as connect, \
+                patch.object(ingest_module, "maintain_vector_index", AsyncMock(return_value="hnsw")) as maintain:
+            await pipeline.ingest_documents()
+
+        connect.assert_awaited_once()
+        assert maintain.await_args.args[0] is conn
+        assert pipeline.index_rebuilt == "hnsw"
+        conn.close.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_failed_maintenance_finishes_run(self, documents):
+        """Test a failed index build is logged and the stored documents kept."""
+        pipeline = make_pipeline(documents)
+        pipeline.index_config = VectorIndexConfig()
+        pipeline.journal = AsyncMock()
+        pipeline.journal.start.return_value = False
+        pipeline.journal.entries = {}
+        conn = AsyncMock()
+
+        pool, _ = mock_pool()
+
+        with patch.object(ingest_module, "db_pool", pool), \
+                patch.object(ingest_module.asyncpg, "connect", AsyncMock(return_value=conn)), \
+                patch.object(ingest_module, "maintain_vector_index", AsyncMock(side_effect=TimeoutError())):
+            results = await pipeline.ingest_documents()
+
+        assert saved_sources(pipeline) == ["a.md", "b.md"]
+        assert pipeline.index_rebuilt is None
+        conn.close.assert_awaited_once()
+        pipeline.journal.finish.assert_awaited_once()
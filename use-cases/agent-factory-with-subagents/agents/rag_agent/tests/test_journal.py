@@ -0,0 +1,129 @@
+"""Test the file run journal used to resume interrupted ingestion."""
+
+import os
+import pytest
+
+from ..ingestion.journal import FileRunJournal, JournalEntry, default_journal_path
+
+
+async def interrupted_run(path: str, folder: str = "/data/docs") -> FileRunJournal:
+    """Journal of a run that committed a.md, embedded b.md and then stopped."""
+    journal = FileRunJournal(path)
+    await journal.start(folder, clean=False, resume=False)
+    await journal.record(JournalEntry(source="a.md", state="chunked"))
+    await journal.record(JournalEntry(source="a.md", state="committed", content_hash="hash-a", title="A"))
+    await journal.record(JournalEntry(source="b.md", state="embedded", content_hash="hash-b"))
+    await journal.close()
+    return journal
+
+
+class TestFileRunJournal:
+    """Test runs are resumed only when unfinished and of the same folder."""
+
+    @pytest.mark.asyncio
+    async def test_resume_restores_latest_states(self, tmp_path):
+        """Test a resumed run continues with each file's last recorded state."""
+        path = str(tmp_path / "journal.jsonl")
+        first = await interrupted_run(path)
+
+        journal = FileRunJournal(path)
+        resumed = await journal.start("/data/docs", clean=False, resume=True)
+
+        assert resumed
+        assert journal.run.run_id == first.run.run_id
+        assert journal.entries["a.md"].state == "committed"
+        assert journal.entries["a.md"].content_hash == "hash-a"
+        assert journal.entries["b.md"].state == "embedded"
+        assert journal.counts() == {"chunked": 0, "embedded": 1, "committed": 1}
+        await journal.close()
+
+    @pytest.mark.asyncio
+    async def test_resumed_run_appends(self, tmp_path):
+        """Test state changes after resuming survive another interruption."""
+        path = str(tmp_path / "journal.jsonl")
+        await interrupted_run(path)
+
+        journal = FileRunJournal(path)
+        await journal.start("/data/docs", clean=False, resume=True)
+        await journal.record(JournalEntry(source="b.md", state="committed", content_hash="hash-b"))
+        await journal.close()
+
+        journal = FileRunJournal(path)
+        assert await journal.start("/data/docs", clean=False, resume=True)
+        assert journal.counts()["committed"] == 2
+        await journal.close()
+
+    @pytest.mark.asyncio
+    async def test_finished_run_not_resumed(self, tmp_path):
+        """Test a finished run starts over with an empty journal."""
+        path = str(tmp_path / "journal.jsonl")
+        first = await interrupted_run(path)
+        journal = FileRunJournal(path)
+        await journal.start("/data/docs", clean=False, resume=True)
+        await journal.finish()
+        await journal.close()
+
+        journal = FileRunJournal(path)
+        resumed = await journal.start("/data/docs", clean=False, resume=True)
+
+        assert not resumed
+        assert journal.run.run_id != first.run.run_id
+        assert journal.entries == {}
+        await journal.close()
+
+    @pytest.mark.asyncio
+    async def test_other_folder_not_resumed(self, tmp_path):
+        """Test a run of another documents folder is not resumed."""
+        path = str(tmp_path / "journal.jsonl")
+        await interrupted_run(path, folder="/data/docs")
+
+        journal = FileRunJournal(path)
+
+        assert not await journal.start("/data/other", clean=False, resume=True)
+        await journal.close()
+
+    @pytest.mark.asyncio
+    async def test_new_run_without_resume(self, tmp_path):
+        """Test an unfinished run is discarded unless resuming."""
+        path = str(tmp_path / "journal.jsonl")
+        await interrupted_run(path)
+
+        journal = FileRunJournal(path)
+
+        assert not await journal.start("/data/docs", clean=False, resume=False)
+        assert journal.entries == {}
+        await journal.close()
+
+    @pytest.mark.asyncio
+    async def test_torn_last_line_ignored(self, tmp_path):
+        """Test a line cut short by a crash does not prevent resuming."""
+        path = str(tmp_path / "journal.jsonl")
+        await interrupted_run(path)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"source": "c.md", "sta')
+
+        journal = FileRunJournal(path)
+
+        assert await journal.start("/data/docs", clean=False, resume=True)
+        assert set(journal.entries) == {"a.md", "b.md"}
+        await journal.close()
+
+    @pytest.mark.asyncio
+    async def test_entry_matches_file_stat(self, tmp_path):
+        """Test entries detect files changed since they were recorded."""
+        path = tmp_path / "a.md"
+        path.write_text("content", encoding="utf-8")
+        stat = os.stat(path)
+        entry = JournalEntry(source="a.md", file_size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+
+        assert entry.matches(stat)
+
+        path.write_text("changed content", encoding="utf-8")
+        assert not entry.matches(os.stat(path))
+
+    def test_default_path_beside_folder(self, tmp_path):
+        """Test each documents folder gets its own journal next to it."""
+        folder = tmp_path / "docs"
+
+        assert default_journal_path(str(folder)) == str(tmp_path / ".docs.ingest_journal.jsonl")
+        assert default_journal_path(str(folder) + "/") == default_journal_path(str(folder))
@@ -0,0 +1,121 @@
+"""Test the shared query embedding cache."""
+
+import asyncio
+import pytest
+from unittest.mock import patch
+
+from ..utils.query_cache import QueryEmbeddingCache, normalize_query
+
+
+def counting_embedder(calls, delay: float = 0):
+    """Embedding function recording the texts it is asked to embed."""
+    async def create(text):
+        calls.append(text)
+        if delay:
+            await asyncio.sleep(delay)
+        return [float(len(calls))] * 4
+    return create
+
+
+class TestQueryEmbeddingCache:
+    """Test lookups, bounds and single-flight misses."""
+
+    def test_normalize_query(self):
+        """Test whitespace and Unicode forms are normalized, case is kept."""
+        assert normalize_query("  What is\tRAG?\n") == "What is RAG?"
+        assert normalize_query("ｅｒｒｏｒ") == "error"
+        assert normalize_query("Python") != normalize_query("python")
+
+    @pytest.mark.asyncio
+    async def test_hit_after_miss(self):
+        """Test a repeated query is served from the cache."""
+        cache = QueryEmbeddingCache()
+        calls = []
+
+        first = await cache.get_or_create("model", 4, "same query", counting_embedder(calls))
+        second = await cache.get_or_create("model", 4, " same   query", counting_embedder(calls))
+
+        assert calls == ["same query"]
+        assert second == first
+        assert isinstance(second, list)
+        assert cache.stats.hits == 1
+        assert cache.stats.misses == 1
+        assert cache.stats.hit_rate == 0.5
+
+    @pytest.mark.asyncio
+    async def test_keyed_on_model(self):
+        """Test the same text under another model is a miss."""
+        cache = QueryEmbeddingCache()
+        calls = []
+
+        await cache.get_or_create("small", 4, "query", counting_embedder(calls))
+        await cache.get_or_create("large", 4, "query", counting_embedder(calls))
+
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_coalesce(self):
+        """Test concurrent identical queries share one API call."""
+        cache = QueryEmbeddingCache()
+        calls = []
+        create = counting_embedder(calls, delay=0.01)
+
+        results = await asyncio.gather(*(
+            cache.get_or_create("model", 4, "query", create) for _ in range(5)
+        ))
+
+        assert calls == ["query"]
+        assert all(result == results[0] for result in results)
+        assert cache.stats.misses == 1
+        assert cache.stats.coalesced == 4
+
+    @pytest.mark.asyncio
+    async def test_failed_call_is_not_cached(self):
+        """Test an API error reaches every waiter and is retried next time."""
+        cache = QueryEmbeddingCache()
+
+        async def failing(text):
+            await asyncio.sleep(0.01)
+            raise ConnectionError("Network unavailable")
+
+        results = await asyncio.gather(
+            cache.get_or_create("model", 4, "query", failing),
+            cache.get_or_create("model", 4, "query", failing),
+            return_exceptions=True
+        )
+        assert all(isinstance(result, ConnectionError) for result in results)
+
+        calls = []
+        await cache.get_or_create("model", 4, "query", counting_embedder(calls))
+        assert calls == ["query"]
+
+    @pytest.mark.asyncio
+    async def test_lru_bound(self):
+        """Test the least recently used query is evicted over budget."""
+        # Room for about two 4-d entries
+        cache = QueryEmbeddingCache(max_bytes=700)
+        calls = []
+        create = counting_embedder(calls)
+
+        for text in ("a", "b", "a", "c", "a", "b"):
+            await cache.get_or_create("model", 4, text, create)
+
+        assert calls == ["a", "b", "c", "b"]
+        assert cache.stats.evictions == 2
+
+    @pytest.mark.asyncio
+    async def test_ttl_expiry(self):
+        """Test entries older than the TTL are embedded again."""
+        cache = QueryEmbeddingCache(ttl_seconds=60)
+        calls = []
+        create = counting_embedder(calls)
+
+        with patch("time.monotonic", return_value=1000.0):
+            await cache.get_or_create("model", 4, "query", create)
+        with patch("time.monotonic", return_value=1030.0):
+            await cache.get_or_create("model", 4, "query", create)
+        with patch("time.monotonic", return_value=1061.0):
+            await cache.get_or_create("model", 4, "query", create)
+
+        assert len(calls) == 2
+        assert cache.stats.expirations == 1
@@ -274,10 +274,11 @@ class TestREQ003TechnicalRequirements:
         # Test LLM model configuration
         from ..providers import get_llm_model
         
-        with patch('..providers.load_settings') as mock_settings:
+        with patch('..providers.get_settings') as mock_settings:
             mock_settings.return_value.llm_model = "gpt-4o-mini"
             mock_settings.return_value.openai_api_key = "test_key"
             
+            get_llm_model.cache_clear()
             model = get_llm_model()
             # Model should be properly configured (implementation-dependent verification)
             assert model is not None
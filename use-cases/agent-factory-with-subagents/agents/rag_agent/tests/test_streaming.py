@@ -0,0 +1,98 @@
+"""Test constant-memory scanning and chunking of large documents."""
+
+import hashlib
+import random
+import pytest
+
+from ..ingestion.chunker import ChunkingConfig, SimpleChunker
+from ..ingestion.streaming import iter_chunks, scan_file
+
+
+def sample_document(paragraphs: int = 200, seed: int = 0) -> str:
+    """Markdown with paragraphs of varied length and irregular blank lines."""
+    rng = random.Random(seed)
+    words = ["vector", "search", "index", "chunk", "embedding", "query", "postgres", "latency"]
+    separators = ["\n\n", "\n\n\n", "\n  \n", "\n\t\n\n"]
+
+    text = "# Large document"
+    for _ in range(paragraphs):
+        lines = [
+            " ".join(rng.choice(words) for _ in range(rng.randint(3, 15)))
+            for _ in range(rng.randint(1, 4))
+        ]
+        text += rng.choice(separators) + "\n".join(lines)
+
+    return text + "\n"
+
+
+def simple_chunks(content: str, config: ChunkingConfig):
+    """(start, text) of SimpleChunker's chunks."""
+    chunks = SimpleChunker(config).chunk_document(content, "Title", "doc.md")
+    return [(chunk.start_char, chunk.content) for chunk in chunks]
+
+
+class TestScanFile:
+    """Test hashing and counting without loading the file."""
+
+    def test_matches_in_memory_stats(self, tmp_path):
+        """Test the streamed hash and counts equal those of the whole text."""
+        content = sample_document()
+        path = tmp_path / "doc.md"
+        path.write_text(content, encoding="utf-8")
+
+        stats = scan_file(str(path), block_size=101)
+
+        assert stats.content_hash == hashlib.sha256(content.encode("utf-8")).hexdigest()
+        assert stats.encoding == "utf-8"
+        assert stats.char_count == len(content)
+        assert stats.line_count == content.count("\n") + 1
+        assert stats.word_count == len(content.split())
+        assert stats.head == content[:len(stats.head)]
+
+    def test_latin1_fallback(self, tmp_path):
+        """Test files that are not UTF-8 are read as latin-1."""
+        path = tmp_path / "doc.md"
+        path.write_bytes("Café crème\n".encode("latin-1"))
+
+        stats = scan_file(str(path))
+
+        assert stats.encoding == "latin-1"
+        assert stats.word_count == 2
+
+
+class TestIterChunks:
+    """Test the sliding-window chunker agrees with SimpleChunker."""
+
+    @pytest.mark.parametrize("block_size", [7, 64, 1000, 1024 * 1024])
+    def test_same_chunks_as_simple_chunker(self, tmp_path, block_size):
+        """Test chunks and offsets match for any block size."""
+        content = sample_document()
+        path = tmp_path / "doc.md"
+        path.write_text(content, encoding="utf-8")
+        config = ChunkingConfig(chunk_size=500, chunk_overlap=0, max_chunk_size=1000)
+
+        streamed = list(iter_chunks(str(path), "utf-8", 500, 1000, block_size=block_size))
+
+        assert streamed == simple_chunks(content, config)
+
+    def test_offsets_address_the_document(self, tmp_path):
+        """Test every chunk's offset points at its text in the file."""
+        content = sample_document(seed=1)
+        path = tmp_path / "doc.md"
+        path.write_text(content, encoding="utf-8")
+
+        for start, text in iter_chunks(str(path), "utf-8", 300, 600, block_size=50):
+            assert content[start:start + len(text)] == text
+
+    def test_paragraph_without_breaks_is_cut(self, tmp_path):
+        """Test a log without blank lines is cut at line breaks below max_chunk_size."""
+        lines = [f"2024-01-01 12:00:{i % 60:02d} INFO request {i} served" for i in range(500)]
+        content = "\n".join(lines)
+        path = tmp_path / "app.log"
+        path.write_text(content, encoding="utf-8")
+
+        chunks = list(iter_chunks(str(path), "utf-8", 400, 800, block_size=256))
+
+        assert len(chunks) > 1
+        assert all(len(text) <= 800 for _, text in chunks)
+        assert "\n".join(text for _, text in chunks).split("\n") == lines
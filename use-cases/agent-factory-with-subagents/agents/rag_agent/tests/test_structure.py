@@ -0,0 +1,76 @@
+"""Test the single-pass markdown structure scanner."""
+
+from ..ingestion.structure import scan_markdown
+
+
+def scan(content: str):
+    """(kind, text) of every section of a document."""
+    return [(section.kind, section.text(content)) for section in scan_markdown(content)]
+
+
+class TestScanMarkdown:
+    """Test section kinds and offsets."""
+
+    def test_headings_and_paragraphs(self):
+        """Test headings are single lines and paragraphs run to a blank line."""
+        content = "# Title\nIntro line one\nline two\n\n## Part\n\nBody text.\n"
+
+        assert scan(content) == [
+            ("heading", "# Title"),
+            ("paragraph", "Intro line one\nline two"),
+            ("heading", "## Part"),
+            ("paragraph", "Body text."),
+        ]
+
+    def test_list_items(self):
+        """Test each list item is a section, continuation lines included."""
+        content = "- first\n  continued\n- second\n1. third\n"
+
+        assert scan(content) == [
+            ("list_item", "- first\n  continued"),
+            ("list_item", "- second"),
+            ("list_item", "1. third"),
+        ]
+
+    def test_code_block_kept_whole(self):
+        """Test fenced code keeps blank lines and heading-like lines."""
+        content = "Text\n```python\n# not a heading\n\n- not a list\n```\nAfter\n"
+
+        assert scan(content) == [
+            ("paragraph", "Text"),
+            ("code", "```python\n# not a heading\n\n- not a list\n```"),
+            ("paragraph", "After"),
+        ]
+
+    def test_closing_fence_must_match(self):
+        """Test a different fence character does not close the block."""
+        content = "~~~\n```\ncode\n~~~\n"
+
+        assert scan(content) == [("code", "~~~\n```\ncode\n~~~")]
+
+    def test_unclosed_fence_runs_to_end(self):
+        """Test an unterminated code block extends to the end of the document."""
+        content = "```\ncode\n\nmore code\n"
+
+        assert scan(content) == [("code", "```\ncode\n\nmore code")]
+
+    def test_table(self):
+        """Test consecutive table rows form one section."""
+        content = "| a | b |\n|---|---|\n| 1 | 2 |\nNext paragraph\n"
+
+        assert scan(content) == [
+            ("table", "| a | b |\n|---|---|\n| 1 | 2 |"),
+            ("paragraph", "Next paragraph"),
+        ]
+
+    def test_offsets_exclude_whitespace(self):
+        """Test section offsets skip indentation and trailing spaces."""
+        content = "\n\n   Indented paragraph   \n\n"
+        section, = scan_markdown(content)
+
+        assert content[section.start:section.end] == "Indented paragraph"
+        assert len(section) == len("Indented paragraph")
+
+    def test_hash_without_space_is_text(self):
+        """Test "#tag" is paragraph text, not a heading."""
+        assert scan("#tag line\n") == [("paragraph", "#tag line")]
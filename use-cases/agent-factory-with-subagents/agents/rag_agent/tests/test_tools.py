@@ -4,7 +4,7 @@ import pytest
 from unittest.mock import AsyncMock, patch
 from pydantic_ai import RunContext
 
-from ..tools import semantic_search, hybrid_search, auto_search, SearchResult
+from ..tools import semantic_search, hybrid_search, keyword_search, auto_search, SearchResult
 from ..dependencies import AgentDependencies
 
 
@@ -186,6 +186,34 @@ class TestHybridSearch:
         args = connection.fetch.call_args[0]
         assert args[4] == 0.7
     
+    @pytest.mark.asyncio
+    async def test_hybrid_search_fuses_top_candidates(self, test_dependencies, mock_database_responses):
+        """Test hybrid search bounds each index to its top candidates."""
+        deps, connection = test_dependencies
+        connection.fetch.return_value = mock_database_responses['hybrid_search']
+        deps.settings.hybrid_candidates = 40
+        
+        ctx = RunContext(deps=deps)
+        await hybrid_search(ctx, "Python programming", match_count=5)
+        await hybrid_search(ctx, "Python programming", match_count=50)
+        
+        first, second = connection.fetch.call_args_list
+        assert first[0][5] == "weighted"  # fusion
+        assert first[0][6] == 40  # candidates per index
+        assert second[0][6] == 50  # never fewer than match_count
+    
+    @pytest.mark.asyncio
+    async def test_hybrid_search_rrf_preference(self, test_dependencies, mock_database_responses):
+        """Test reciprocal rank fusion can be chosen per user."""
+        deps, connection = test_dependencies
+        connection.fetch.return_value = mock_database_responses['hybrid_search']
+        deps.user_preferences['hybrid_fusion'] = 'rrf'
+        
+        ctx = RunContext(deps=deps)
+        await hybrid_search(ctx, "Python programming")
+        
+        assert connection.fetch.call_args[0][5] == "rrf"
+    
     @pytest.mark.asyncio
     async def test_hybrid_search_result_structure(self, test_dependencies, mock_database_responses):
         """Test hybrid search result structure is correct."""
@@ -211,6 +239,169 @@ class TestHybridSearch:
         assert 0 <= result['text_similarity'] <= 1
 
 
+
+class TestKeywordSearch:
+    """Test keyword search without embeddings."""
+    
+    @pytest.mark.asyncio
+    async def test_keyword_search_skips_embedding(self, test_dependencies):
+        """Test keyword search queries the database without embedding the query."""
+        deps, connection = test_dependencies
+        connection.fetch.return_value = [
+            {
+                'chunk_id': 'chunk_1',
+                'document_id': 'doc_1',
+                'content': 'ERR_CONNECTION_RESET is raised when the peer closes the socket',
+                'score': 7.4,
+                'match_type': 'fulltext',
+                'metadata': '{"page": 3}',
+                'document_title': 'Error Reference',
+                'document_source': 'errors.md'
+            }
+        ]
+        
+        ctx = RunContext(deps=deps)
+        results = await keyword_search(ctx, "ERR_CONNECTION_RESET", match_count=5)
+        
+        deps.openai_client.embeddings.create.assert_not_called()
+        args = connection.fetch.call_args[0]
+        assert "keyword_search" in args[0]
+        assert args[1:] == ("ERR_CONNECTION_RESET", 5, deps.settings.keyword_candidates)
+        
+        assert results[0]['score'] == 7.4
+        assert results[0]['match_type'] == 'fulltext'
+        assert results[0]['metadata'] == {"page": 3}
+    
+    @pytest.mark.asyncio
+    async def test_keyword_search_limits_match_count(self, test_dependencies):
+        """Test keyword search caps results at the configured maximum."""
+        deps, connection = test_dependencies
+        connection.fetch.return_value = []
+        
+        ctx = RunContext(deps=deps)
+        results = await keyword_search(ctx, "SKU-4471", match_count=500)
+        
+        assert results == []
+        assert connection.fetch.call_args[0][2] == deps.settings.max_match_count
+
+
+class TestQuantizedSearch:
+    """Test two-stage search over the quantized indexes."""
+    
+    @pytest.mark.asyncio
+    async def test_semantic_search_exact_by_default(self, test_dependencies, mock_database_responses):
+        """Test semantic search uses the exact path without quantization."""
+        deps, connection = test_dependencies
+        connection.fetch.return_value = mock_database_responses['semantic_search']
+        
+        ctx = RunContext(deps=deps)
+        await semantic_search(ctx, "Python programming")
+        
+        query = connection.fetch.call_args[0][0]
+        assert "match_chunks(" in query
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("quantization", ["halfvec", "binary"])
+    async def test_semantic_search_rescored(self, test_dependencies, mock_database_responses, quantization):
+        """Test semantic search over-fetches candidates for rescoring."""
+        deps, connection = test_dependencies
+        connection.fetch.return_value = mock_database_responses['semantic_search']
+        deps.settings.search_quantization = quantization
+        deps.settings.rescore_factor = 4
+        
+        ctx = RunContext(deps=deps)
+        results = await semantic_search(ctx, "Python programming", match_count=5)
+        
+        args = connection.fetch.call_args[0]
+        assert "match_chunks_rescored" in args[0]
+        assert args[2] == 5  # match_count parameter
+        assert args[3] == quantization
+        assert args[4] == 20  # candidates: match_count * rescore_factor
+        assert isinstance(results[0], SearchResult)
+    
+    @pytest.mark.asyncio
+    async def test_hybrid_search_rescored(self, test_dependencies, mock_database_responses):
+        """Test hybrid search rescores quantized vector candidates."""
+        deps, connection = test_dependencies
+        connection.fetch.return_value = mock_database_responses['hybrid_search']
+        deps.settings.search_quantization = "halfvec"
+        deps.settings.rescore_factor = 3
+        
+        ctx = RunContext(deps=deps)
+        results = await hybrid_search(ctx, "Python programming", match_count=10, text_weight=0.5)
+        
+        args = connection.fetch.call_args[0]
+        assert "hybrid_search(" in args[0]
+        assert args[3] == 10  # match_count parameter
+        assert args[4] == 0.5  # text_weight parameter
+        assert args[7] == "halfvec"
+        assert args[8] == 3  # rescore_factor
+        assert 'combined_score' in results[0]
+
+
+class TestIndexSearchSettings:
+    """Test per-request index recall knobs."""
+    
+    @pytest.mark.asyncio
+    async def test_semantic_search_default_ef_search(self, test_dependencies, mock_database_responses):
+        """Test semantic search applies the configured ef_search locally."""
+        deps, connection = test_dependencies
+        connection.fetch.return_value = mock_database_responses['semantic_search']
+        
+        ctx = RunContext(deps=deps)
+        await semantic_search(ctx, "Python programming", match_count=5)
+        
+        connection.transaction.assert_called_once()
+        connection.execute.assert_called_once_with(
+            "SELECT set_config($1, $2, true)", "hnsw.ef_search", str(deps.settings.hnsw_ef_search)
+        )
+    
+    @pytest.mark.asyncio
+    async def test_semantic_search_custom_ef_search(self, test_dependencies, mock_database_responses):
+        """Test a per-request ef_search overrides the default."""
+        deps, connection = test_dependencies
+        connection.fetch.return_value = mock_database_responses['semantic_search']
+        
+        ctx = RunContext(deps=deps)
+        await semantic_search(ctx, "Python programming", match_count=5, ef_search=200)
+        
+        assert connection.execute.call_args[0][1:] == ("hnsw.ef_search", "200")
+    
+    @pytest.mark.asyncio
+    async def test_ef_search_covers_match_count(self, test_dependencies, mock_database_responses):
+        """Test ef_search is raised so HNSW can return every requested row."""
+        deps, connection = test_dependencies
+        connection.fetch.return_value = mock_database_responses['semantic_search']
+        
+        ctx = RunContext(deps=deps)
+        await semantic_search(ctx, "Python programming", match_count=50, ef_search=10)
+        
+        assert connection.execute.call_args[0][1:] == ("hnsw.ef_search", "50")
+    
+    @pytest.mark.asyncio
+    async def test_hybrid_search_ivfflat_probes(self, test_dependencies, mock_database_responses):
+        """Test hybrid search applies probes for an ivfflat index."""
+        deps, connection = test_dependencies
+        connection.fetch.return_value = mock_database_responses['hybrid_search']
+        deps.settings.vector_index_type = "ivfflat"
+        
+        ctx = RunContext(deps=deps)
+        await hybrid_search(ctx, "Python programming", probes=20)
+        
+        assert connection.execute.call_args[0][1:] == ("ivfflat.probes", "20")
+    
+    @pytest.mark.asyncio
+    async def test_exact_search_sets_nothing(self, test_dependencies, mock_database_responses):
+        """Test exact search needs no index settings."""
+        deps, connection = test_dependencies
+        connection.fetch.return_value = mock_database_responses['semantic_search']
+        deps.settings.vector_index_type = "exact"
+        
+        ctx = RunContext(deps=deps)
+        await semantic_search(ctx, "Python programming", ef_search=100)
+        
+        connection.execute.assert_not_called()
+
 class TestAutoSearch:
     """Test auto search tool functionality."""
     
@@ -496,15 +687,32 @@ class TestToolPerformance:
     
     @pytest.mark.asyncio
     async def test_tool_embedding_caching(self, test_dependencies, mock_database_responses):
-        """Test that embedding calls are made for each search (no caching at tool level)."""
+        """Test that repeated queries reuse the cached query embedding."""
+        deps, connection = test_dependencies
+        connection.fetch.return_value = mock_database_responses['semantic_search']
+        
+        ctx = RunContext(deps=deps)
+        
+        # Make multiple searches with same query, across search tools
+        await semantic_search(ctx, "same query")
+        await semantic_search(ctx, "same  query ")
+        await hybrid_search(ctx, "same query")
+        
+        # Only the first search calls the embedding API
+        assert deps.openai_client.embeddings.create.call_count == 1
+        assert deps.embedding_cache.stats.hits == 2
+        assert deps.embedding_cache.stats.misses == 1
+    
+    @pytest.mark.asyncio
+    async def test_tool_embedding_cache_disabled(self, test_dependencies, mock_database_responses):
+        """Test every search embeds its query when the cache is disabled."""
         deps, connection = test_dependencies
         connection.fetch.return_value = mock_database_responses['semantic_search']
+        deps.settings.query_cache_enabled = False
         
         ctx = RunContext(deps=deps)
         
-        # Make multiple searches with same query
         await semantic_search(ctx, "same query")
         await semantic_search(ctx, "same query")
         
-        # Each search should call embedding API (no caching in tools)
         assert deps.openai_client.embeddings.create.call_count == 2
\ No newline at end of file
@@ -0,0 +1,132 @@
+"""Test vector index strategy and maintenance decisions."""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from ..utils.vector_index import (
+    IndexState,
+    VectorIndexConfig,
+    create_index_sql,
+    ivfflat_lists,
+    maintain_vector_index,
+    rebuild_reason
+)
+
+
+class TestIndexBuild:
+    """Test index DDL and build parameters."""
+
+    def test_ivfflat_lists_scale_with_rows(self):
+        """Test list count follows rows/1000, then sqrt(rows)."""
+        assert ivfflat_lists(0) == 1
+        assert ivfflat_lists(50_000) == 50
+        assert ivfflat_lists(4_000_000) == 2000
+
+    def test_hnsw_sql(self):
+        """Test HNSW build parameters end up in the DDL."""
+        sql = create_index_sql("hnsw", m=24, ef_construction=128)
+
+        assert "USING hnsw" in sql
+        assert "m = 24" in sql
+        assert "ef_construction = 128" in sql
+
+    def test_exact_has_no_index(self):
+        """Test exact search builds no index."""
+        assert create_index_sql("exact") is None
+
+    def test_unknown_type(self):
+        """Test unknown index types are rejected."""
+        with pytest.raises(ValueError):
+            create_index_sql("annoy")
+
+    def test_config_from_env(self, monkeypatch):
+        """Test build settings are read from the environment."""
+        monkeypatch.setenv("VECTOR_INDEX_TYPE", "IVFFLAT")
+        monkeypatch.setenv("IVFFLAT_LISTS", "300")
+        monkeypatch.setenv("INDEX_MAINTENANCE_WORKERS", "8")
+
+        config = VectorIndexConfig.from_env()
+
+        assert config.vector_index_type == "ivfflat"
+        assert config.ivfflat_lists == 300
+        assert config.maintenance_workers == 8
+
+
+class TestRebuildReason:
+    """Test when maintenance rebuilds the index."""
+
+    def test_missing_index(self):
+        """Test a dropped index is rebuilt."""
+        state = IndexState(method=None, rows_at_build=0, rows=100)
+
+        assert rebuild_reason(state, VectorIndexConfig()) == "index missing"
+
+    def test_ivfflat_growth(self):
+        """Test ivfflat is rebuilt once the table outgrows its centroids."""
+        config = VectorIndexConfig(vector_index_type="ivfflat", rebuild_growth=0.5)
+
+        assert rebuild_reason(IndexState("ivfflat", rows_at_build=1000, rows=1400), config) is None
+        assert rebuild_reason(IndexState("ivfflat", rows_at_build=1000, rows=1500), config)
+        # Built by schema.sql on an empty table
+        assert rebuild_reason(IndexState("ivfflat", rows_at_build=0, rows=10), config)
+
+    def test_hnsw_growth_kept(self):
+        """Test HNSW is not rebuilt for growth alone."""
+        state = IndexState(method="hnsw", rows_at_build=1000, rows=100_000)
+
+        assert rebuild_reason(state, VectorIndexConfig()) is None
+
+    def test_type_change(self):
+        """Test switching strategies rebuilds the index."""
+        state = IndexState(method="ivfflat", rows_at_build=1000, rows=1000)
+
+        assert "changed" in rebuild_reason(state, VectorIndexConfig(vector_index_type="hnsw"))
+
+
+class TestMaintenance:
+    """Test the maintenance routine."""
+
+    @pytest.mark.asyncio
+    async def test_maintain_rebuilds_and_vacuums(self):
+        """Test a missing index is rebuilt with parallel workers, then vacuumed."""
+        conn = AsyncMock()
+        conn.transaction = MagicMock()
+        conn.fetchrow.return_value = None
+        conn.fetchval.return_value = 5000
+
+        description = await maintain_vector_index(conn, VectorIndexConfig(maintenance_workers=6))
+
+        statements = [call[0][0] for call in conn.execute.call_args_list]
+        assert "hnsw" in description
+        assert conn.execute.call_args_list[0][0][1:] == ("max_parallel_maintenance_workers", "6")
+        assert any(sql.startswith("CREATE INDEX") for sql in statements)
+        assert statements[-1] == "VACUUM (ANALYZE) chunks"
+
+    @pytest.mark.asyncio
+    async def test_maintain_keeps_fresh_index(self):
+        """Test an up-to-date index is only vacuumed."""
+        conn = AsyncMock()
+        conn.fetchrow.return_value = {"method": "hnsw", "comment": '{"rows": 5000}'}
+        conn.fetchval.return_value = 6000
+
+        description = await maintain_vector_index(conn, VectorIndexConfig())
+
+        assert description is None
+        conn.execute.assert_called_once_with("VACUUM (ANALYZE) chunks")
+
+    @pytest.mark.asyncio
+    async def test_failed_build_retried_with_defaults(self):
+        """Test a build failing with tuned settings is retried so the index is not left missing."""
+        conn = AsyncMock()
+        conn.transaction = MagicMock()
+        conn.fetchrow.return_value = None
+        conn.fetchval.return_value = 5000
+        conn.execute.side_effect = [None, Exception("out of memory")] + [None] * 4
+
+        description = await maintain_vector_index(conn, VectorIndexConfig(maintenance_workers=6))
+
+        statements = [call[0][0] for call in conn.execute.call_args_list]
+        assert "hnsw" in description
+        assert sum(sql.startswith("SELECT set_config") for sql in statements) == 1
+        assert statements[-3].startswith("CREATE INDEX")
+        assert statements[-1] == "VACUUM (ANALYZE) chunks"
@@ -6,6 +6,7 @@ from pydantic import BaseModel, Field
 import asyncpg
 import json
 from dependencies import AgentDependencies
+from utils.vector_index import search_settings, apply_search_settings
 
 
 class SearchResult(BaseModel):
@@ -22,7 +23,9 @@ class SearchResult(BaseModel):
 async def semantic_search(
     ctx: RunContext[AgentDependencies],
     query: str,
-    match_count: Optional[int] = None
+    match_count: Optional[int] = None,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None
 ) -> List[SearchResult]:
     """
     Perform pure semantic search using vector similarity.
@@ -31,6 +34,8 @@ async def semantic_search(
         ctx: Agent runtime context with dependencies
         query: Search query text
         match_count: Number of results to return (default: 10)
+        ef_search: HNSW candidate list size; higher is slower but finds more true matches
+        probes: ivfflat lists to scan; higher is slower but finds more true matches
     
     Returns:
         List of search results ordered by similarity
@@ -48,18 +53,35 @@ async def semantic_search(
         # Generate embedding for query
         query_embedding = await deps.get_embedding(query)
         
-        # Convert embedding to PostgreSQL vector string format
-        embedding_str = '[' + ','.join(map(str, query_embedding)) + ']'
-        
-        # Execute semantic search
+        # Execute semantic search (embedding is sent via the binary vector codec)
+        quantization = deps.settings.search_quantization
+        candidates = match_count if quantization == "none" else match_count * deps.settings.rescore_factor
         async with deps.db_pool.acquire() as conn:
-            results = await conn.fetch(
-                """
-                SELECT * FROM match_chunks($1::vector, $2)
-                """,
-                embedding_str,
-                match_count
-            )
+            async with conn.transaction():
+                # Index recall knobs last until the end of this transaction
+                await apply_search_settings(
+                    conn, search_settings(deps.settings, ef_search, probes, candidates)
+                )
+                
+                if quantization == "none":
+                    results = await conn.fetch(
+                        """
+                        SELECT * FROM match_chunks($1::vector, $2)
+                        """,
+                        query_embedding,
+                        match_count
+                    )
+                else:
+                    # Over-fetch from the compact index, rescore at full precision
+                    results = await conn.fetch(
+                        """
+                        SELECT * FROM match_chunks_rescored($1::vector, $2, $3, $4)
+                        """,
+                        query_embedding,
+                        match_count,
+                        quantization,
+                        candidates
+                    )
         
         # Convert to SearchResult objects
         return [
@@ -83,7 +105,9 @@ async def hybrid_search(
     ctx: RunContext[AgentDependencies],
     query: str,
     match_count: Optional[int] = None,
-    text_weight: Optional[float] = None
+    text_weight: Optional[float] = None,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None
 ) -> List[Dict[str, Any]]:
     """
     Perform hybrid search combining semantic and keyword matching.
@@ -93,6 +117,8 @@ async def hybrid_search(
         query: Search query text
         match_count: Number of results to return (default: 10)
         text_weight: Weight for text matching (0-1, default: 0.3)
+        ef_search: HNSW candidate list size; higher is slower but finds more true matches
+        probes: ivfflat lists to scan; higher is slower but finds more true matches
     
     Returns:
         List of search results with combined scores
@@ -109,35 +135,104 @@ async def hybrid_search(
         # Validate parameters
         match_count = min(match_count, deps.settings.max_match_count)
         text_weight = max(0.0, min(1.0, text_weight))
+        fusion = deps.user_preferences.get('hybrid_fusion', deps.settings.hybrid_fusion)
         
         # Generate embedding for query
         query_embedding = await deps.get_embedding(query)
         
-        # Convert embedding to PostgreSQL vector string format
-        # PostgreSQL vector format: '[1.0,2.0,3.0]' (no spaces after commas)
-        embedding_str = '[' + ','.join(map(str, query_embedding)) + ']'
+        # Execute hybrid search (embedding is sent via the binary vector codec).
+        # Each index contributes its top candidates, which are then fused.
+        quantization = deps.settings.search_quantization
+        candidate_count = max(match_count, deps.settings.hybrid_candidates)
+        candidates = candidate_count if quantization == "none" else candidate_count * deps.settings.rescore_factor
+        async with deps.db_pool.acquire() as conn:
+            async with conn.transaction():
+                # Index recall knobs last until the end of this transaction
+                await apply_search_settings(
+                    conn, search_settings(deps.settings, ef_search, probes, candidates)
+                )
+                
+                results = await conn.fetch(
+                    """
+                    SELECT * FROM hybrid_search($1::vector, $2, $3, $4, $5, $6, $7, $8)
+                    """,
+                    query_embedding,
+                    query,
+                    match_count,
+                    text_weight,
+                    fusion,
+                    candidate_count,
+                    quantization,
+                    deps.settings.rescore_factor
+                )
+        
+        # Convert to dictionaries with additional scores
+        return [
+            {
+                'chunk_id': str(row['chunk_id']),
+                'document_id': str(row['document_id']),
+                'content': row['content'],
+                'combined_score': row['combined_score'],
+                'vector_similarity': row['vector_similarity'],
+                'text_similarity': row['text_similarity'],
+                'metadata': json.loads(row['metadata']) if row['metadata'] else {},
+                'document_title': row['document_title'],
+                'document_source': row['document_source']
+            }
+            for row in results
+        ]
+    except Exception as e:
+        print(e)
+        return f"Failed to perform hybrid search: {e}"
+
+
+async def keyword_search(
+    ctx: RunContext[AgentDependencies],
+    query: str,
+    match_count: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Perform keyword search without embedding the query.
+    
+    Best for exact identifiers, error codes and product names. Matches are
+    ranked by BM25 on the full-text index; if nothing matches in full text,
+    chunks containing a similar word (trigram similarity) are returned.
+    
+    Args:
+        ctx: Agent runtime context with dependencies
+        query: Keywords; quoted phrases, "or" and -excluded words are supported
+        match_count: Number of results to return (default: 10)
+    
+    Returns:
+        List of search results with keyword scores
+    """
+    try:
+        deps = ctx.deps
+        
+        # Use default if not specified
+        if match_count is None:
+            match_count = deps.settings.default_match_count
+        
+        # Validate match count
+        match_count = min(match_count, deps.settings.max_match_count)
         
-        # Execute hybrid search
         async with deps.db_pool.acquire() as conn:
             results = await conn.fetch(
                 """
-                SELECT * FROM hybrid_search($1::vector, $2, $3, $4)
+                SELECT * FROM keyword_search($1, $2, $3)
                 """,
-                embedding_str,
                 query,
                 match_count,
-                text_weight
+                max(match_count, deps.settings.keyword_candidates)
             )
         
-        # Convert to dictionaries with additional scores
         return [
             {
                 'chunk_id': str(row['chunk_id']),
                 'document_id': str(row['document_id']),
                 'content': row['content'],
-                'combined_score': row['combined_score'],
-                'vector_similarity': row['vector_similarity'],
-                'text_similarity': row['text_similarity'],
+                'score': row['score'],
+                'match_type': row['match_type'],
                 'metadata': json.loads(row['metadata']) if row['metadata'] else {},
                 'document_title': row['document_title'],
                 'document_source': row['document_source']
@@ -146,4 +241,4 @@ async def hybrid_search(
         ]
     except Exception as e:
         print(e)
-        return f"Failed to perform hybrid search: {e}"
+        return f"Failed to perform keyword search: {e}"
@@ -15,6 +15,8 @@ import asyncpg
 from asyncpg.pool import Pool
 from dotenv import load_dotenv
 
+from .vector_codec import register_vector_codec
+
 # Load environment variables
 load_dotenv()
 
@@ -29,23 +31,26 @@ class DatabasePool:
         Initialize database pool.
         
         Args:
-            database_url: PostgreSQL connection URL
+            database_url: PostgreSQL connection URL (default: DATABASE_URL
+                env, read when the pool is first created)
         """
-        self.database_url = database_url or os.getenv("DATABASE_URL")
-        if not self.database_url:
-            raise ValueError("DATABASE_URL environment variable not set")
-        
+        self.database_url = database_url
         self.pool: Optional[Pool] = None
     
     async def initialize(self):
         """Create connection pool."""
         if not self.pool:
+            self.database_url = self.database_url or os.getenv("DATABASE_URL")
+            if not self.database_url:
+                raise ValueError("DATABASE_URL environment variable not set")
+            
             self.pool = await asyncpg.create_pool(
                 self.database_url,
                 min_size=5,
                 max_size=20,
                 max_inactive_connection_lifetime=300,
-                command_timeout=60
+                command_timeout=60,
+                init=register_vector_codec
             )
             logger.info("Database connection pool initialized")
     
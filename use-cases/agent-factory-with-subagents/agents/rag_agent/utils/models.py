@@ -176,6 +176,27 @@ class IngestionConfig(BaseModel):
     chunk_overlap: int = Field(default=200, ge=0, le=1000)
     max_chunk_size: int = Field(default=2000, ge=500, le=10000)
     use_semantic_chunking: bool = True
+    semantic_method: Literal["llm", "embedding"] = Field(default="llm", description="How semantic chunk boundaries are found")
+    llm_concurrency: int = Field(default=4, ge=1, le=64, description="Oversized sections split by the LLM at once")
+    concurrency: int = Field(default=1, ge=1, le=64, description="Workers per ingestion stage")
+    stream_threshold_mb: int = Field(default=64, ge=0, description="Stream files at least this large instead of loading them (0: never)")
+    stream_batch_size: int = Field(default=512, ge=1, description="Chunks embedded and written per batch when streaming")
+    cpu_workers: int = Field(default=0, ge=0, le=64, description="Processes for reading and rule-based chunking (0: threads in this process)")
+    embed_concurrency: Optional[int] = Field(default=None, ge=1, le=64, description="Embedding stage workers (default: max of concurrency and queue_size)")
+    embed_batch_tokens: Optional[int] = Field(default=None, ge=1, description="Maximum tokens per embedding request (default: model limit)")
+    embed_requests_per_minute: Optional[int] = Field(default=None, ge=1, description="Embedding API request budget (default: unlimited)")
+    embed_tokens_per_minute: Optional[int] = Field(default=None, ge=1, description="Embedding API token budget (default: unlimited)")
+    embed_max_in_flight: int = Field(default=16, ge=1, le=256, description="Upper bound for concurrent embedding requests")
+    write_concurrency: Optional[int] = Field(default=None, ge=1, le=64, description="Database write stage workers (default: concurrency)")
+    queue_size: int = Field(default=8, ge=1, description="Capacity of the queues between ingestion stages")
+    stats_interval: float = Field(default=10.0, gt=0, description="Seconds between stage progress reports")
+    embedding_cache: Literal["none", "memory", "sqlite", "postgres"] = "memory"
+    embedding_cache_path: Optional[str] = None
+    embedding_cache_max_mb: int = Field(default=256, ge=1, description="Memory budget of the in-memory embedding cache")
+    journal: Literal["none", "file", "postgres"] = "none"
+    journal_path: Optional[str] = None
+    vector_index_maintenance: bool = Field(default=True, description="Rebuild a dropped or outgrown vector index and VACUUM ANALYZE chunks after ingestion")
+    drop_vector_index: Literal["auto", "always", "never"] = Field(default="auto", description="Drop the vector index before loading (auto: when the corpus at least doubles)")
     
     @field_validator('chunk_overlap')
     @classmethod
@@ -193,4 +214,6 @@ class IngestionResult(BaseModel):
     title: str
     chunks_created: int
     processing_time_ms: float
+    chunks_reused: int = 0
+    skipped: bool = False
     errors: List[str] = Field(default_factory=list)
\ No newline at end of file
@@ -1,25 +1,35 @@
 """
 Simplified provider configuration for OpenAI models only.
+
+Models and clients are created on first use and cached, and the OpenAI and
+Pydantic AI libraries are only imported then, so importing modules that
+depend on this one stays cheap.
 """
 
 import os
-from typing import Optional
-from pydantic_ai.models.openai import OpenAIModel
-from pydantic_ai.providers.openai import OpenAIProvider
-import openai
+from functools import lru_cache
+from typing import Optional, TYPE_CHECKING
 from dotenv import load_dotenv
 
+if TYPE_CHECKING:
+    import openai
+    from pydantic_ai.models.openai import OpenAIModel
+
 # Load environment variables
 load_dotenv()
 
 
-def get_llm_model() -> OpenAIModel:
+@lru_cache(maxsize=1)
+def get_llm_model() -> "OpenAIModel":
     """
     Get LLM model configuration for OpenAI.
     
     Returns:
-        Configured OpenAI model
+        Configured OpenAI model, shared by all callers
     """
+    from pydantic_ai.models.openai import OpenAIModel
+    from pydantic_ai.providers.openai import OpenAIProvider
+    
     llm_choice = os.getenv('LLM_CHOICE', 'gpt-4.1-mini')
     api_key = os.getenv('OPENAI_API_KEY')
     
@@ -29,13 +39,16 @@ def get_llm_model() -> OpenAIModel:
     return OpenAIModel(llm_choice, provider=OpenAIProvider(api_key=api_key))
 
 
-def get_embedding_client() -> openai.AsyncOpenAI:
+@lru_cache(maxsize=1)
+def get_embedding_client() -> "openai.AsyncOpenAI":
     """
     Get OpenAI client for embeddings.
     
     Returns:
-        Configured OpenAI client for embeddings
+        Configured OpenAI client for embeddings, shared by all callers
     """
+    import openai
+    
     api_key = os.getenv('OPENAI_API_KEY')
     
     if not api_key:
@@ -54,7 +67,7 @@ def get_embedding_model() -> str:
     return os.getenv('EMBEDDING_MODEL', 'text-embedding-3-small')
 
 
-def get_ingestion_model() -> OpenAIModel:
+def get_ingestion_model() -> "OpenAIModel":
     """
     Get model for ingestion tasks (uses same model as main LLM).
     
@@ -0,0 +1,144 @@
+"""
+Query embedding cache shared by agent sessions.
+
+Search tools embed the user's query on every call, and the agent often runs
+semantic and hybrid search for the same query while users repeat questions
+across sessions. Queries are cached by (model, dimensions, normalized text)
+in a bounded LRU with a TTL, and concurrent requests for the same query wait
+for a single in-flight API call instead of each making their own.
+"""
+
+import asyncio
+import unicodedata
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from ingestion.embedding_cache import CacheStats, EmbeddingCache, make_cache_key
+
+
+def normalize_query(text: str) -> str:
+    """Normalize Unicode forms and collapse whitespace, keeping case."""
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+@dataclass
+class QueryCacheStats(CacheStats):
+    """Cache counters; lookups that joined an in-flight request count as hits."""
+    coalesced: int = 0
+
+    def __str__(self) -> str:
+        summary = super().__str__()
+        if self.coalesced:
+            summary += f", {self.coalesced} coalesced"
+        return summary
+
+
+class QueryEmbeddingCache:
+    """Bounded LRU+TTL cache of query embeddings with single-flight misses."""
+
+    def __init__(
+        self,
+        max_bytes: int = 32 * 1024 * 1024,
+        ttl_seconds: Optional[float] = 3600
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            max_bytes: Approximate memory budget (~6 KB per 1536-d query)
+            ttl_seconds: Time-to-live of entries, None to keep until evicted
+        """
+        self.cache = EmbeddingCache(max_bytes=max_bytes, ttl_seconds=ttl_seconds)
+        # EmbeddingCache counts evictions and expirations on these stats
+        self.cache.stats = QueryCacheStats()
+        self._in_flight: Dict[str, "asyncio.Task[List[float]]"] = {}
+
+    @property
+    def stats(self) -> QueryCacheStats:
+        """Hit, miss, coalesced, eviction and expiration counters."""
+        return self.cache.stats
+
+    def __len__(self) -> int:
+        return len(self.cache)
+
+    async def get_or_create(
+        self,
+        model: str,
+        dimensions: int,
+        text: str,
+        create: Callable[[str], Awaitable[List[float]]]
+    ) -> List[float]:
+        """
+        Get a query's embedding, creating it on a miss.
+
+        Args:
+            model: Embedding model name
+            dimensions: Embedding dimensions
+            text: Query text; variants that normalize the same share an entry
+            create: Coroutine function embedding the text through the API
+
+        Returns:
+            Query embedding
+        """
+        key = make_cache_key(model, dimensions, normalize_query(text))
+
+        values = self.cache.get(key)
+        if values is not None:
+            self.stats.hits += 1
+            return values.tolist()
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.stats.hits += 1
+            self.stats.coalesced += 1
+            return await asyncio.shield(task)
+
+        self.stats.misses += 1
+        task = asyncio.ensure_future(create(text))
+        self._in_flight[key] = task
+        try:
+            # Shielded so a cancelled caller does not fail the waiters
+            embedding = await asyncio.shield(task)
+        finally:
+            if task.done():
+                self._forget(key, task)
+            else:
+                # The caller was cancelled; the call keeps running for the waiters
+                task.add_done_callback(lambda done: self._forget(key, done))
+
+        self.cache.put(key, embedding)
+        return embedding
+
+    def _forget(self, key: str, task: "asyncio.Task[List[float]]"):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Retrieve the exception so a call nobody awaits is not logged as lost
+        if not task.cancelled():
+            task.exception()
+
+    def clear(self):
+        """Drop all entries, keeping the counters."""
+        self.cache.cache.clear()
+        self.cache.current_bytes = 0
+
+
+_shared_cache: Optional[QueryEmbeddingCache] = None
+
+
+def shared_query_cache(settings) -> QueryEmbeddingCache:
+    """
+    The process-wide cache, created from settings on first use.
+
+    Args:
+        settings: Settings with query_cache_max_mb and query_cache_ttl_seconds
+
+    Returns:
+        Cache shared by every AgentDependencies without its own
+    """
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = QueryEmbeddingCache(
+            max_bytes=settings.query_cache_max_mb * 1024 * 1024,
+            ttl_seconds=settings.query_cache_ttl_seconds or None
+        )
+    return _shared_cache
@@ -0,0 +1,78 @@
+"""
+Binary pgvector codec for asyncpg connections.
+
+pgvector's binary wire format is a big-endian header of two unsigned
+16-bit integers (dimensions, unused) followed by the float4 values.
+Registering this codec lets queries and COPY pass embeddings as float32
+buffers instead of '[0.1,0.2,...]' strings that Postgres has to parse.
+"""
+
+import sys
+import struct
+from array import array
+from typing import Any, List
+
+import asyncpg
+
+VECTOR_HEADER = struct.Struct(">HH")
+
+_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+def encode_vector(value: Any) -> bytes:
+    """
+    Encode an embedding into pgvector's binary format.
+
+    Args:
+        value: Sequence of floats, array('f') or NumPy array
+
+    Returns:
+        Binary vector payload
+    """
+    if hasattr(value, "astype"):
+        # NumPy arrays convert to big-endian float32 in one step
+        return VECTOR_HEADER.pack(len(value), 0) + value.astype(">f4").tobytes()
+
+    data = array("f", value)
+    if _LITTLE_ENDIAN:
+        data.byteswap()
+
+    return VECTOR_HEADER.pack(len(data), 0) + data.tobytes()
+
+
+def decode_vector(data: bytes) -> List[float]:
+    """
+    Decode pgvector's binary format into a list of floats.
+
+    Args:
+        data: Binary vector payload
+
+    Returns:
+        Embedding values
+    """
+    dimensions, _ = VECTOR_HEADER.unpack_from(data)
+
+    values = array("f")
+    values.frombytes(data[VECTOR_HEADER.size:VECTOR_HEADER.size + 4 * dimensions])
+    if _LITTLE_ENDIAN:
+        values.byteswap()
+
+    return values.tolist()
+
+
+async def register_vector_codec(conn: asyncpg.Connection) -> None:
+    """
+    Register the binary vector codec on a connection.
+
+    Intended for the ``init`` hook of ``asyncpg.create_pool`` so every
+    pooled connection gets it.
+
+    Args:
+        conn: Connection to configure
+    """
+    await conn.set_type_codec(
+        "vector",
+        encoder=encode_vector,
+        decoder=decode_vector,
+        format="binary"
+    )
@@ -0,0 +1,378 @@
+"""
+Vector index strategy and maintenance for chunks.embedding.
+
+The index type and its build parameters come from settings
+(VECTOR_INDEX_TYPE, HNSW_M, HNSW_EF_CONSTRUCTION, IVFFLAT_LISTS), and the
+per-query recall knobs (hnsw.ef_search, ivfflat.probes) are applied with
+SET LOCAL semantics so they never leak to other users of a pooled
+connection.
+
+Each build records the row count it saw in the index comment. ivfflat
+centroids are trained on the rows present at build time, so maintenance
+rebuilds the index once the table has grown past INDEX_REBUILD_GROWTH,
+then vacuums and analyzes ``chunks``. From the agent directory:
+
+    python -m utils.vector_index             # rebuild now
+    python -m utils.vector_index --maintain  # rebuild if needed, then VACUUM ANALYZE
+    python -m utils.vector_index --check     # show rows at build vs now
+"""
+
+import os
+import json
+import math
+import asyncio
+import logging
+import argparse
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = "idx_chunks_embedding"
+
+INDEX_TYPES = ("hnsw", "ivfflat", "exact")
+
+# Upper bound pgvector accepts for hnsw.ef_search
+MAX_EF_SEARCH = 1000
+
+
+def ivfflat_lists(rows: int) -> int:
+    """
+    List count for an ivfflat index, following pgvector's guidance.
+
+    Args:
+        rows: Rows in the table when the index is built
+
+    Returns:
+        rows / 1000 up to a million rows, sqrt(rows) beyond
+    """
+    if rows <= 1_000_000:
+        return max(1, rows // 1000)
+    return int(math.sqrt(rows))
+
+
+def create_index_sql(
+    index_type: str,
+    m: int = 16,
+    ef_construction: int = 64,
+    lists: int = 100
+) -> Optional[str]:
+    """
+    Build the CREATE INDEX statement for an index strategy.
+
+    Args:
+        index_type: One of "hnsw", "ivfflat", "exact"
+        m: HNSW connections per node
+        ef_construction: HNSW candidate list size while building
+        lists: ivfflat list count
+
+    Returns:
+        SQL, or None for exact search (no index)
+    """
+    if index_type == "hnsw":
+        return (
+            f"CREATE INDEX {INDEX_NAME} ON chunks USING hnsw (embedding vector_cosine_ops) "
+            f"WITH (m = {int(m)}, ef_construction = {int(ef_construction)})"
+        )
+    if index_type == "ivfflat":
+        return (
+            f"CREATE INDEX {INDEX_NAME} ON chunks USING ivfflat (embedding vector_cosine_ops) "
+            f"WITH (lists = {int(lists)})"
+        )
+    if index_type == "exact":
+        return None
+
+    raise ValueError(f"Unknown vector index type: {index_type}")
+
+
+def search_settings(
+    settings,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None,
+    candidates: int = 0
+) -> Dict[str, str]:
+    """
+    Resolve the planner settings for one search.
+
+    HNSW returns at most ef_search rows, so ef_search is raised to the
+    number of candidates the query asks for.
+
+    Args:
+        settings: Application settings
+        ef_search: Per-request hnsw.ef_search (default: settings)
+        probes: Per-request ivfflat.probes (default: settings)
+        candidates: Rows the query fetches from the index
+
+    Returns:
+        Setting name -> value, empty for exact search
+    """
+    if settings.vector_index_type == "hnsw":
+        value = max(ef_search or settings.hnsw_ef_search, candidates)
+        return {"hnsw.ef_search": str(min(value, MAX_EF_SEARCH))}
+    if settings.vector_index_type == "ivfflat":
+        return {"ivfflat.probes": str(probes or settings.ivfflat_probes)}
+
+    return {}
+
+
+async def apply_search_settings(conn, values: Dict[str, str]):
+    """
+    Apply planner settings to the connection's current transaction.
+
+    Equivalent to SET LOCAL, but parameterized.
+
+    Args:
+        conn: Connection inside a transaction
+        values: Setting name -> value
+    """
+    for name, value in values.items():
+        await conn.execute("SELECT set_config($1, $2, true)", name, value)
+
+
+@dataclass
+class VectorIndexConfig:
+    """
+    Index build settings, read from the same environment variables as Settings.
+
+    Ingestion uses this instead of Settings so it does not need the agent's
+    LLM configuration.
+    """
+    vector_index_type: str = "hnsw"
+    hnsw_m: int = 16
+    hnsw_ef_construction: int = 64
+    ivfflat_lists: Optional[int] = None
+    # Relative row growth since the last build that triggers an ivfflat rebuild
+    rebuild_growth: float = 0.5
+    # max_parallel_maintenance_workers for builds (None: server default)
+    maintenance_workers: Optional[int] = 4
+    # maintenance_work_mem for builds, e.g. "2GB" (None: server default)
+    maintenance_work_mem: Optional[str] = None
+
+    @classmethod
+    def from_env(cls) -> "VectorIndexConfig":
+        """Load from VECTOR_INDEX_TYPE, HNSW_M, ... and INDEX_MAINTENANCE_* variables."""
+        def optional_int(name: str, default: Optional[int] = None) -> Optional[int]:
+            value = os.getenv(name)
+            return int(value) if value else default
+
+        config = cls(
+            vector_index_type=os.getenv("VECTOR_INDEX_TYPE", cls.vector_index_type).lower(),
+            hnsw_m=optional_int("HNSW_M", cls.hnsw_m),
+            hnsw_ef_construction=optional_int("HNSW_EF_CONSTRUCTION", cls.hnsw_ef_construction),
+            ivfflat_lists=optional_int("IVFFLAT_LISTS"),
+            rebuild_growth=float(os.getenv("INDEX_REBUILD_GROWTH", cls.rebuild_growth)),
+            maintenance_workers=optional_int("INDEX_MAINTENANCE_WORKERS", cls.maintenance_workers),
+            maintenance_work_mem=os.getenv("INDEX_MAINTENANCE_WORK_MEM") or None
+        )
+        if config.vector_index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown vector index type: {config.vector_index_type}")
+        return config
+
+
+@dataclass
+class IndexState:
+    """The chunk embedding index as it exists in the database."""
+    method: Optional[str]
+    rows_at_build: int
+    rows: int
+
+    @property
+    def growth(self) -> float:
+        """Rows added since the build, relative to the rows at build time."""
+        return (self.rows - self.rows_at_build) / max(self.rows_at_build, 1)
+
+
+async def count_indexed_rows(conn) -> int:
+    """Rows with an embedding, i.e. rows the vector index covers."""
+    return await conn.fetchval("SELECT count(*) FROM chunks WHERE embedding IS NOT NULL")
+
+
+async def index_state(conn) -> IndexState:
+    """
+    Inspect the chunk embedding index.
+
+    Returns:
+        Index method (None if there is no index), rows recorded at its
+        build (0 for indexes not built by this module) and rows now
+    """
+    row = await conn.fetchrow(
+        """
+        SELECT am.amname AS method, obj_description(c.oid, 'pg_class') AS comment
+        FROM pg_class c JOIN pg_am am ON am.oid = c.relam
+        WHERE c.relname = $1 AND c.relkind = 'i'
+        """,
+        INDEX_NAME
+    )
+
+    rows_at_build = 0
+    if row is not None and row["comment"]:
+        try:
+            rows_at_build = int(json.loads(row["comment"]).get("rows", 0))
+        except (ValueError, AttributeError):
+            pass
+
+    return IndexState(
+        method=row["method"] if row is not None else None,
+        rows_at_build=rows_at_build,
+        rows=await count_indexed_rows(conn)
+    )
+
+
+def rebuild_reason(state: IndexState, config) -> Optional[str]:
+    """
+    Decide whether the index needs rebuilding.
+
+    Returns:
+        Why it should be rebuilt, or None if it is fine
+    """
+    wanted = config.vector_index_type
+    if wanted == "exact":
+        return "exact search configured" if state.method is not None else None
+    if state.method is None:
+        return "index missing"
+    if state.method != wanted:
+        return f"index type changed from {state.method} to {wanted}"
+    # HNSW graphs take inserts without degrading; ivfflat centroids do not
+    if wanted == "ivfflat" and state.rows and state.growth >= getattr(config, "rebuild_growth", 0.5):
+        return f"{state.rows_at_build} rows at build, {state.rows} now"
+
+    return None
+
+
+async def drop_vector_index(conn):
+    """Drop the chunk embedding index, e.g. before a bulk load."""
+    await conn.execute(f"DROP INDEX IF EXISTS {INDEX_NAME}")
+
+
+async def build_vector_index(conn, settings, concurrently: bool = False) -> str:
+    """
+    Drop and recreate the chunk embedding index from settings.
+
+    The row count at build time is stored in the index comment.
+
+    Args:
+        conn: Database connection (not inside a transaction if concurrently)
+        settings: Settings or VectorIndexConfig
+        concurrently: Build without blocking writes (slower)
+
+    Returns:
+        Description of the index that was built
+    """
+    rows = await count_indexed_rows(conn)
+    lists = settings.ivfflat_lists or ivfflat_lists(rows)
+
+    sql = create_index_sql(
+        settings.vector_index_type,
+        m=settings.hnsw_m,
+        ef_construction=settings.hnsw_ef_construction,
+        lists=lists
+    )
+
+    await conn.execute(f"DROP INDEX {'CONCURRENTLY ' if concurrently else ''}IF EXISTS {INDEX_NAME}")
+    if sql is None:
+        return "exact search (no vector index)"
+
+    if concurrently:
+        sql = sql.replace("CREATE INDEX", "CREATE INDEX CONCURRENTLY", 1)
+    await conn.execute(sql)
+
+    # Only integers and a fixed type name go into the comment
+    comment = json.dumps({"rows": rows, "type": settings.vector_index_type})
+    await conn.execute(f"COMMENT ON INDEX {INDEX_NAME} IS '{comment}'")
+
+    if settings.vector_index_type == "hnsw":
+        return f"hnsw (m={settings.hnsw_m}, ef_construction={settings.hnsw_ef_construction}, {rows} rows)"
+    return f"ivfflat (lists={lists}, {rows} rows)"
+
+
+async def maintain_vector_index(conn, config: VectorIndexConfig, force: bool = False) -> Optional[str]:
+    """
+    Rebuild the index if it is missing or stale, then VACUUM ANALYZE chunks.
+
+    Builds use parallel maintenance workers and, for ivfflat, a list
+    count derived from the current row count. A build that fails with
+    those settings is retried once with the server defaults.
+
+    Args:
+        conn: Database connection, not inside a transaction and without
+            a command timeout (builds of large tables take minutes)
+        config: Index build settings
+        force: Rebuild even if the index looks fine
+
+    Returns:
+        Description of the rebuilt index, or None if it was kept
+    """
+    state = await index_state(conn)
+    reason = "forced" if force else rebuild_reason(state, config)
+
+    description = None
+    if reason:
+        logger.info(f"Rebuilding {INDEX_NAME}: {reason}")
+        build_settings = {}
+        if config.maintenance_workers is not None:
+            build_settings["max_parallel_maintenance_workers"] = str(config.maintenance_workers)
+        if config.maintenance_work_mem:
+            build_settings["maintenance_work_mem"] = config.maintenance_work_mem
+
+        try:
+            async with conn.transaction():
+                await apply_search_settings(conn, build_settings)
+                description = await build_vector_index(conn, config)
+        except Exception as e:
+            # The failed build rolled back to the previous index, if any.
+            # Tuned settings the server cannot satisfy (e.g. maintenance_work_mem)
+            # must not leave a dropped index missing, so retry with its defaults.
+            if not build_settings:
+                raise
+            logger.warning(f"Building {INDEX_NAME} failed ({e}), retrying with server default build settings")
+            async with conn.transaction():
+                description = await build_vector_index(conn, config)
+
+        logger.info(f"Built {INDEX_NAME}: {description}")
+
+    # VACUUM cannot run inside a transaction block
+    await conn.execute("VACUUM (ANALYZE) chunks")
+    return description
+
+
+async def main():
+    """Rebuild, maintain or inspect the chunk embedding index."""
+    parser = argparse.ArgumentParser(description="Build and maintain the chunk embedding index")
+    action = parser.add_mutually_exclusive_group()
+    action.add_argument("--maintain", action="store_true", help="Rebuild only if missing or grown, then VACUUM ANALYZE")
+    action.add_argument("--check", action="store_true", help="Show the index state without changing anything")
+    parser.add_argument("--concurrently", action="store_true", help="Rebuild without blocking writes")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    import asyncpg
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        parser.error("DATABASE_URL environment variable not set")
+
+    config = VectorIndexConfig.from_env()
+    conn = await asyncpg.connect(database_url)
+    try:
+        if args.check:
+            state = await index_state(conn)
+            reason = rebuild_reason(state, config)
+            print(
+                f"{INDEX_NAME}: {state.method or 'none'}, {state.rows_at_build} rows at build, "
+                f"{state.rows} now ({state.growth:+.0%}); "
+                f"{'rebuild: ' + reason if reason else 'up to date'}"
+            )
+        elif args.maintain:
+            await maintain_vector_index(conn, config)
+        else:
+            description = await build_vector_index(conn, config, concurrently=args.concurrently)
+            logger.info(f"Built {INDEX_NAME}: {description}")
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())